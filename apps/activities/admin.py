@@ -4,6 +4,7 @@ Admin configuration for Activities app
 
 from django.contrib import admin
 from django.utils.translation import gettext_lazy as _
+from apps.availability.admin import ScheduleInline
 from .models import ActivityCategory, Activity, ActivityImage, ActivityInclusion, ActivityImportantInfo
 
 
@@ -62,7 +63,7 @@ class ActivityAdmin(admin.ModelAdmin):
     prepopulated_fields = {'slug': ('title',)}
     date_hierarchy = 'created_at'
     
-    inlines = [ActivityImageInline, ActivityInclusionInline, ActivityImportantInfoInline]
+    inlines = [ActivityImageInline, ActivityInclusionInline, ActivityImportantInfoInline, ScheduleInline]
     
     fieldsets = (
         ('📝 Basic Information', {
@@ -9,6 +9,10 @@ from django.core.validators import MinValueValidator, MaxValueValidator
 from django.contrib.contenttypes.fields import GenericRelation
 from apps.tours.models import Location
 from tinymce.models import HTMLField
+from apps.reviews.models import RatingAggregateMixin
+from apps.core.managers import CatalogQuerySet
+from apps.core.pricing import price_rules
+from apps.core.pagination import keyset_index
 
 
 class ActivityCategory(models.Model):
@@ -45,7 +49,7 @@ class ActivityCategory(models.Model):
         return reverse('activities:category', kwargs={'slug': self.slug})
 
 
-class Activity(models.Model):
+class Activity(RatingAggregateMixin, models.Model):
     """Activity model"""
     # Basic Information
     title = models.CharField(max_length=200, verbose_name="Titel (DE)")
@@ -103,6 +107,8 @@ class Activity(models.Model):
     # Reviews (GenericRelation for reverse lookup)
     reviews = GenericRelation('reviews.Review', related_query_name='activity')
     
+    objects = CatalogQuerySet.as_manager()
+    
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -115,6 +121,11 @@ class Activity(models.Model):
             models.Index(fields=['slug']),
             models.Index(fields=['is_active', 'is_featured']),
             models.Index(fields=['category', 'is_active']),
+            # Keyset pagination, one per list ordering (scanned backwards for the reverse)
+            keyset_index('activity_active_featured_idx', '-is_featured', '-is_popular', 'title', 'id'),
+            keyset_index('activity_active_popular_idx', '-is_popular', '-is_featured', 'title', 'id'),
+            keyset_index('activity_active_price_idx', 'price', 'id'),
+            keyset_index('activity_active_rating_idx', '-rating_avg', '-rating_count', 'id'),
         ]
     
     def __str__(self):
@@ -131,25 +142,17 @@ class Activity(models.Model):
     @property
     def display_price(self):
         """Returns the price to display (discount if available)"""
-        return self.discount_price if self.discount_price else self.price
+        return price_rules(self).unit
     
     @property
     def has_discount(self):
         """Check if activity has discount"""
-        return self.discount_price is not None and self.discount_price < self.price
-    
-    @property
-    def average_rating(self):
-        """Calculate average rating from reviews with rating > 3"""
-        reviews = self.reviews.filter(is_approved=True, rating__gt=3)
-        if reviews.exists():
-            return reviews.aggregate(models.Avg('rating'))['rating__avg']
-        return None
+        return price_rules(self).regular is not None
     
     @property
     def total_reviews(self):
         """Count approved reviews with rating > 3"""
-        return self.reviews.filter(is_approved=True, rating__gt=3).count()
+        return self.visible_review_count
 
 
 class ActivityImage(models.Model):
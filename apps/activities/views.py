@@ -3,21 +3,26 @@ Views for Activities app
 """
 
 from django.views.generic import ListView, DetailView
-from django.db.models import Q, Count, Avg
+from django.db.models import Count, Avg
 from django.utils import translation
 from .models import Activity, ActivityCategory
+from apps.search.backends import filter_by_search
+from apps.core.pagination import KeysetPaginationMixin
+from apps.core.pricing import QuoteListMixin
+from apps.images.renditions import RenditionPrefetchMixin
 from apps.core.models import PageHero
 
 
-class ActivityListView(ListView):
+class ActivityListView(RenditionPrefetchMixin, QuoteListMixin, KeysetPaginationMixin, ListView):
     """List all activities with filtering"""
     model = Activity
     template_name = 'activities/index.html'
     context_object_name = 'activities'
     paginate_by = 12
+    json_image_field = 'featured_image'
     
     def get_queryset(self):
-        queryset = Activity.objects.filter(is_active=True).select_related('category', 'location').prefetch_related('reviews')
+        queryset = Activity.objects.active().select_related('category', 'location').with_ratings()
         
         # Filter by category
         category_slug = self.request.GET.get('category')
@@ -32,12 +37,15 @@ class ActivityListView(ListView):
         # Search
         search_query = self.request.GET.get('search')
         if search_query:
-            queryset = queryset.filter(
-                Q(title__icontains=search_query) |
-                Q(title_en__icontains=search_query) |
-                Q(description__icontains=search_query) |
-                Q(description_en__icontains=search_query)
-            )
+            queryset = filter_by_search(queryset, search_query)
+        
+        # Filter by minimum average rating
+        min_rating = self.request.GET.get('rating')
+        if min_rating:
+            try:
+                queryset = queryset.min_rating(float(min_rating))
+            except ValueError:
+                pass
         
         # Ordering
         ordering = self.request.GET.get('ordering', 'featured')
@@ -47,11 +55,24 @@ class ActivityListView(ListView):
             queryset = queryset.order_by('-price')
         elif ordering == 'popular':
             queryset = queryset.order_by('-is_popular', '-is_featured', 'title')
+        elif ordering == 'rating':
+            queryset = queryset.order_by_rating()
         else:  # featured/default
             queryset = queryset.order_by('-is_featured', '-is_popular', 'title')
         
         return queryset
     
+    def get_json_item(self, activity):
+        item = super().get_json_item(activity)
+        item.update(
+            price=activity.quote.unit_price,
+            regular_price=activity.quote.regular_price,
+            price_basis=activity.quote.basis,
+            rating=activity.average_rating,
+            review_count=activity.visible_review_count,
+        )
+        return item
+    
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
@@ -77,6 +98,7 @@ class ActivityListView(ListView):
         context['current_location'] = self.request.GET.get('location', '')
         context['current_search'] = self.request.GET.get('search', '')
         context['current_ordering'] = self.request.GET.get('ordering', 'featured')
+        context['current_rating'] = self.request.GET.get('rating', '')
         
         # Page Hero
         try:
@@ -124,7 +146,6 @@ class ActivityDetailView(DetailView):
         # Get approved reviews with rating > 3
         from apps.reviews.models import Review
         from django.contrib.contenttypes.models import ContentType
-        from django.db.models import Avg
         content_type = ContentType.objects.get_for_model(Activity)
         approved_reviews = Review.objects.filter(
             content_type=content_type,
@@ -135,17 +156,9 @@ class ActivityDetailView(DetailView):
         
         context['reviews'] = approved_reviews[:10]
         
-        # Calculate average rating and count (only reviews with rating > 3)
-        if approved_reviews.exists():
-            context['average_rating'] = approved_reviews.aggregate(Avg('rating'))['rating__avg']
-            context['total_reviews'] = approved_reviews.count()
-        else:
-            context['average_rating'] = None
-            context['total_reviews'] = 0
-        
-        # Add today's date for form min date
-        from datetime import date
-        context['today'] = date.today()
+        # Stored rating aggregates (only reviews with rating > 3)
+        context['average_rating'] = activity.average_rating
+        context['total_reviews'] = activity.total_reviews
         
         return context
 
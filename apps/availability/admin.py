@@ -0,0 +1,36 @@
+"""
+Admin configuration for Availability app
+"""
+
+from django.contrib import admin
+from django.contrib.contenttypes.admin import GenericStackedInline
+from .models import Schedule, Slot
+
+
+class ScheduleInline(GenericStackedInline):
+    """Weekly plan on the product pages, at most one per product"""
+    model = Schedule
+    extra = 0
+    max_num = 1
+    fields = [
+        ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday'),
+        'capacity', ('valid_from', 'valid_until'), 'is_active',
+    ]
+
+
+@admin.register(Slot)
+class SlotAdmin(admin.ModelAdmin):
+    """📆 Slots - Seats per product and day"""
+    
+    list_display = ['date', 'content_type', 'object_id', 'capacity', 'held', 'remaining']
+    list_filter = ['content_type', 'date']
+    date_hierarchy = 'date'
+    readonly_fields = ['content_type', 'object_id', 'date', 'held']
+    
+    def has_add_permission(self, request):
+        # Slots come from the product schedules
+        return False
+    
+    def remaining(self, obj):
+        return obj.remaining
+    remaining.short_description = 'Frei'
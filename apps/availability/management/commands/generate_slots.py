@@ -0,0 +1,29 @@
+"""
+Management command generating the capacity slots of all scheduled products.
+Usage: python manage.py generate_slots [--days=N]
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.availability.models import Schedule
+from apps.availability.slots import SLOT_HORIZON_DAYS, sync_slots
+
+
+class Command(BaseCommand):
+    help = 'Creates the slots of the coming days and their month calendars from the product schedules (run daily)'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=SLOT_HORIZON_DAYS,
+            help=f'Number of days ahead to generate (default: {SLOT_HORIZON_DAYS})',
+        )
+    
+    def handle(self, *args, **options):
+        schedules = Schedule.objects.select_related('content_type')
+        total = 0
+        for schedule in schedules:
+            total += sync_slots(schedule, days=options['days'])
+        self.stdout.write(f'✓ {schedules.count()} schedules, {total} bookable days')
+        self.stdout.write(self.style.SUCCESS('\n✅ Slots generated!'))
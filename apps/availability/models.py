@@ -0,0 +1,135 @@
+"""
+Availability models for AusflugAgypten
+"""
+
+from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.models import ContentType
+from django.db import models, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+
+WEEKDAY_FIELDS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
+
+class Schedule(models.Model):
+    """Weekly plan of a bookable product, its slots are generated from it"""
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    content_object = GenericForeignKey('content_type', 'object_id')
+    
+    # Days of the week the product runs on
+    monday = models.BooleanField(default=True, verbose_name="Montag")
+    tuesday = models.BooleanField(default=True, verbose_name="Dienstag")
+    wednesday = models.BooleanField(default=True, verbose_name="Mittwoch")
+    thursday = models.BooleanField(default=True, verbose_name="Donnerstag")
+    friday = models.BooleanField(default=True, verbose_name="Freitag")
+    saturday = models.BooleanField(default=True, verbose_name="Samstag")
+    sunday = models.BooleanField(default=True, verbose_name="Sonntag")
+    
+    capacity = models.PositiveIntegerField(default=20, verbose_name="Plätze pro Tag")
+    valid_from = models.DateField(null=True, blank=True, verbose_name="Gültig ab")
+    valid_until = models.DateField(null=True, blank=True, verbose_name="Gültig bis")
+    is_active = models.BooleanField(default=True, verbose_name="Aktiv")
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = "Schedule"
+        verbose_name_plural = "Schedules"
+        constraints = [
+            models.UniqueConstraint(fields=['content_type', 'object_id'], name='availability_schedule_product'),
+        ]
+    
+    def __str__(self):
+        days = ', '.join(
+            self._meta.get_field(name).verbose_name[:2] for name in WEEKDAY_FIELDS if getattr(self, name)
+        )
+        return f"{self.content_type.name} #{self.object_id}: {days} ({self.capacity} Plätze)"
+    
+    def runs_on(self, day):
+        """Whether the product takes place on the given date"""
+        if not self.is_active or not getattr(self, WEEKDAY_FIELDS[day.weekday()]):
+            return False
+        if self.valid_from and day < self.valid_from:
+            return False
+        return not (self.valid_until and day > self.valid_until)
+
+
+class Slot(models.Model):
+    """Seats of one product on one date"""
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    content_object = GenericForeignKey('content_type', 'object_id')
+    date = models.DateField(verbose_name="Datum")
+    capacity = models.PositiveIntegerField(verbose_name="Plätze")
+    # Seats of the bookings that are not cancelled, kept up to date by apps.bookings
+    held = models.PositiveIntegerField(default=0, verbose_name="Reserviert")
+    
+    class Meta:
+        ordering = ['date']
+        verbose_name = "Slot"
+        verbose_name_plural = "Slots"
+        constraints = [
+            # Also the index of the month calendar query
+            models.UniqueConstraint(fields=['content_type', 'object_id', 'date'], name='availability_slot_product_date'),
+        ]
+    
+    def __str__(self):
+        return f"{self.date} - {self.held}/{self.capacity}"
+    
+    @property
+    def remaining(self):
+        return max(0, self.capacity - self.held)
+    
+    @classmethod
+    def apply_held_delta(cls, pk, delta):
+        """Add delta held seats to a slot"""
+        from .slots import refresh_slot_month
+        cls.objects.filter(pk=pk).update(held=Greatest(F('held') + delta, 0))
+        transaction.on_commit(lambda: refresh_slot_month(pk))
+
+
+class MonthAvailability(models.Model):
+    """Remaining seats of one product for every day of a month, materialized from its slots"""
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    month = models.DateField(verbose_name="Monat")
+    # One entry per day: seats left, or None if the product does not run that day
+    seats = models.JSONField(default=list, verbose_name="Freie Plätze")
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = "Month Availability"
+        verbose_name_plural = "Month Availabilities"
+        constraints = [
+            models.UniqueConstraint(fields=['content_type', 'object_id', 'month'], name='availability_month_product'),
+        ]
+    
+    def __str__(self):
+        return f"{self.content_type.name} #{self.object_id}: {self.month:%Y-%m}"
+    
+    def get_days(self):
+        """{date: seats} of the days the product runs on"""
+        return {
+            self.month.replace(day=number): seats
+            for number, seats in enumerate(self.seats, start=1) if seats is not None
+        }
+
+
+@receiver(post_save, sender=Schedule)
+def sync_slots_on_save(sender, instance, raw=False, **kwargs):
+    """Regenerate the product's future slots once the schedule is committed"""
+    if raw:
+        return
+    from .slots import sync_slots
+    transaction.on_commit(lambda: sync_slots(instance))
+
+
+@receiver(post_delete, sender=Schedule)
+def clear_slots_on_delete(sender, instance, **kwargs):
+    """Without a schedule the product is bookable on any date again"""
+    from .slots import clear_future_slots
+    clear_future_slots(instance.content_type_id, instance.object_id)
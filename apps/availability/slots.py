@@ -0,0 +1,196 @@
+"""
+Capacity slots of the bookable products of AusflugAgypten
+
+Products with an active Schedule get one Slot per day they run on, up to
+SLOT_HORIZON_DAYS ahead (the generate_slots command rolls the horizon
+forward). A booking inquiry locks the slot of its date with
+select_for_update(), checks the remaining seats and stores the booking in
+the same transaction; the seats are counted by the Booking signals in
+apps.bookings.models. Products without a schedule can be booked on any
+date, as before.
+
+The date pickers read MonthAvailability, one row per product and month
+with the remaining seats of every day. Changed slots refresh the row of
+their month after the commit, so the calendar never touches Slot or
+Booking rows.
+"""
+
+import calendar
+from datetime import date, timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.translation import gettext as _
+
+from .models import MonthAvailability, Schedule, Slot
+
+
+SLOT_HORIZON_DAYS = getattr(settings, 'SLOT_HORIZON_DAYS', 365)
+
+# URL keys of the bookable models
+PRODUCT_TYPES = {
+    'tour': 'tours.Tour',
+    'excursion': 'excursions.Excursion',
+    'activity': 'activities.Activity',
+    'transfer': 'transfers.Transfer',
+}
+
+
+class Unavailable(ValidationError):
+    """Not enough seats on the requested date"""
+
+
+def get_product_model(product_type):
+    """Model class of a PRODUCT_TYPES key, None for unknown keys"""
+    label = PRODUCT_TYPES.get(product_type)
+    return apps.get_model(label) if label else None
+
+
+def is_scheduled(content_type_id, object_id):
+    return Schedule.objects.filter(content_type_id=content_type_id, object_id=object_id, is_active=True).exists()
+
+
+def sync_slots(schedule, start=None, days=SLOT_HORIZON_DAYS):
+    """Create, resize and remove the slots of schedule's product from start to start + days"""
+    start = start or timezone.localdate()
+    if not schedule.is_active:
+        clear_future_slots(schedule.content_type_id, schedule.object_id, start)
+        return 0
+    
+    dates = [start + timedelta(days=n) for n in range(days)]
+    dates = [day for day in dates if schedule.runs_on(day)]
+    # Only the days synced now: a shorter run must not close the slots beyond it
+    future = Slot.objects.filter(
+        content_type_id=schedule.content_type_id,
+        object_id=schedule.object_id,
+        date__gte=start,
+        date__lt=start + timedelta(days=days),
+    )
+    with transaction.atomic():
+        future.filter(date__in=dates).exclude(capacity=schedule.capacity).update(capacity=schedule.capacity)
+        # Days taken out of the plan: drop empty slots, close those with bookings
+        dropped = future.exclude(date__in=dates)
+        dropped.filter(held=0).delete()
+        dropped.update(capacity=F('held'))
+        Slot.objects.bulk_create([
+            Slot(
+                content_type_id=schedule.content_type_id,
+                object_id=schedule.object_id,
+                date=day,
+                capacity=schedule.capacity,
+            )
+            for day in dates
+        ], ignore_conflicts=True)
+    transaction.on_commit(lambda: refresh_months(
+        schedule.content_type_id, schedule.object_id, start, start + timedelta(days=days),
+    ))
+    return len(dates)
+
+
+def clear_future_slots(content_type_id, object_id, start=None):
+    """Remove the slots of an unscheduled product, its bookings keep their dates"""
+    start = start or timezone.localdate()
+    Slot.objects.filter(content_type_id=content_type_id, object_id=object_id, date__gte=start).delete()
+    MonthAvailability.objects.filter(
+        content_type_id=content_type_id,
+        object_id=object_id,
+        month__gte=start.replace(day=1),
+    ).delete()
+
+
+def find_slot(product, day, lock=False):
+    """Slot of product on day, None if there is none"""
+    if product is None:
+        return None
+    slots = Slot.objects.filter(
+        content_type=ContentType.objects.get_for_model(product),
+        object_id=product.pk,
+        date=day,
+    )
+    if lock:
+        slots = slots.select_for_update()
+    return slots.first()
+
+
+def reserve(product, day, seats, lock=True):
+    """
+    Slot for a booking of seats on day, None for products without schedule.
+
+    With lock=True the slot row stays locked until the surrounding
+    transaction ends, so the booking must be saved inside it. Raises
+    Unavailable when the product does not run on day or is sold out.
+    """
+    slot = find_slot(product, day, lock)
+    if slot is None:
+        if is_scheduled(ContentType.objects.get_for_model(product).pk, product.pk):
+            raise Unavailable(_('An diesem Tag findet dieses Angebot nicht statt.'), code='not_running')
+        return None
+    if slot.remaining < seats:
+        if not slot.remaining:
+            raise Unavailable(_('An diesem Tag ist leider alles ausgebucht.'), code='sold_out')
+        raise Unavailable(
+            _('An diesem Tag sind nur noch %(remaining)s Plätze frei.') % {'remaining': slot.remaining},
+            code='not_enough_seats',
+        )
+    return slot
+
+
+def refresh_months(content_type_id, object_id, first, last):
+    """Rebuild the MonthAvailability rows of a product from first to last"""
+    month = first.replace(day=1)
+    while month <= last:
+        refresh_month(content_type_id, object_id, month)
+        month = (month + timedelta(days=32)).replace(day=1)
+
+
+def refresh_month(content_type_id, object_id, month):
+    """Rebuild one month from its slots"""
+    days = calendar.monthrange(month.year, month.month)[1]
+    with transaction.atomic():
+        # Lock the row first: concurrent refreshes then read each other's committed slots
+        availability, created = MonthAvailability.objects.select_for_update().get_or_create(
+            content_type_id=content_type_id,
+            object_id=object_id,
+            month=month,
+        )
+        seats = [None] * days
+        for day, capacity, held in Slot.objects.filter(
+            content_type_id=content_type_id,
+            object_id=object_id,
+            date__range=(month, month.replace(day=days)),
+        ).values_list('date', 'capacity', 'held'):
+            seats[day.day - 1] = max(0, capacity - held)
+        if created or seats != availability.seats:
+            availability.seats = seats
+            availability.save()
+
+
+def refresh_slot_month(slot_id):
+    """Rebuild the month of a slot whose seats changed"""
+    slot = Slot.objects.filter(pk=slot_id).values('content_type_id', 'object_id', 'date').first()
+    if slot is not None:
+        refresh_month(slot['content_type_id'], slot['object_id'], slot['date'].replace(day=1))
+
+
+def month_calendar(content_type, object_id, year, month):
+    """
+    Materialized availability of one month, with one query.
+    
+    None if the product has no schedule, i.e. every day is bookable.
+    """
+    availability = MonthAvailability.objects.filter(
+        content_type=content_type,
+        object_id=object_id,
+        month=date(year, month, 1),
+    ).first()
+    if availability is not None:
+        return availability
+    if not is_scheduled(content_type.pk, object_id):
+        return None
+    # Outside the generated horizon
+    return MonthAvailability(content_type=content_type, object_id=object_id, month=date(year, month, 1))
@@ -0,0 +1,123 @@
+"""
+Capacity slot tests for AusflugAgypten
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.contenttypes.models import ContentType
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.bookings.forms import BookingInquiryForm
+from apps.bookings.models import Booking
+from apps.core.tests.utils import test_settings
+from apps.tours.models import Location, Tour
+from ..models import Schedule, Slot
+from ..slots import Unavailable, reserve, sync_slots
+
+
+@test_settings
+class SlotTests(TestCase):
+    """Seats of a tour running every day except Sundays, 4 per day"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        location = Location.objects.create(name='Hurghada', name_en='Hurghada', slug='hurghada')
+        cls.tour = Tour.objects.create(
+            title='Wüstensafari', title_en='Desert safari', slug='wuestensafari',
+            description='x', description_en='x', location=location,
+            price=Decimal('50'), duration='4h', featured_image='tours/a.jpg',
+        )
+        cls.today = timezone.localdate()
+        cls.schedule = Schedule.objects.create(
+            content_type=ContentType.objects.get_for_model(Tour),
+            object_id=cls.tour.pk,
+            sunday=False,
+            capacity=4,
+        )
+        sync_slots(cls.schedule, start=cls.today, days=60)
+    
+    def day(self, offset, runs=True):
+        """First day from today + offset that the tour runs on (or not)"""
+        day = self.today + timedelta(days=offset)
+        while (day.weekday() != 6) != runs:
+            day += timedelta(days=1)
+        return day
+    
+    def slot(self, day):
+        return Slot.objects.get(object_id=self.tour.pk, date=day)
+    
+    def book(self, day, adults=1, **fields):
+        return Booking.objects.create(
+            tour=self.tour, customer_name='Gast', customer_email='gast@example.com', customer_phone='1',
+            booking_date=day, adults=adults, total_price=0, slot=reserve(self.tour, day, adults), **fields,
+        )
+    
+    def inquiry(self, day, adults):
+        return BookingInquiryForm({
+            'date': day, 'adults': adults, 'children': 0, 'babies': 0,
+            'name': 'Gast', 'email': 'gast@example.com', 'phone': '+49 30 123456',
+        }, tour=self.tour)
+    
+    def test_reserve_rejects_overbooking(self):
+        day = self.day(5)
+        self.book(day, adults=3)
+        self.assertEqual(reserve(self.tour, day, 1).held, 3)
+        with self.assertRaises(Unavailable) as raised:
+            reserve(self.tour, day, 2)
+        self.assertEqual(raised.exception.code, 'not_enough_seats')
+        self.book(day, adults=1)
+        with self.assertRaises(Unavailable) as raised:
+            reserve(self.tour, day, 1)
+        self.assertEqual(raised.exception.code, 'sold_out')
+        with self.assertRaises(Unavailable) as raised:
+            reserve(self.tour, self.day(5, runs=False), 1)
+        self.assertEqual(raised.exception.code, 'not_running')
+    
+    def test_bookings_move_their_seats(self):
+        day, other_day = self.day(5), self.day(12)
+        booking = self.book(day, adults=2)
+        self.assertEqual(self.slot(day).held, 2)
+        
+        booking = Booking.objects.get(pk=booking.pk)
+        booking.adults = 3
+        booking.save()
+        self.assertEqual(self.slot(day).held, 3)
+        
+        booking = Booking.objects.get(pk=booking.pk)
+        booking.booking_date = other_day
+        booking.save()
+        self.assertEqual((self.slot(day).held, self.slot(other_day).held), (0, 3))
+        
+        booking = Booking.objects.get(pk=booking.pk)
+        booking.status = 'cancelled'
+        booking.save()
+        self.assertEqual(self.slot(other_day).held, 0)
+    
+    def test_inquiry_form_errors(self):
+        day = self.day(5)
+        self.book(day, adults=3)
+        self.assertTrue(self.inquiry(day, 1).is_valid())
+        form = self.inquiry(day, 2)
+        self.assertFalse(form.is_valid())
+        self.assertIn('1', form.errors['date'][0])
+        self.assertIn('date', self.inquiry(self.day(5, runs=False), 1).errors)
+    
+    def test_shorter_sync_keeps_the_later_slots(self):
+        late_day = self.day(50)
+        self.book(late_day, adults=3)
+        total = Slot.objects.filter(object_id=self.tour.pk).count()
+        sync_slots(self.schedule, start=self.today, days=10)
+        self.assertEqual(Slot.objects.filter(object_id=self.tour.pk).count(), total)
+        self.assertEqual((self.slot(late_day).capacity, self.slot(late_day).held), (4, 3))
+    
+    def test_schedule_change_closes_booked_days(self):
+        booked, empty = self.day(8), self.day(9)
+        self.book(booked, adults=2)
+        self.schedule.monday = self.schedule.tuesday = self.schedule.wednesday = False
+        self.schedule.thursday = self.schedule.friday = self.schedule.saturday = False
+        self.schedule.save()
+        sync_slots(self.schedule, start=self.today, days=60)
+        self.assertEqual((self.slot(booked).capacity, self.slot(booked).held), (2, 2))
+        self.assertFalse(Slot.objects.filter(object_id=self.tour.pk, date=empty).exists())
@@ -0,0 +1,13 @@
+"""
+Availability URL patterns
+"""
+
+from django.urls import path
+from . import views
+
+app_name = 'availability'
+
+urlpatterns = [
+    path('<str:product_type>/<int:pk>/', views.MonthCalendarView.as_view(), name='current_month'),
+    path('<str:product_type>/<int:pk>/<int:year>/<int:month>/', views.MonthCalendarView.as_view(), name='calendar'),
+]
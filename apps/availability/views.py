@@ -0,0 +1,44 @@
+"""
+Availability views
+"""
+
+import hashlib
+import json
+
+from django.contrib.contenttypes.models import ContentType
+from django.http import Http404, HttpResponseNotModified, JsonResponse
+from django.utils import timezone
+from django.views.generic import View
+
+from .slots import get_product_model, month_calendar
+
+
+class MonthCalendarView(View):
+    """Remaining seats of one product for every day of a month (JSON), the current month by default"""
+    
+    def get(self, request, product_type, pk, year=None, month=None):
+        today = timezone.localdate()
+        year, month = year or today.year, month or today.month
+        model = get_product_model(product_type)
+        if model is None or not 1 <= month <= 12 or not 2000 <= year <= 2100:
+            raise Http404
+        
+        availability = month_calendar(ContentType.objects.get_for_model(model), pk, year, month)
+        seats = availability.seats if availability is not None else None
+        etag = '"%s"' % hashlib.md5(json.dumps(seats).encode()).hexdigest()
+        
+        # Date pickers revalidate on every use, unchanged months cost one small query
+        if etag in request.headers.get('If-None-Match', ''):
+            response = HttpResponseNotModified()
+        else:
+            days = availability.get_days() if availability is not None else {}
+            response = JsonResponse({
+                'month': f'{year}-{month:02d}',
+                # Without schedule every day is bookable
+                'scheduled': availability is not None,
+                # Days missing here do not take place
+                'days': {day.isoformat(): remaining for day, remaining in days.items()},
+            })
+        response['ETag'] = etag
+        response['Cache-Control'] = 'public, no-cache'
+        return response
@@ -3,6 +3,8 @@ Blog models for AusflugAgypten
 """
 
 from django.db import models
+from django.db.models import F, Q
+from django.db.models.functions import Coalesce
 from django.utils.text import slugify
 from django.urls import reverse
 from django.contrib.auth import get_user_model
@@ -69,6 +71,12 @@ class BlogPost(models.Model):
         indexes = [
             models.Index(fields=['slug']),
             models.Index(fields=['is_published', '-published_at']),
+            # Keyset pagination of the list, ordered by the date it shows
+            models.Index(
+                Coalesce('published_at', 'created_at').desc(), F('created_at').desc(), F('id').desc(),
+                condition=Q(is_published=True),
+                name='blog_published_sort_idx',
+            ),
         ]
     
     def __str__(self):
@@ -3,17 +3,20 @@ Blog views
 """
 
 from django.views.generic import ListView, DetailView
-from django.db.models import Q
+from django.db.models.functions import Coalesce
 from .models import BlogPost, BlogCategory
+from apps.search.backends import filter_by_search
+from apps.core.pagination import KeysetPaginationMixin
 from apps.core.models import PageHero
 
 
-class BlogListView(ListView):
+class BlogListView(KeysetPaginationMixin, ListView):
     """List all blog posts"""
     model = BlogPost
     template_name = 'blog/index.html'
     context_object_name = 'posts'
     paginate_by = 12
+    json_image_field = 'featured_image'
     
     def get_queryset(self):
         queryset = BlogPost.objects.filter(is_published=True).select_related('category', 'author')
@@ -26,15 +29,18 @@ class BlogListView(ListView):
         # Search
         search = self.request.GET.get('search')
         if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) |
-                Q(title_en__icontains=search) |
-                Q(excerpt__icontains=search) |
-                Q(excerpt_en__icontains=search) |
-                Q(content__icontains=search)
-            )
+            queryset = filter_by_search(queryset, search)
         
-        return queryset.order_by('-published_at', '-created_at')
+        # Posts without publication date sort by creation date, the same on every
+        # database, and keyset cursors never have to compare against NULL
+        return queryset.annotate(
+            published_sort=Coalesce('published_at', 'created_at')
+        ).order_by('-published_sort', '-created_at')
+    
+    def get_json_item(self, post):
+        item = super().get_json_item(post)
+        item.update(excerpt=post.excerpt, published_at=post.published_sort)
+        return item
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
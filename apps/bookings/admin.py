@@ -7,7 +7,7 @@ from django.utils.translation import gettext_lazy as _
 from django.utils.html import format_html
 from django.utils import timezone
 from datetime import timedelta
-from .models import Booking, Payment
+from .models import Booking, Payment, StripeEvent, StripePrice
 
 
 @admin.register(Booking)
@@ -18,16 +18,16 @@ class BookingAdmin(admin.ModelAdmin):
     list_filter = ['status', 'booking_date', 'created_at']
     search_fields = ['confirmation_code', 'customer_name', 'customer_email', 'customer_phone']
     date_hierarchy = 'booking_date'
-    readonly_fields = ['confirmation_code', 'created_at', 'updated_at']
+    readonly_fields = ['confirmation_code', 'slot', 'route', 'created_at', 'updated_at']
     list_editable = ['status']
     
     fieldsets = (
         ('📋 Booking Information', {
-            'fields': ('confirmation_code', 'booking_date', 'adults', 'children', 'babies', 'number_of_participants', 'total_price'),
+            'fields': ('confirmation_code', 'booking_date', 'slot', 'adults', 'children', 'babies', 'number_of_participants', 'total_price'),
             'description': 'Booking details and confirmation code'
         }),
         ('🎯 What They Booked', {
-            'fields': ('user', 'tour', 'excursion', 'activity', 'transfer'),
+            'fields': ('user', 'tour', 'excursion', 'activity', 'transfer', 'route'),
             'description': 'Which service was booked (only one will be filled)'
         }),
         ('👤 Customer Information', {
@@ -105,8 +105,8 @@ class PaymentAdmin(admin.ModelAdmin):
     
     list_display = ['get_booking_code', 'amount', 'currency', 'status', 'created_at', 'paid_at']
     list_filter = ['status', 'currency', 'created_at']
-    search_fields = ['booking__confirmation_code', 'stripe_payment_intent_id']
-    readonly_fields = ['booking', 'amount', 'currency', 'stripe_payment_intent_id', 'stripe_charge_id', 'created_at', 'updated_at', 'paid_at']
+    search_fields = ['booking__confirmation_code', 'stripe_checkout_session_id', 'stripe_payment_intent_id']
+    readonly_fields = ['booking', 'amount', 'currency', 'stripe_checkout_session_id', 'stripe_payment_intent_id', 'stripe_charge_id', 'created_at', 'updated_at', 'paid_at']
     date_hierarchy = 'created_at'
     
     fieldsets = (
@@ -115,7 +115,7 @@ class PaymentAdmin(admin.ModelAdmin):
             'description': 'Payment details and status'
         }),
         ('🔒 Stripe Details', {
-            'fields': ('stripe_payment_intent_id', 'stripe_charge_id'),
+            'fields': ('stripe_checkout_session_id', 'stripe_payment_intent_id', 'stripe_charge_id'),
             'description': 'Payment gateway transaction IDs'
         }),
         ('📅 Dates', {
@@ -133,3 +133,30 @@ class PaymentAdmin(admin.ModelAdmin):
     
     def has_add_permission(self, request):
         return False
+
+
+@admin.register(StripePrice)
+class StripePriceAdmin(admin.ModelAdmin):
+    """🏷️ Stripe Prices - Synced Stripe ids of the bookable products"""
+    
+    list_display = ['content_object', 'kind', 'stripe_product_id', 'stripe_price_id', 'updated_at']
+    list_filter = ['content_type', 'kind']
+    search_fields = ['stripe_product_id', 'stripe_price_id']
+    readonly_fields = ['content_type', 'object_id', 'kind', 'stripe_product_id', 'stripe_price_id', 'version', 'updated_at']
+    
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(StripeEvent)
+class StripeEventAdmin(admin.ModelAdmin):
+    """🔔 Stripe Events - Webhook deliveries and what they changed"""
+    
+    list_display = ['type', 'event_id', 'status', 'result', 'created_at', 'processed_at']
+    list_filter = ['status', 'type', 'created_at']
+    search_fields = ['event_id', 'result']
+    date_hierarchy = 'created_at'
+    readonly_fields = ['event_id', 'type', 'payload', 'status', 'result', 'created_at', 'processed_at']
+    
+    def has_add_permission(self, request):
+        return False
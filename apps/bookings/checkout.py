@@ -0,0 +1,143 @@
+"""
+Stripe Checkout for the bookable products of AusflugAgypten
+
+Every tour, excursion, activity and transfer gets one Stripe Product and a
+Price per line kind of its quotes (adult, child, ...) and price version;
+their ids are kept in StripePrice (and the cache), so a checkout normally
+makes a single call to Stripe: creating the session. Amounts come from
+apps.core.pricing.
+Booking and Payment are stored before that call, the session carries the
+payment id in its metadata and the webhooks (webhooks.py) take over from
+there.
+
+All calls go through one requests-based HTTP client, which keeps a
+keep-alive session per thread, with the key and base URL from the
+settings instead of the global stripe.api_key. STRIPE_API_BASE points
+tests at the local server in stripe_mock.py.
+"""
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db import transaction
+from stripe.api_requestor import APIRequestor
+from stripe.http_client import RequestsClient
+
+from .models import StripePrice
+
+
+CURRENCY = 'eur'
+
+# Seconds a checkout session (and the seats of its booking) stays open, Stripe's minimum is 30 minutes
+CHECKOUT_EXPIRY = getattr(settings, 'STRIPE_CHECKOUT_EXPIRY', 3600)
+
+_http_client = None
+
+
+def get_http_client():
+    """Shared HTTP client, its connections stay open between requests"""
+    global _http_client
+    if _http_client is None:
+        _http_client = RequestsClient(timeout=settings.STRIPE_TIMEOUT)
+    return _http_client
+
+
+def stripe_request(method, path, params=None, idempotency_key=None):
+    """Call the Stripe API and return the decoded response, raises stripe.error.StripeError"""
+    requestor = APIRequestor(
+        key=settings.STRIPE_SECRET_KEY,
+        client=get_http_client(),
+        api_base=settings.STRIPE_API_BASE,
+    )
+    headers = {'Idempotency-Key': idempotency_key} if idempotency_key else None
+    response, api_key = requestor.request(method, path, params, headers)
+    return response.data
+
+
+def price_version(product, kind, unit_price):
+    """Digest of everything a Stripe Price is created from"""
+    return hashlib.md5(f'{product.title}|{kind}|{unit_price}|{CURRENCY}'.encode()).hexdigest()
+
+
+def price_cache_key(content_type, product, kind, version):
+    return f'bookings:stripe-price:{content_type.pk}:{product.pk}:{kind}:{version}'
+
+
+def get_stripe_price(product, kind, unit_price):
+    """Id of the Stripe Price of one line kind (adult, child, ...) of product, synced on first use"""
+    content_type = ContentType.objects.get_for_model(product)
+    version = price_version(product, kind, unit_price)
+    key = price_cache_key(content_type, product, kind, version)
+    price_id = cache.get(key)
+    if price_id is not None:
+        return price_id
+    
+    with transaction.atomic():
+        # Concurrent checkouts of a changed product wait here instead of creating Prices twice
+        synced, created = StripePrice.objects.select_for_update().get_or_create(
+            content_type=content_type,
+            object_id=product.pk,
+            kind=kind,
+        )
+        if synced.version != version:
+            sync_stripe_price(synced, product, content_type, unit_price, version)
+    cache.set(key, synced.stripe_price_id, None)
+    return synced.stripe_price_id
+
+
+def sync_stripe_price(synced, product, content_type, unit_price, version):
+    """Create the Stripe Product if needed and a Price for version"""
+    if not synced.stripe_product_id:
+        # The line kinds of a product share its Stripe Product
+        synced.stripe_product_id = StripePrice.objects.filter(
+            content_type=content_type,
+            object_id=product.pk,
+        ).exclude(stripe_product_id='').values_list('stripe_product_id', flat=True).first() or ''
+    if synced.stripe_product_id:
+        stripe_request('post', f'/v1/products/{synced.stripe_product_id}', {'name': product.title})
+    else:
+        title_digest = hashlib.md5(product.title.encode()).hexdigest()
+        synced.stripe_product_id = stripe_request('post', '/v1/products', {
+            'name': product.title,
+            'metadata': {'model': content_type.model, 'id': product.pk},
+        }, idempotency_key=f'product-{content_type.pk}-{product.pk}-{title_digest}')['id']
+    synced.stripe_price_id = stripe_request('post', '/v1/prices', {
+        'product': synced.stripe_product_id,
+        'unit_amount': int(unit_price * 100),
+        'currency': CURRENCY,
+        'nickname': synced.kind,
+    }, idempotency_key=f'price-{content_type.pk}-{product.pk}-{version}')['id']
+    synced.version = version
+    synced.save()
+
+
+def get_line_items(product, quote):
+    """Stripe line items of a pricing Quote"""
+    return [
+        {'price': get_stripe_price(product, kind, unit_price), 'quantity': quantity}
+        for kind, unit_price, quantity in quote.lines
+    ]
+
+
+def create_checkout_session(payment, line_items, success_url, cancel_url):
+    """Stripe Checkout Session for a stored payment, the only call to Stripe of a checkout"""
+    booking = payment.booking
+    metadata = {'booking': booking.confirmation_code, 'payment_id': payment.pk}
+    session = stripe_request('post', '/v1/checkout/sessions', {
+        'mode': 'payment',
+        'line_items': line_items,
+        'customer_email': booking.customer_email,
+        'client_reference_id': booking.confirmation_code,
+        'success_url': success_url,
+        'cancel_url': cancel_url,
+        'expires_at': int(time.time()) + CHECKOUT_EXPIRY,
+        'metadata': metadata,
+        # Copied onto the PaymentIntent, the webhooks find the payment with it
+        'payment_intent_data': {'metadata': metadata},
+    }, idempotency_key=f'checkout-{booking.confirmation_code}')
+    payment.stripe_checkout_session_id = session['id']
+    payment.save(update_fields=['stripe_checkout_session_id', 'updated_at'])
+    return session
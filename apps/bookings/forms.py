@@ -3,6 +3,9 @@ Booking forms for AusflugAgypten
 """
 
 from django import forms
+from apps.availability.slots import Unavailable, reserve
+from apps.core.pricing import PER_KM, price_rules, quote
+from apps.transfers.models import TransferRoute
 from .models import Booking
 
 
@@ -54,6 +57,14 @@ class BookingInquiryForm(forms.ModelForm):
         })
     )
     
+    # Only offered for transfers, see __init__
+    route = forms.ModelChoiceField(
+        label="Strecke",
+        queryset=TransferRoute.objects.none(),
+        required=False,
+        widget=forms.Select(attrs={'class': 'input-field'}),
+    )
+    
     name = forms.CharField(
         label="Name",
         max_length=200,
@@ -103,6 +114,8 @@ class BookingInquiryForm(forms.ModelForm):
         self.activity = kwargs.pop('activity', None)
         self.transfer = kwargs.pop('transfer', None)
         super().__init__(*args, **kwargs)
+        if self.transfer is not None:
+            self.fields['route'].queryset = self.transfer.routes.filter(is_active=True)
     
     def clean_date(self):
         date = self.cleaned_data['date']
@@ -121,8 +134,40 @@ class BookingInquiryForm(forms.ModelForm):
         if total < 1:
             raise forms.ValidationError("Mindestens eine Person muss angegeben werden.")
         
+        product = self.get_product()
+        max_participants = getattr(product, 'max_participants', None)
+        if max_participants and total > max_participants:
+            raise forms.ValidationError(f"Maximal {max_participants} Teilnehmer pro Buchung.")
+        
+        # The per-km rate is no price of its own, only a route gives one
+        if self.transfer is not None and not cleaned_data.get('route') and price_rules(self.transfer).basis == PER_KM:
+            self.add_error('route', "Bitte wählen Sie eine Strecke, dieser Transfer wird nach Kilometern berechnet.")
+        
+        # Early check for a helpful message, the view checks again with the slot locked
+        date = cleaned_data.get('date')
+        if date and product is not None:
+            try:
+                reserve(product, date, total, lock=False)
+            except Unavailable as e:
+                self.add_error('date', e)
+        
         return cleaned_data
     
+    def get_product(self):
+        """The booked tour/excursion/activity/transfer"""
+        return self.tour or self.excursion or self.activity or self.transfer
+    
+    def get_quote(self):
+        """Price of the validated booking, transfers on their chosen route"""
+        data = self.cleaned_data
+        return quote(
+            self.get_product(),
+            data.get('adults') or 0,
+            data.get('children') or 0,
+            data.get('babies') or 0,
+            route=data.get('route'),
+        )
+    
     def save(self, commit=True):
         booking = super().save(commit=False)
         
@@ -141,34 +186,12 @@ class BookingInquiryForm(forms.ModelForm):
         booking.special_requests = self.cleaned_data.get('special_requests', '')
         
         # Set tour/excursion/activity/transfer
-        if self.tour:
-            booking.tour = self.tour
-            booking.excursion = None
-            booking.activity = None
-            booking.transfer = None
-            booking.total_price = self.tour.price * booking.number_of_participants
-        elif self.excursion:
-            booking.excursion = self.excursion
-            booking.tour = None
-            booking.activity = None
-            booking.transfer = None
-            booking.total_price = self.excursion.price * booking.number_of_participants
-        elif self.activity:
-            booking.activity = self.activity
-            booking.tour = None
-            booking.excursion = None
-            booking.transfer = None
-            booking.total_price = self.activity.price * booking.number_of_participants
-        elif self.transfer:
-            booking.transfer = self.transfer
-            booking.tour = None
-            booking.excursion = None
-            booking.activity = None
-            # For transfers, price might be per vehicle, not per person
-            if hasattr(self.transfer, 'price_per_person') and self.transfer.price_per_person:
-                booking.total_price = self.transfer.display_price * booking.number_of_participants
-            else:
-                booking.total_price = self.transfer.display_price
+        booking.tour = self.tour
+        booking.excursion = self.excursion
+        booking.activity = self.activity
+        booking.transfer = self.transfer
+        booking.route = self.cleaned_data.get('route')
+        booking.total_price = self.get_quote().total
         
         # Set status to pending
         booking.status = 'pending'
@@ -2,13 +2,19 @@
 Booking and Payment models for AusflugAgypten
 """
 
+from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.models import ContentType
 from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.utils import timezone
 from django.contrib.auth.models import User
+from apps.availability.models import Slot
+from apps.availability.slots import find_slot
 from apps.tours.models import Tour
 from apps.excursions.models import Excursion
 from apps.activities.models import Activity
-from apps.transfers.models import Transfer
+from apps.transfers.models import Transfer, TransferRoute
 
 
 class Booking(models.Model):
@@ -29,6 +35,8 @@ class Booking(models.Model):
     excursion = models.ForeignKey(Excursion, on_delete=models.CASCADE, related_name='bookings', null=True, blank=True)
     activity = models.ForeignKey(Activity, on_delete=models.CASCADE, related_name='bookings', null=True, blank=True)
     transfer = models.ForeignKey(Transfer, on_delete=models.CASCADE, related_name='bookings', null=True, blank=True)
+    # Booked route of a transfer, priced at the route's price
+    route = models.ForeignKey(TransferRoute, on_delete=models.SET_NULL, related_name='bookings', null=True, blank=True, verbose_name="Strecke")
     
     # Customer details
     customer_name = models.CharField(max_length=200, verbose_name="Name")
@@ -42,6 +50,8 @@ class Booking(models.Model):
     children = models.PositiveIntegerField(default=0, verbose_name="Kinder")
     babies = models.PositiveIntegerField(default=0, verbose_name="Babys")
     total_price = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Gesamtpreis")
+    # Capacity slot holding the seats, None for products without schedule
+    slot = models.ForeignKey(Slot, on_delete=models.SET_NULL, null=True, blank=True, related_name='bookings', verbose_name="Slot")
     
     # Status
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending', verbose_name="Status")
@@ -99,7 +109,29 @@ class Booking(models.Model):
         if self.number_of_participants == 0:
             self.number_of_participants = 1  # Ensure at least 1 participant
         
+        loaded_date = getattr(self, '_loaded_booking_date', None)
+        if self.slot_id and loaded_date and loaded_date != self.booking_date:
+            # Moved to another day by an admin, hold the seats there (without capacity check)
+            self.slot = find_slot(self.get_booked_item(), self.booking_date)
+        
         super().save(*args, **kwargs)
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the seats this booking held when loaded
+        if {'slot_id', 'status', 'number_of_participants'}.issubset(field_names):
+            instance._held_as = instance.held_as
+        if 'booking_date' in field_names:
+            instance._loaded_booking_date = instance.booking_date
+        return instance
+    
+    @property
+    def held_as(self):
+        """(slot_id, seats) if the booking holds seats, else None"""
+        if not self.slot_id or self.status == 'cancelled':
+            return None
+        return (self.slot_id, self.number_of_participants)
 
 
 class Payment(models.Model):
@@ -115,8 +147,9 @@ class Payment(models.Model):
     
     booking = models.OneToOneField(Booking, on_delete=models.CASCADE, related_name='payment')
     
-    # Stripe details
-    stripe_payment_intent_id = models.CharField(max_length=200, unique=True)
+    # Stripe details, the PaymentIntent is known once the customer pays the checkout session
+    stripe_checkout_session_id = models.CharField(max_length=200, blank=True)
+    stripe_payment_intent_id = models.CharField(max_length=200, unique=True, null=True, blank=True)
     stripe_charge_id = models.CharField(max_length=200, blank=True)
     
     # Payment details
@@ -137,3 +170,94 @@ class Payment(models.Model):
     def __str__(self):
         return f"Payment for {self.booking.confirmation_code} - {self.status}"
 
+
+class StripePrice(models.Model):
+    """Stripe Price of one line kind of a bookable product, a new Price for every price version"""
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    content_object = GenericForeignKey('content_type', 'object_id')
+    
+    # Line of a quote: adult, child, baby or booking
+    kind = models.CharField(max_length=20, default='adult', verbose_name="Art")
+    stripe_product_id = models.CharField(max_length=200, verbose_name="Stripe Product")
+    stripe_price_id = models.CharField(max_length=200, verbose_name="Stripe Price")
+    # Digest of what the Price was created from (name, kind, amount, currency)
+    version = models.CharField(max_length=32, verbose_name="Version")
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = "Stripe Price"
+        verbose_name_plural = "Stripe Prices"
+        constraints = [
+            models.UniqueConstraint(fields=['content_type', 'object_id', 'kind'], name='bookings_stripe_price_product'),
+        ]
+    
+    def __str__(self):
+        return f"{self.content_type.name} #{self.object_id} {self.kind}: {self.stripe_price_id}"
+
+
+class StripeEvent(models.Model):
+    """A Stripe webhook event, stored once per event id however often Stripe delivers it"""
+    
+    STATUS_CHOICES = [
+        ('received', 'Empfangen'),
+        ('processed', 'Verarbeitet'),
+        ('ignored', 'Ignoriert'),
+    ]
+    
+    event_id = models.CharField(max_length=255, unique=True, verbose_name="Event-ID")
+    type = models.CharField(max_length=100, verbose_name="Typ")
+    # data.object of the event as delivered
+    payload = models.JSONField(default=dict, verbose_name="Daten")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='received', verbose_name="Status")
+    result = models.CharField(max_length=255, blank=True, verbose_name="Ergebnis")
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = "Stripe Event"
+        verbose_name_plural = "Stripe Events"
+    
+    def __str__(self):
+        return f"{self.type} {self.event_id} ({self.get_status_display()})"
+
+
+_NOT_LOADED = object()
+
+
+def recount_held_seats(slot_id):
+    """Rebuild a slot's held seats from its bookings"""
+    held = Booking.objects.filter(slot_id=slot_id).exclude(status='cancelled').aggregate(
+        seats=models.Sum('number_of_participants'),
+    )['seats']
+    Slot.objects.filter(pk=slot_id).update(held=held or 0)
+
+
+@receiver(post_save, sender=Booking)
+def update_held_seats_on_save(sender, instance, created, raw=False, **kwargs):
+    """Move the booking's seats when it is created, cancelled, resized or moved"""
+    if raw:
+        return
+    old = None if created else getattr(instance, '_held_as', _NOT_LOADED)
+    new = instance.held_as
+    if old is _NOT_LOADED:
+        # Previous state unknown (e.g. deferred fields) - recount the slot
+        if instance.slot_id:
+            recount_held_seats(instance.slot_id)
+    elif old != new:
+        if old:
+            Slot.apply_held_delta(old[0], -old[1])
+        if new:
+            Slot.apply_held_delta(new[0], new[1])
+    instance._held_as = new
+    instance._loaded_booking_date = instance.booking_date
+
+
+@receiver(post_delete, sender=Booking)
+def release_held_seats_on_delete(sender, instance, **kwargs):
+    held = getattr(instance, '_held_as', instance.held_as)
+    if held:
+        Slot.apply_held_delta(held[0], -held[1])
@@ -0,0 +1,189 @@
+"""
+Local stand-in for Stripe of AusflugAgypten
+
+Builds webhook events the way Stripe sends them and signs them with a
+webhook secret, so tests and `manage.py bench` can deliver them without
+network access or a Stripe account:
+
+    event = make_event('payment_intent.succeeded', payment_intent('pi_123'))
+    payload, signature = sign_event(event, settings.STRIPE_WEBHOOK_SECRET)
+    client.post(url, payload, content_type='application/json', HTTP_STRIPE_SIGNATURE=signature)
+
+StripeMockServer answers the API calls of checkout.py on localhost:
+
+    with StripeMockServer() as server, override_settings(STRIPE_API_BASE=server.url):
+        ...
+"""
+
+import hashlib
+import hmac
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl
+
+
+def make_id(prefix):
+    """Random id in Stripe's format, e.g. evt_1f0c..."""
+    return f'{prefix}_{uuid.uuid4().hex[:24]}'
+
+
+def payment_intent(intent_id, amount=0, status='succeeded', currency='eur'):
+    """PaymentIntent object of an event"""
+    return {
+        'id': intent_id,
+        'object': 'payment_intent',
+        'amount': amount,
+        'currency': currency,
+        'status': status,
+        'latest_charge': make_id('ch') if status == 'succeeded' else None,
+    }
+
+
+def charge(intent_id, amount=0, refunded=True):
+    """Charge object of a charge.* event"""
+    return {
+        'id': make_id('ch'),
+        'object': 'charge',
+        'payment_intent': intent_id,
+        'amount': amount,
+        'amount_refunded': amount if refunded else 0,
+        'refunded': refunded,
+    }
+
+
+def make_event(event_type, obj, event_id=None):
+    """Event envelope around obj, a new event id unless a redelivery's is given"""
+    return {
+        'id': event_id or make_id('evt'),
+        'object': 'event',
+        'type': event_type,
+        'created': int(time.time()),
+        'livemode': False,
+        'data': {'object': obj},
+    }
+
+
+def sign_event(event, secret, timestamp=None):
+    """JSON payload of event and its Stripe-Signature header"""
+    payload = json.dumps(event)
+    timestamp = int(timestamp or time.time())
+    signature = hmac.new(secret.encode(), f'{timestamp}.{payload}'.encode(), hashlib.sha256).hexdigest()
+    return payload, f't={timestamp},v1={signature}'
+
+
+class StripeMockServer:
+    """
+    Products, prices and checkout sessions of the Stripe API on a free local port.
+    
+    Idempotency keys are honoured like Stripe does. requests records
+    (method, path, params) of every call, connections counts the TCP
+    connections opened; paths in fail_paths answer with an API error.
+    """
+    
+    def __init__(self, fail_paths=()):
+        self.fail_paths = set(fail_paths)
+        self.requests = []
+        self.connections = 0
+        self.objects = {}
+        self.idempotent = {}
+        self.lock = threading.Lock()
+    
+    def __enter__(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self.make_handler())
+        self.server.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self.server.server_port}'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+    
+    def make_handler(self):
+        mock = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            # Keep-alive like api.stripe.com
+            protocol_version = 'HTTP/1.1'
+            
+            def setup(self):
+                super().setup()
+                with mock.lock:
+                    mock.connections += 1
+            
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0))).decode()
+                params = dict(parse_qsl(body))
+                if not self.headers.get('Authorization', '').startswith('Bearer '):
+                    return self.respond(401, {'error': {'type': 'invalid_request_error', 'message': 'No API key'}})
+                status, data = mock.handle(self.path, params, self.headers.get('Idempotency-Key'))
+                self.respond(status, data)
+            
+            def respond(self, status, data):
+                content = json.dumps(data).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(content)))
+                self.send_header('Request-Id', make_id('req'))
+                self.end_headers()
+                self.wfile.write(content)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        return Handler
+    
+    def handle(self, path, params, idempotency_key):
+        """(status, JSON data) of a POST"""
+        with self.lock:
+            self.requests.append(('POST', path, params))
+            if idempotency_key in self.idempotent:
+                return self.idempotent[idempotency_key]
+            if path in self.fail_paths:
+                result = 500, {'error': {'type': 'api_error', 'message': 'Mock failure'}}
+            else:
+                result = self.create(path, params)
+            if idempotency_key:
+                self.idempotent[idempotency_key] = result
+            return result
+    
+    def create(self, path, params):
+        if path == '/v1/products':
+            obj = {'id': make_id('prod'), 'object': 'product', 'name': params.get('name')}
+        elif path.startswith('/v1/products/'):
+            obj = self.objects.get(path.rsplit('/', 1)[1])
+            if obj is None:
+                return 404, {'error': {'type': 'invalid_request_error', 'message': 'No such product'}}
+            obj['name'] = params.get('name', obj['name'])
+        elif path == '/v1/prices':
+            obj = {
+                'id': make_id('price'),
+                'object': 'price',
+                'product': params['product'],
+                'unit_amount': int(params['unit_amount']),
+                'currency': params['currency'],
+                'nickname': params.get('nickname'),
+            }
+        elif path == '/v1/checkout/sessions':
+            lines = [
+                (self.objects[params[f'line_items[{i}][price]']], int(params[f'line_items[{i}][quantity]']))
+                for i in range(len([key for key in params if key.endswith('][price]')]))
+            ]
+            session_id = make_id('cs_test')
+            obj = {
+                'id': session_id,
+                'object': 'checkout.session',
+                'url': f'https://checkout.stripe.com/c/pay/{session_id}',
+                'amount_total': sum(price['unit_amount'] * quantity for price, quantity in lines),
+                'currency': lines[0][0]['currency'],
+                'client_reference_id': params.get('client_reference_id'),
+                'payment_intent': None,
+                'status': 'open',
+            }
+        else:
+            return 404, {'error': {'type': 'invalid_request_error', 'message': f'Unrecognized request URL {path}'}}
+        self.objects[obj['id']] = obj
+        return 200, obj
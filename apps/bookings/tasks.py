@@ -0,0 +1,13 @@
+"""
+Background tasks for Bookings app
+"""
+
+from apps.jobs.queue import task
+
+from .webhooks import apply_event
+
+
+@task('bookings.apply_stripe_event')
+def apply_stripe_event(event_id):
+    """Apply a Stripe webhook event to its payment and booking"""
+    apply_event(event_id)
@@ -0,0 +1,180 @@
+"""
+Stripe Checkout tests for AusflugAgypten
+"""
+
+import json
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from apps.activities.models import Activity
+from apps.core.tests.utils import TemporaryMediaMixin, seed_test_data, test_settings
+from apps.excursions.models import Excursion
+from apps.tours.models import Location, Tour
+from apps.transfers.models import Transfer, TransferRoute
+from ..checkout import get_http_client
+from ..models import Payment, StripePrice
+from ..stripe_mock import StripeMockServer, make_event, payment_intent
+from ..webhooks import apply_transition
+
+
+@test_settings
+class CheckoutTests(TemporaryMediaMixin, TestCase):
+    """Checkout of every bookable type against the local Stripe stand-in"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        seed_test_data(count=2)
+        cls.products = {
+            'tour': Tour.objects.filter(is_active=True).first(),
+            'excursion': Excursion.objects.filter(is_active=True).first(),
+            'activity': Activity.objects.filter(is_active=True).first(),
+            'transfer': Transfer.objects.filter(is_active=True).first(),
+        }
+    
+    def setUp(self):
+        cache.clear()
+        self.stripe = StripeMockServer().__enter__()
+        self.addCleanup(self.stripe.__exit__)
+        settings = override_settings(STRIPE_API_BASE=self.stripe.url, STRIPE_SECRET_KEY='sk_test_mock')
+        settings.enable()
+        self.addCleanup(settings.disable)
+        # A new server, so no connection of an earlier test to reuse
+        self.addCleanup(lambda: setattr(get_http_client()._thread_local, 'session', None))
+    
+    def checkout(self, product_type, adults=2, **data):
+        product = self.products[product_type]
+        return self.client.post(reverse('bookings:create_checkout'), json.dumps({
+            f'{product_type}_id': product.pk,
+            'date': (date.today() + timedelta(days=10)).isoformat(),
+            'adults': adults,
+            'name': 'Gast',
+            'email': 'gast@example.com',
+            'phone': '+49 30 123456',
+            **data,
+        }), content_type='application/json')
+    
+    def calls(self, path):
+        return [params for method, called, params in self.stripe.requests if called == path]
+    
+    def test_every_bookable_type(self):
+        for product_type, product in self.products.items():
+            with self.subTest(product_type):
+                response = self.checkout(product_type)
+                self.assertEqual(response.status_code, 200, response.content)
+                session_id = response.json()['sessionId']
+                payment = Payment.objects.get(stripe_checkout_session_id=session_id)
+                self.assertEqual((payment.status, payment.booking.status), ('pending', 'pending'))
+                self.assertEqual(getattr(payment.booking, product_type), product)
+                # Stripe charges what the booking says
+                self.assertEqual(self.stripe.objects[session_id]['amount_total'], int(payment.amount * 100))
+        self.assertEqual(StripePrice.objects.count(), 4)
+    
+    def test_synced_prices_leave_one_call_per_checkout(self):
+        self.checkout('tour')
+        self.stripe.requests.clear()
+        self.checkout('tour', adults=3)
+        self.assertEqual([path for method, path, params in self.stripe.requests], ['/v1/checkout/sessions'])
+        # Stored ids are enough when the cache was emptied
+        cache.clear()
+        self.checkout('tour')
+        self.assertEqual(len(self.calls('/v1/prices')), 0)
+    
+    def test_price_change_creates_a_new_price(self):
+        self.checkout('tour')
+        tour = self.products['tour']
+        tour.price += 10
+        tour.save()
+        self.stripe.requests.clear()
+        self.checkout('tour', adults=1)
+        self.assertEqual(len(self.calls('/v1/products')), 0)
+        self.assertEqual([params['unit_amount'] for params in self.calls('/v1/prices')], [str(int(tour.price * 100))])
+    
+    def test_party_is_charged_per_line(self):
+        tour = self.products['tour']
+        session_id = self.checkout('tour', adults=2, children=1, babies=1).json()['sessionId']
+        session = self.calls('/v1/checkout/sessions')[0]
+        # Babies travel free by default, so they get no line
+        self.assertEqual([session[f'line_items[{i}][quantity]'] for i in range(2)], ['2', '1'])
+        self.assertNotIn('line_items[2][price]', session)
+        self.assertEqual(sorted(StripePrice.objects.values_list('kind', flat=True)), ['adult', 'child'])
+        payment = Payment.objects.get(stripe_checkout_session_id=session_id)
+        self.assertEqual(payment.amount, tour.price * 3)
+        self.assertEqual(self.stripe.objects[session_id]['amount_total'], int(payment.amount * 100))
+    
+    def add_route(self, transfer, price, **fields):
+        origin, destination = [
+            Location.objects.create(name=name, name_en=name, slug=f'route-{name.lower()}-{price}')
+            for name in ['Flughafen', 'Hotel']
+        ]
+        return TransferRoute.objects.create(
+            transfer=transfer, from_location=origin, to_location=destination,
+            estimated_duration=45, price=Decimal(price), **fields,
+        )
+    
+    def test_transfer_is_charged_on_its_route(self):
+        transfer = self.products['transfer']
+        Transfer.objects.filter(pk=transfer.pk).update(
+            base_price=Decimal('100.00'), discount_price=None, price_per_person=False, price_per_km=False,
+        )
+        route = self.add_route(transfer, '45.00')
+        session_id = self.checkout('transfer', adults=3, route_id=route.pk).json()['sessionId']
+        payment = Payment.objects.get(stripe_checkout_session_id=session_id)
+        self.assertEqual((payment.amount, payment.booking.route), (Decimal('45.00'), route))
+        self.assertEqual(self.stripe.objects[session_id]['amount_total'], 4500)
+        # Routes of other transfers or inactive ones are no choice
+        inactive = self.add_route(transfer, '20.00', is_active=False)
+        self.assertIn('route', self.checkout('transfer', route_id=inactive.pk).json()['errors'])
+    
+    def test_per_km_transfer_needs_a_route(self):
+        transfer = self.products['transfer']
+        Transfer.objects.filter(pk=transfer.pk).update(
+            base_price=Decimal('2.50'), discount_price=None, price_per_person=False, price_per_km=True,
+        )
+        response = self.checkout('transfer')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('route', response.json()['errors'])
+        self.assertFalse(self.stripe.requests)
+        
+        route = self.add_route(transfer, '80.00')
+        session_id = self.checkout('transfer', route_id=route.pk).json()['sessionId']
+        self.assertEqual(Payment.objects.get(stripe_checkout_session_id=session_id).amount, Decimal('80.00'))
+    
+    def test_connections_are_kept_alive(self):
+        for _ in range(3):
+            self.checkout('excursion')
+        self.assertEqual(len(self.stripe.requests), 5)
+        self.assertEqual(self.stripe.connections, 1)
+    
+    def test_invalid_requests(self):
+        self.assertEqual(self.client.post(reverse('bookings:create_checkout'), 'x', content_type='application/json').status_code, 400)
+        self.assertEqual(self.checkout('tour', adults=0).status_code, 400)
+        self.assertFalse(self.stripe.requests)
+    
+    def test_stripe_failure_cancels_the_booking(self):
+        self.stripe.fail_paths.add('/v1/checkout/sessions')
+        response = self.checkout('activity')
+        self.assertEqual(response.status_code, 502)
+        payment = Payment.objects.get(booking__activity=self.products['activity'], booking__customer_name='Gast')
+        self.assertEqual((payment.status, payment.booking.status), ('failed', 'cancelled'))
+    
+    def test_webhooks_find_the_payment_of_a_session(self):
+        session_id = self.checkout('transfer').json()['sessionId']
+        payment = Payment.objects.get(stripe_checkout_session_id=session_id)
+        intent = payment_intent('pi_checkout') | {'metadata': {'payment_id': str(payment.pk)}}
+        
+        self.assertEqual(apply_transition('payment_intent.succeeded', intent)[0], 'processed')
+        payment.refresh_from_db()
+        self.assertEqual((payment.stripe_payment_intent_id, payment.status, payment.booking.status), ('pi_checkout', 'succeeded', 'confirmed'))
+        # Paid sessions do not expire
+        expired = make_event('checkout.session.expired', {'id': session_id})['data']['object']
+        self.assertEqual(apply_transition('checkout.session.expired', expired)[0], 'ignored')
+    
+    def test_expired_session_releases_the_booking(self):
+        session_id = self.checkout('tour').json()['sessionId']
+        self.assertEqual(apply_transition('checkout.session.expired', {'id': session_id})[0], 'processed')
+        payment = Payment.objects.get(stripe_checkout_session_id=session_id)
+        self.assertEqual((payment.status, payment.booking.status), ('failed', 'cancelled'))
@@ -0,0 +1,112 @@
+"""
+Stripe webhook tests for AusflugAgypten
+"""
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from apps.core.tests.utils import test_settings
+from apps.jobs.models import Job
+from apps.jobs.queue import claim_next, run_job
+from apps.tours.models import Location, Tour
+from ..models import Booking, Payment, StripeEvent
+from ..stripe_mock import charge, make_event, payment_intent, sign_event
+
+
+WEBHOOK_SECRET = 'whsec_test'
+
+
+@test_settings
+@override_settings(STRIPE_WEBHOOK_SECRET=WEBHOOK_SECRET)
+class StripeWebhookTests(TestCase):
+    """Deliveries are stored once and applied once by the job worker"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        location = Location.objects.create(name='Kairo', name_en='Cairo', slug='kairo')
+        tour = Tour.objects.create(
+            title='Pyramiden', title_en='Pyramids', slug='pyramiden', description='x', description_en='x',
+            location=location, price=Decimal('50'), duration='4h', featured_image='tours/a.jpg',
+        )
+        cls.booking = Booking.objects.create(
+            tour=tour, customer_name='Gast', customer_email='gast@example.com', customer_phone='1',
+            booking_date=date.today() + timedelta(days=7), adults=2, total_price=Decimal('100'),
+        )
+        cls.payment = Payment.objects.create(booking=cls.booking, stripe_payment_intent_id='pi_1', amount=Decimal('100'))
+    
+    def deliver(self, event, secret=WEBHOOK_SECRET):
+        payload, signature = sign_event(event, secret)
+        return self.client.post(
+            reverse('bookings:stripe_webhook'), payload,
+            content_type='application/json', HTTP_STRIPE_SIGNATURE=signature,
+        )
+    
+    def run_worker(self):
+        while (job := claim_next()) is not None:
+            run_job(job)
+    
+    def assert_states(self, payment_status, booking_status):
+        self.payment.refresh_from_db()
+        self.booking.refresh_from_db()
+        self.assertEqual((self.payment.status, self.booking.status), (payment_status, booking_status))
+    
+    def test_invalid_signature_is_rejected(self):
+        response = self.deliver(make_event('payment_intent.succeeded', payment_intent('pi_1')), secret='whsec_other')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(StripeEvent.objects.exists())
+    
+    def test_acknowledged_before_it_is_applied(self):
+        with self.assertNumQueries(4):
+            response = self.deliver(make_event('payment_intent.succeeded', payment_intent('pi_1')))
+        self.assertEqual(response.status_code, 200)
+        self.assert_states('pending', 'pending')
+        
+        self.run_worker()
+        self.assert_states('succeeded', 'confirmed')
+        self.assertTrue(self.payment.stripe_charge_id)
+        self.assertIsNotNone(self.payment.paid_at)
+        self.assertEqual(StripeEvent.objects.get().status, 'processed')
+    
+    def test_redeliveries_are_applied_once(self):
+        event = make_event('payment_intent.succeeded', payment_intent('pi_1'))
+        for _ in range(3):
+            self.assertEqual(self.deliver(event).status_code, 200)
+        self.assertEqual(StripeEvent.objects.count(), 1)
+        self.assertEqual(Job.objects.filter(task='bookings.apply_stripe_event').count(), 1)
+        
+        self.run_worker()
+        # A retried job finds the event processed
+        job = Job.objects.get(task='bookings.apply_stripe_event')
+        job.status = Job.STATUS_RUNNING
+        run_job(job)
+        self.assert_states('succeeded', 'confirmed')
+    
+    def test_out_of_order_events_do_not_undo_a_payment(self):
+        self.deliver(make_event('payment_intent.succeeded', payment_intent('pi_1')))
+        self.deliver(make_event('payment_intent.payment_failed', payment_intent('pi_1', status='requires_payment_method')))
+        self.run_worker()
+        self.assert_states('succeeded', 'confirmed')
+        self.assertEqual(
+            sorted(StripeEvent.objects.values_list('type', 'status')),
+            [('payment_intent.payment_failed', 'ignored'), ('payment_intent.succeeded', 'processed')],
+        )
+    
+    def test_full_refund_cancels_the_booking(self):
+        self.deliver(make_event('payment_intent.succeeded', payment_intent('pi_1')))
+        self.deliver(make_event('charge.refunded', charge('pi_1', refunded=False)))
+        self.run_worker()
+        self.assert_states('succeeded', 'confirmed')
+        
+        self.deliver(make_event('charge.refunded', charge('pi_1')))
+        self.run_worker()
+        self.assert_states('refunded', 'cancelled')
+    
+    def test_unknown_payments_and_types_are_ignored(self):
+        self.deliver(make_event('payment_intent.succeeded', payment_intent('pi_unknown')))
+        self.deliver(make_event('customer.created', {'id': 'cus_1'}))
+        self.run_worker()
+        self.assertEqual(list(StripeEvent.objects.values_list('status', flat=True)), ['ignored'])
+        self.assert_states('pending', 'pending')
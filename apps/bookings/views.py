@@ -9,91 +9,123 @@ from django.utils.decorators import method_decorator
 from django.conf import settings
 from django.shortcuts import get_object_or_404, redirect
 from django.contrib import messages
+from django.db import transaction
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 import stripe
 import json
+import logging
 
 from apps.tours.models import Tour
 from apps.excursions.models import Excursion
 from apps.activities.models import Activity
 from apps.transfers.models import Transfer
+from apps.availability.slots import Unavailable, reserve
+from .checkout import create_checkout_session, get_line_items
 from .models import Booking, Payment
 from .forms import BookingInquiryForm
+from .webhooks import PAYMENT_TRANSITIONS, record_event
 
-stripe.api_key = settings.STRIPE_SECRET_KEY
+logger = logging.getLogger(__name__)
+
+# POST keys of the bookable products and their models
+BOOKABLE_PRODUCTS = [
+    ('tour', Tour),
+    ('excursion', Excursion),
+    ('activity', Activity),
+    ('transfer', Transfer),
+]
 
 
 class CreateCheckoutSessionView(View):
-    """Create Stripe checkout session"""
+    """Store the booking with a pending payment and open a Stripe Checkout session for it (JSON)"""
     
     def post(self, request, *args, **kwargs):
         try:
             data = json.loads(request.body)
-            tour_id = data.get('tour_id')
-            participants = int(data.get('participants', 1))
-            
-            tour = get_object_or_404(Tour, id=tour_id, is_active=True)
-            
-            # Calculate total price
-            total_price = tour.price * participants
-            
-            # Create Stripe checkout session
-            session = stripe.checkout.Session.create(
-                payment_method_types=['card'],
-                line_items=[{
-                    'price_data': {
-                        'currency': 'eur',
-                        'product_data': {
-                            'name': tour.title,
-                            'description': tour.short_description,
-                        },
-                        'unit_amount': int(tour.price * 100),  # Convert to cents
-                    },
-                    'quantity': participants,
-                }],
-                mode='payment',
+        except ValueError:
+            return JsonResponse({'error': _('Ungültige Buchungsanfrage.')}, status=400)
+        
+        for name, model in BOOKABLE_PRODUCTS:
+            if str(data.get(f'{name}_id', '')).isdigit():
+                product = get_object_or_404(model, id=data[f'{name}_id'], is_active=True)
+                break
+        else:
+            return JsonResponse({'error': _('Ungültige Buchungsanfrage.')}, status=400)
+        
+        # 'participants' of older clients counts adults
+        data.setdefault('adults', data.get('participants', 1))
+        data.setdefault('children', 0)
+        data.setdefault('babies', 0)
+        data.setdefault('route', data.get('route_id'))
+        form = BookingInquiryForm(data, **{name: product})
+        if not form.is_valid():
+            return JsonResponse({'errors': form.errors.get_json_data()}, status=400)
+        
+        booking_quote = form.get_quote()
+        if not booking_quote.total:
+            return JsonResponse({'error': _('Diese Buchung ist kostenlos, bitte senden Sie eine Anfrage.')}, status=400)
+        
+        try:
+            # Cached after the first checkout of these prices, no call to Stripe
+            line_items = get_line_items(product, booking_quote)
+        except stripe.error.StripeError:
+            logger.exception('Could not sync the Stripe price of %s #%s', name, product.pk)
+            return JsonResponse({'error': _('Die Zahlung ist gerade nicht möglich. Bitte versuchen Sie es später erneut.')}, status=502)
+        
+        try:
+            with transaction.atomic():
+                booking = form.save(commit=False)
+                if request.user.is_authenticated:
+                    booking.user = request.user
+                booking.slot = reserve(product, booking.booking_date, booking.number_of_participants)
+                booking.save()
+                payment = Payment.objects.create(booking=booking, amount=booking.total_price)
+        except Unavailable as e:
+            return JsonResponse({'error': e.messages[0]}, status=409)
+        
+        try:
+            session = create_checkout_session(
+                payment,
+                line_items,
                 success_url=request.build_absolute_uri(reverse('bookings:success')),
                 cancel_url=request.build_absolute_uri(reverse('bookings:cancel')),
-                metadata={
-                    'tour_id': tour.id,
-                    'participants': participants,
-                }
             )
-            
-            return JsonResponse({'sessionId': session.id})
-            
-        except Exception as e:
-            return JsonResponse({'error': str(e)}, status=400)
+        except stripe.error.StripeError:
+            logger.exception('Could not create the checkout session of booking %s', booking.confirmation_code)
+            # Release the seats again
+            payment.status = 'failed'
+            payment.save(update_fields=['status', 'updated_at'])
+            booking.status = 'cancelled'
+            booking.save(update_fields=['status', 'updated_at'])
+            return JsonResponse({'error': _('Die Zahlung ist gerade nicht möglich. Bitte versuchen Sie es später erneut.')}, status=502)
+        
+        return JsonResponse({'sessionId': session['id'], 'url': session['url']})
 
 
 @method_decorator(csrf_exempt, name='dispatch')
 class StripeWebhookView(View):
-    """Handle Stripe webhooks"""
+    """Acknowledge Stripe webhooks, the run_jobs worker applies them (see webhooks.py)"""
     
     def post(self, request, *args, **kwargs):
-        payload = request.body
-        sig_header = request.META.get('HTTP_STRIPE_SIGNATURE')
+        sig_header = request.META.get('HTTP_STRIPE_SIGNATURE', '')
         
         try:
-            event = stripe.Webhook.construct_event(
-                payload, sig_header, settings.STRIPE_WEBHOOK_SECRET
+            payload = request.body.decode('utf-8')
+            # Plain verification and JSON, building a stripe.Event would only slow down the answer
+            stripe.WebhookSignature.verify_header(
+                payload, sig_header, settings.STRIPE_WEBHOOK_SECRET, stripe.Webhook.DEFAULT_TOLERANCE
             )
+            event = json.loads(payload)
         except ValueError:
             return HttpResponse(status=400)
         except stripe.error.SignatureVerificationError:
             return HttpResponse(status=400)
         
-        # Handle the event
-        if event['type'] == 'payment_intent.succeeded':
-            payment_intent = event['data']['object']
-            # Update booking and payment status
-            # TODO: Implement booking creation and update logic
-            
-        elif event['type'] == 'payment_intent.payment_failed':
-            payment_intent = event['data']['object']
-            # Handle failed payment
-            
+        # Other event types are acknowledged without being stored
+        if event.get('id') and event.get('type') in PAYMENT_TRANSITIONS:
+            record_event(event['id'], event['type'], event.get('data', {}).get('object', {}))
+        
         return HttpResponse(status=200)
 
 
@@ -144,13 +176,20 @@ class BookingInquiryView(View):
             return redirect('core:home')
         
         if form.is_valid():
-            booking = form.save(commit=False)
-            
-            # Link to user if authenticated
-            if request.user.is_authenticated:
-                booking.user = request.user
-            
-            booking.save()
+            try:
+                with transaction.atomic():
+                    booking = form.save(commit=False)
+                    
+                    # Link to user if authenticated
+                    if request.user.is_authenticated:
+                        booking.user = request.user
+                    
+                    # The slot stays locked until the booking is saved, concurrent inquiries wait
+                    booking.slot = reserve(form.get_product(), booking.booking_date, booking.number_of_participants)
+                    booking.save()
+            except Unavailable as e:
+                messages.error(request, e.messages[0])
+                return redirect(redirect_url)
             
             messages.success(
                 request,
@@ -161,7 +200,10 @@ class BookingInquiryView(View):
         else:
             for field, errors in form.errors.items():
                 for error in errors:
-                    messages.error(request, f"{form.fields[field].label}: {error}")
+                    # Errors of the whole form (participants) have no field label
+                    if field in form.fields:
+                        error = f"{form.fields[field].label}: {error}"
+                    messages.error(request, error)
             return redirect(redirect_url)
 
 
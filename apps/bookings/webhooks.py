@@ -0,0 +1,113 @@
+"""
+Stripe webhook processing for AusflugAgypten
+
+StripeWebhookView only checks the signature, stores the event and queues
+a job, so Stripe gets its answer before any booking is touched. Stripe
+delivers every event at least once and retries until it is acknowledged:
+the unique event_id of StripeEvent turns redeliveries into no-ops, and
+apply_event() locks the event and its payment, so concurrent workers
+never apply a transition twice. Transitions that do not fit the current
+state (a late payment_failed after succeeded, ...) are ignored.
+"""
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from apps.jobs.queue import enqueue
+
+from .models import Payment, StripeEvent
+
+
+# Event type: (new payment status, payment statuses it may follow)
+PAYMENT_TRANSITIONS = {
+    'payment_intent.processing': ('processing', {'pending'}),
+    'payment_intent.succeeded': ('succeeded', {'pending', 'processing', 'failed'}),
+    'payment_intent.payment_failed': ('failed', {'pending', 'processing'}),
+    'charge.refunded': ('refunded', {'succeeded'}),
+    'checkout.session.expired': ('failed', {'pending'}),
+}
+
+# Event type: (new booking status, booking statuses it may follow)
+BOOKING_TRANSITIONS = {
+    'payment_intent.succeeded': ('confirmed', {'pending'}),
+    'charge.refunded': ('cancelled', {'pending', 'confirmed'}),
+    # The customer never paid, release the seats
+    'checkout.session.expired': ('cancelled', {'pending'}),
+}
+
+
+def record_event(event_id, event_type, payload):
+    """Store a delivered event and queue it for the worker, False for a redelivery"""
+    try:
+        with transaction.atomic():
+            StripeEvent.objects.create(event_id=event_id, type=event_type, payload=payload)
+            enqueue('bookings.apply_stripe_event', event_id=event_id)
+    except IntegrityError:
+        # Delivered before, possibly at the same moment by another request
+        return False
+    return True
+
+
+def apply_event(event_id):
+    """Apply a recorded event to its payment and booking, once"""
+    with transaction.atomic():
+        event = StripeEvent.objects.select_for_update().get(event_id=event_id)
+        if event.status != 'received':
+            return event
+        event.status, event.result = apply_transition(event.type, event.payload)
+        event.processed_at = timezone.now()
+        event.save(update_fields=['status', 'result', 'processed_at'])
+    return event
+
+
+def find_payment(event_type, obj):
+    """Locked payment of an event's data.object, None if there is none"""
+    payments = Payment.objects.select_for_update().select_related('booking')
+    if event_type.startswith('checkout.session.'):
+        return payments.filter(stripe_checkout_session_id=obj.get('id')).first()
+    
+    intent_id = obj.get('payment_intent') if event_type.startswith('charge.') else obj.get('id')
+    if not intent_id:
+        return None
+    payment = payments.filter(stripe_payment_intent_id=intent_id).first()
+    payment_id = (obj.get('metadata') or {}).get('payment_id', '')
+    if payment is None and str(payment_id).isdigit():
+        # First event of a checkout session's PaymentIntent
+        payment = payments.filter(pk=payment_id, stripe_payment_intent_id__isnull=True).first()
+        if payment is not None:
+            payment.stripe_payment_intent_id = intent_id
+            payment.save(update_fields=['stripe_payment_intent_id', 'updated_at'])
+    return payment
+
+
+def apply_transition(event_type, obj):
+    """Update the payment and booking of an event, returns (event status, result)"""
+    if event_type not in PAYMENT_TRANSITIONS:
+        return 'ignored', 'Event type not handled'
+    if event_type == 'charge.refunded' and not obj.get('refunded'):
+        return 'ignored', 'Partial refund'
+    
+    payment = find_payment(event_type, obj)
+    if payment is None:
+        return 'ignored', f'No payment for {obj.get("payment_intent") or obj.get("id")}'
+    
+    status, follows = PAYMENT_TRANSITIONS[event_type]
+    if payment.status not in follows:
+        return 'ignored', f'Payment {payment.pk} is already {payment.status}'
+    result = f'Payment {payment.pk}: {payment.status} → {status}'
+    payment.status = status
+    update_fields = ['status', 'updated_at']
+    if status == 'succeeded':
+        payment.paid_at = timezone.now()
+        payment.stripe_charge_id = obj.get('latest_charge') or payment.stripe_charge_id
+        update_fields += ['paid_at', 'stripe_charge_id']
+    payment.save(update_fields=update_fields)
+    
+    booking = payment.booking
+    booking_status, follows = BOOKING_TRANSITIONS.get(event_type, (None, ()))
+    if booking.status in follows:
+        # Booking signals move the held seats on cancellation
+        booking.status = booking_status
+        booking.save(update_fields=['status', 'updated_at'])
+        result += f', booking {booking.confirmation_code} {booking_status}'
+    return 'processed', result
@@ -0,0 +1,184 @@
+"""
+Admin dashboard statistics for AusflugAgypten
+"""
+
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Avg, Count, Q, Sum
+from django.utils import timezone
+
+
+STATS_CACHE_KEY = 'core:admin-dashboard-stats'
+
+# Seconds a snapshot is served before the next admin request recomputes it
+STATS_TTL = getattr(settings, 'ADMIN_STATS_TTL', 60)
+
+
+def compute_stats():
+    """
+    Compute the dashboard counters with one aggregate query per table.
+
+    Returns a snapshot dict with 'stats', 'notifications',
+    'total_notifications' and 'generated_at'.
+    """
+    # Import models dynamically to avoid circular imports
+    from apps.bookings.models import Booking
+    from apps.reviews.models import Review
+    from apps.core.models import ContactMessage
+    from apps.tours.models import Tour
+    from apps.excursions.models import Excursion
+    from apps.activities.models import Activity
+    from apps.transfers.models import Transfer
+    from apps.blog.models import BlogPost
+    from apps.gallery.models import GalleryImage
+    from django.contrib.auth.models import User
+    
+    now = timezone.now()
+    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    last_7_days_start = today_start - timedelta(days=7)
+    last_30_days_start = today_start - timedelta(days=30)
+    
+    stats = {}
+    notifications = {}
+    
+    # Bookings Stats
+    try:
+        bookings = Booking.objects.aggregate(
+            total=Count('id'),
+            pending=Count('id', filter=Q(status='pending')),
+            confirmed=Count('id', filter=Q(status='confirmed')),
+            today=Count('id', filter=Q(created_at__gte=today_start)),
+            last_7_days=Count('id', filter=Q(created_at__gte=last_7_days_start)),
+            last_30_days=Count('id', filter=Q(created_at__gte=last_30_days_start)),
+            revenue=Sum('total_price', filter=Q(status__in=['confirmed', 'completed'])),
+            new=Count('id', filter=Q(status='pending', created_at__gte=last_7_days_start)),
+        )
+        notifications['bookings'] = bookings.pop('new')
+        bookings['revenue'] = float(bookings['revenue'] or 0)
+        stats['bookings'] = bookings
+    except Exception:
+        pass
+    
+    # Contact Messages Stats
+    try:
+        contacts = ContactMessage.objects.aggregate(
+            total=Count('id'),
+            new=Count('id', filter=Q(status='new', is_read=False)),
+            read=Count('id', filter=Q(is_read=True)),
+            today=Count('id', filter=Q(created_at__gte=today_start)),
+            last_7_days=Count('id', filter=Q(created_at__gte=last_7_days_start)),
+        )
+        notifications['contacts'] = contacts['new']
+        stats['contacts'] = contacts
+    except Exception:
+        pass
+    
+    # Reviews Stats
+    try:
+        reviews = Review.objects.aggregate(
+            total=Count('id'),
+            pending=Count('id', filter=Q(is_approved=False)),
+            approved=Count('id', filter=Q(is_approved=True)),
+            today=Count('id', filter=Q(created_at__gte=today_start)),
+            last_7_days=Count('id', filter=Q(created_at__gte=last_7_days_start)),
+            avg_rating=Avg('rating', filter=Q(is_approved=True)),
+        )
+        reviews['avg_rating'] = reviews['avg_rating'] or 0
+        notifications['reviews'] = reviews['pending']
+        stats['reviews'] = reviews
+    except Exception:
+        pass
+    
+    # Content Stats
+    content = [
+        ('tours', Tour.objects.filter(is_active=True)),
+        ('excursions', Excursion.objects.filter(is_active=True)),
+        ('activities', Activity.objects.filter(is_active=True)),
+        ('transfers', Transfer.objects.filter(is_active=True)),
+        ('blog_posts', BlogPost.objects.filter(is_published=True)),
+        ('gallery_images', GalleryImage.objects.filter(is_active=True)),
+        ('users', User.objects.filter(is_active=True)),
+    ]
+    for key, queryset in content:
+        try:
+            stats[key] = queryset.count()
+        except Exception:
+            pass
+    
+    return {
+        'stats': stats,
+        'notifications': notifications,
+        'total_notifications': sum(notifications.values()),
+        'generated_at': now,
+    }
+
+
+def refresh_stats(timeout=None):
+    """Recompute the snapshot and store it in the cache"""
+    snapshot = compute_stats()
+    cache.set(STATS_CACHE_KEY, snapshot, STATS_TTL if timeout is None else timeout)
+    return snapshot
+
+
+def get_stats():
+    """Cached snapshot shared by the admin context processor and the admin index"""
+    snapshot = cache.get(STATS_CACHE_KEY)
+    if snapshot is None:
+        snapshot = refresh_stats()
+    return snapshot
+
+
+NOTIFICATIONS_CACHE_KEY = 'core:admin-notifications'
+NOTIFICATIONS_VERSION_KEY = 'core:admin-notifications:last'
+
+
+def compute_notification_counters():
+    """Pending bookings of the last 7 days, unread contacts and unapproved reviews"""
+    from apps.bookings.models import Booking
+    from apps.reviews.models import Review
+    from apps.core.models import ContactMessage
+    
+    last_7_days_start = timezone.now().replace(
+        hour=0, minute=0, second=0, microsecond=0
+    ) - timedelta(days=7)
+    counters = {
+        'bookings': Booking.objects.filter(status='pending', created_at__gte=last_7_days_start).count(),
+        'contacts': ContactMessage.objects.filter(status='new', is_read=False).count(),
+        'reviews': Review.objects.filter(is_approved=False).count(),
+    }
+    counters['total'] = sum(counters.values())
+    return counters
+
+
+def get_notifications():
+    """
+    Cached notification counters with a monotonic version.
+    
+    The version only increases when the counters differ from the previous
+    snapshot, so it can be used as an ETag by polling clients.
+    """
+    snapshot = cache.get(NOTIFICATIONS_CACHE_KEY)
+    if snapshot is not None:
+        return snapshot
+    
+    counters = compute_notification_counters()
+    previous = cache.get(NOTIFICATIONS_VERSION_KEY)
+    if previous is None:
+        # Start from the clock so versions keep growing if the cache was cleared
+        snapshot = {'version': int(time.time() * 1000), 'counters': counters}
+    elif previous['counters'] == counters:
+        snapshot = previous
+    else:
+        snapshot = {'version': previous['version'] + 1, 'counters': counters}
+    
+    cache.set(NOTIFICATIONS_VERSION_KEY, snapshot, None)
+    cache.set(NOTIFICATIONS_CACHE_KEY, snapshot, STATS_TTL)
+    return snapshot
+
+
+def invalidate_notifications():
+    """Recompute the notification counters on the next poll"""
+    cache.delete(NOTIFICATIONS_CACHE_KEY)
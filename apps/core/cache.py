@@ -0,0 +1,199 @@
+"""
+Cache helpers for AusflugAgypten
+"""
+
+import time
+import uuid
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+
+
+class VersionedCache:
+    """
+    Process-local copies of values backed by the shared cache.
+    
+    Every worker keeps the values it has built in memory together with the
+    version they belong to. The current version lives in the shared cache, so
+    invalidate() makes all gunicorn workers drop their copies on their next
+    request. Values are built separately and only when first requested.
+    With a timeout, the shared values and the local copies are rebuilt after
+    that many seconds, so changes the signals missed show up eventually.
+    """
+    
+    def __init__(self, name, builders, timeout=None):
+        self.name = name
+        self.version_key = f'{name}:version'
+        self.builders = builders
+        self.timeout = timeout
+        self._local = (None, {})
+    
+    def get_version(self):
+        """Current version token, created on first use"""
+        version = cache.get(self.version_key)
+        if version is None:
+            cache.add(self.version_key, uuid.uuid4().hex, None)
+            version = cache.get(self.version_key)
+        return version
+    
+    def get(self, key):
+        """Return one value, rebuilding it if another process invalidated it"""
+        version = self.get_version()
+        local_version, values = self._local
+        if version is None or version != local_version:
+            values = {}
+            self._local = (version, values)
+        
+        # (value, time the local copy expires or None)
+        if key not in values or (values[key][1] is not None and values[key][1] <= time.time()):
+            value_key = f'{self.name}:{version}:{key}'
+            value = cache.get(value_key)
+            if value is None:
+                value = self.builders[key]()
+                cache.set(value_key, value, self.timeout)
+            values[key] = (value, None if self.timeout is None else time.time() + self.timeout)
+        return values[key][0]
+    
+    def invalidate(self):
+        """Start a new version, the old values expire from the cache"""
+        cache.set(self.version_key, uuid.uuid4().hex, None)
+        self._local = (None, {})
+
+
+def load_site_settings():
+    """Load the site settings singleton without ever creating it"""
+    SiteSettings = apps.get_model('core', 'SiteSettings')
+    return SiteSettings.objects.filter(pk=1).first() or SiteSettings()
+
+
+def load_activity_categories():
+    """Active activity categories for the header"""
+    ActivityCategory = apps.get_model('activities', 'ActivityCategory')
+    return list(ActivityCategory.objects.filter(is_active=True).order_by('order', 'name')[:10])
+
+
+def load_locations():
+    """Active locations for header and footer, the footer uses the first ones"""
+    Location = apps.get_model('tours', 'Location')
+    return list(Location.objects.filter(is_active=True).order_by('order', 'name')[:10])
+
+
+# Site settings and header/footer navigation, shared by every page
+site_data = VersionedCache('core:site-data', {
+    'settings': load_site_settings,
+    'activity_categories': load_activity_categories,
+    'locations': load_locations,
+}, timeout=60 * 60 * 24)
+
+
+def load_homepage():
+    """Context of HomeView, one query per section"""
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    Tour = apps.get_model('tours', 'Tour')
+    Location = apps.get_model('tours', 'Location')
+    Activity = apps.get_model('activities', 'Activity')
+    ActivityCategory = apps.get_model('activities', 'ActivityCategory')
+    Review = apps.get_model('reviews', 'Review')
+    BlogPost = apps.get_model('blog', 'BlogPost')
+    HeroSlide = apps.get_model('core', 'HeroSlide')
+    
+    # Popular tours are the first featured tours, the cards use the stored rating aggregates
+    featured_tours = list(
+        Tour.objects.filter(is_active=True, is_featured=True).select_related('location', 'category')[:6]
+    )
+    return {
+        'hero_slides': list(HeroSlide.objects.filter(is_active=True).order_by('order', 'created_at')),
+        'popular_tours': featured_tours[:3],
+        'featured_tours': featured_tours,
+        'locations': list(Location.objects.filter(is_active=True).order_by('order', 'name')[:4]),
+        'activity_categories': list(ActivityCategory.objects.filter(is_active=True).order_by('order', 'name')[:4]),
+        'featured_activities': list(
+            Activity.objects.filter(is_active=True, is_featured=True).select_related('category', 'location')[:4]
+        ),
+        # Testimonials: approved tour reviews with rating > 3, with their tours in one query
+        'reviews': list(
+            Review.objects.filter(
+                is_approved=True,
+                content_type=ContentType.objects.get_for_model(Tour),
+                rating__gt=3,
+            ).prefetch_related('content_object')[:6]
+        ),
+        'latest_posts': list(BlogPost.objects.filter(is_published=True).select_related('category', 'author')[:3]),
+    }
+
+
+# HomeView context, dropped with the homepage's page cache (see page_cache.purge_pages)
+homepage_data = VersionedCache('core:homepage', {
+    'context': load_homepage,
+}, timeout=60 * 60 * 24)
+
+
+# Rendered product cards (see the cardcache template tag). Each product has a
+# version token that is replaced when the product, its images or its rating
+# change; the shared token covers the categories and locations on the cards.
+CARD_CACHE_TTL = getattr(settings, 'CARD_CACHE_TTL', 60 * 60 * 24)
+CARD_SHARED_VERSION_KEY = 'core:card-version:shared'
+CARD_STATS_KEYS = {'hits': 'core:card-cache:hits', 'misses': 'core:card-cache:misses'}
+
+
+def card_version_key(model, pk):
+    return f'core:card-version:{model._meta.label_lower}:{pk}'
+
+
+def get_versions(keys):
+    """Version tokens of the given keys, missing ones are created"""
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, uuid.uuid4().hex[:12], None)
+            versions[key] = cache.get(key)
+    return versions
+
+
+def card_cache_key(name, obj, language):
+    """Cache key of one rendered card of obj"""
+    version_key = card_version_key(type(obj), obj.pk)
+    versions = get_versions([CARD_SHARED_VERSION_KEY, version_key])
+    updated_at = obj.updated_at.timestamp() if getattr(obj, 'updated_at', None) else ''
+    return (
+        f'core:card:{name}:{obj._meta.label_lower}:{obj.pk}:{updated_at}:{language}:'
+        f'{versions[version_key]}:{versions[CARD_SHARED_VERSION_KEY]}'
+    )
+
+
+def invalidate_card(model, pk):
+    """Drop the cached cards of one product, in every language"""
+    cache.delete(card_version_key(model, pk))
+
+
+def invalidate_all_cards():
+    """Drop every cached card, e.g. after a category was renamed"""
+    cache.delete(CARD_SHARED_VERSION_KEY)
+
+
+def record_card_stats(hits, misses):
+    """Add one request's hits and misses to the shared counters"""
+    for name, count in (('hits', hits), ('misses', misses)):
+        if not count:
+            continue
+        key = CARD_STATS_KEYS[name]
+        cache.add(key, 0, None)
+        try:
+            cache.incr(key, count)
+        except ValueError:
+            # Evicted between add() and incr()
+            cache.set(key, count, None)
+
+
+def card_cache_stats():
+    """Shared counters as {'hits': n, 'misses': n, 'ratio': 0..1}"""
+    values = cache.get_many(CARD_STATS_KEYS.values())
+    stats = {name: values.get(key, 0) for name, key in CARD_STATS_KEYS.items()}
+    total = stats['hits'] + stats['misses']
+    stats['ratio'] = stats['hits'] / total if total else 0
+    return stats
+
+
+def reset_card_stats():
+    cache.delete_many(CARD_STATS_KEYS.values())
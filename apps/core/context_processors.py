@@ -2,39 +2,37 @@
 Context processors for global template data
 """
 
+from django.utils.functional import SimpleLazyObject
+
+from .cache import site_data
+from .instrumentation import lazy_value
 from .models import SiteSettings
-from apps.activities.models import ActivityCategory
-from apps.tours.models import Location
+
+
+def _site_value(key, fallback):
+    """Cached site data, invalidated by the signals in core.models"""
+    def load():
+        try:
+            return site_data.get(key)
+        except Exception:
+            # Fallback if the tables don't exist yet
+            return fallback()
+    return load
 
 
 def site_settings(request):
     """Add site settings and navigation data to all templates"""
-    try:
-        settings = SiteSettings.load()
-    except Exception:
-        # Fallback if settings don't exist yet
-        settings = SiteSettings()
-    
-    # Activity categories for header dropdown
-    activity_categories = ActivityCategory.objects.filter(
-        is_active=True
-    ).order_by('order', 'name')[:10]
-    
-    # Locations for header dropdown
-    locations = Location.objects.filter(
-        is_active=True
-    ).order_by('order', 'name')[:10]
-    
-    # Popular locations for footer (top 4)
-    popular_locations = Location.objects.filter(
-        is_active=True
-    ).order_by('order', 'name')[:4]
+    # Nothing is loaded until a template uses the value
+    locations = lazy_value(request, 'site_settings', _site_value('locations', list))
     
     return {
-        'site_settings': settings,
-        'header_activity_categories': activity_categories,
+        'site_settings': lazy_value(request, 'site_settings', _site_value('settings', SiteSettings)),
+        # Activity categories for header dropdown
+        'header_activity_categories': lazy_value(
+            request, 'site_settings', _site_value('activity_categories', list)
+        ),
+        # Locations for header dropdown
         'header_locations': locations,
-        'footer_popular_locations': popular_locations,
+        # Popular locations for footer (top 4), sliced from the same list
+        'footer_popular_locations': SimpleLazyObject(lambda: locations[:4]),
     }
-
-
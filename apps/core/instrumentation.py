@@ -0,0 +1,42 @@
+"""
+Query instrumentation for AusflugAgypten
+"""
+
+from contextlib import contextmanager
+from functools import wraps
+
+from django.db import connection
+from django.utils.functional import SimpleLazyObject
+
+
+@contextmanager
+def count_queries(request, name):
+    """Add the queries run inside the block to request.context_processor_queries[name]"""
+    counts = getattr(request, 'context_processor_queries', None)
+    if counts is None:
+        counts = request.context_processor_queries = {}
+    counts.setdefault(name, 0)
+    
+    def counter(execute, sql, params, many, context):
+        counts[name] += 1
+        return execute(sql, params, many, context)
+    
+    with connection.execute_wrapper(counter):
+        yield
+
+
+def lazy_value(request, name, func):
+    """Memoized value that is only loaded when a template uses it"""
+    def load():
+        with count_queries(request, name):
+            return func()
+    return SimpleLazyObject(load)
+
+
+def track_queries(context_processor):
+    """Decorator recording the queries a context processor runs while building its context"""
+    @wraps(context_processor)
+    def wrapper(request):
+        with count_queries(request, context_processor.__name__):
+            return context_processor(request)
+    return wrapper
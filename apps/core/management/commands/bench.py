@@ -0,0 +1,382 @@
+"""
+Management command benchmarking the public pages, booking inquiries, Stripe webhooks and admin changelists.
+Usage: python manage.py bench [--sizes 1000 10000 100000] [--requests=N] [--cold] [--output=PATH] [--compare=PATH]
+
+Every size runs in its own throw-away test database, so the configured
+database is never touched. The backend is the one from the settings:
+DEBUG=True benchmarks SQLite, otherwise the PostgreSQL from DB_NAME/DB_HOST.
+Webhooks are signed by the local Stripe stand-in (apps.bookings.stripe_mock),
+every fourth one is a redelivery; the job worker applying them is timed
+separately.
+"""
+
+import copy
+import json
+import platform
+import random
+import resource
+import shutil
+import tempfile
+import time
+from datetime import date, timedelta
+from io import StringIO
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+from django.urls import reverse
+from django.utils import timezone, translation
+
+from apps.activities.models import Activity
+from apps.bookings.models import Booking, Payment
+from apps.bookings.stripe_mock import make_event, payment_intent, sign_event
+from apps.excursions.models import Excursion
+from apps.jobs.models import Job
+from apps.jobs.queue import run_job
+from apps.reviews.models import Review
+from apps.tours.models import Location, Tour, TourCategory
+
+
+# Catalog models and how many of the products each gets
+PRODUCT_SHARES = [(Tour, 0.5), (Excursion, 0.25), (Activity, 0.25)]
+
+SEARCH_TERMS = ['Kairo', 'Luxor', 'Schnorcheln', 'Safari', 'Hurghada', 'Tempel', 'Boot', 'Wüste']
+
+BENCH_SETTINGS = override_settings(
+    DEBUG=False,
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    PAGE_CACHE_ENABLED=False,
+    STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage',
+    STRIPE_WEBHOOK_SECRET='whsec_bench',
+)
+
+
+def percentile(values, percent):
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(percent / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process so far"""
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return round(usage / (1024 * 1024 if platform.system() == 'Darwin' else 1024), 1)
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks list, detail, search, booking and admin requests on synthetic catalogs'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            type=int,
+            nargs='+',
+            default=[1000, 10000, 100000],
+            help='Number of products and of reviews per catalog (default: 1000 10000 100000)',
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=50,
+            help='Measured requests per scenario (default: 50)',
+        )
+        parser.add_argument(
+            '--cold',
+            action='store_true',
+            help='Clear the cache before every request instead of measuring a warm cache',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Random seed for the catalog and the requests (default: 0)',
+        )
+        parser.add_argument(
+            '--output',
+            help='JSON file for the results (default: bench/<database>-<timestamp>.json)',
+        )
+        parser.add_argument(
+            '--compare',
+            help='Earlier results file to print the p95 change against',
+        )
+    
+    def handle(self, *args, **options):
+        self.requests = options['requests']
+        self.cold = options['cold']
+        results = {
+            'started_at': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'django': django.get_version(),
+            'python': platform.python_version(),
+            'requests_per_scenario': self.requests,
+            'cold_cache': self.cold,
+            'catalogs': [],
+        }
+        
+        setup_test_environment(debug=False)
+        media_root = tempfile.mkdtemp()
+        try:
+            with BENCH_SETTINGS, override_settings(MEDIA_ROOT=media_root):
+                for size in options['sizes']:
+                    random.seed(options['seed'])
+                    results['catalogs'].append(self.bench_catalog(size))
+        finally:
+            teardown_test_environment()
+            shutil.rmtree(media_root, ignore_errors=True)
+        
+        output = Path(options['output'] or Path(settings.BASE_DIR) / 'bench' / (
+            f"{connection.vendor}-{timezone.now():%Y%m%d-%H%M%S}.json"
+        ))
+        output.parent.mkdir(parents=True, exist_ok=True)
+        if options['compare']:
+            self.print_comparison(json.loads(Path(options['compare']).read_text()), results)
+        output.write_text(json.dumps(results, indent=2))
+        self.stdout.write(self.style.SUCCESS(f'\n✅ Results saved to {output}'))
+    
+    def bench_catalog(self, size):
+        """Build a catalog of size products and reviews in a fresh database and measure it"""
+        self.stdout.write(f'\n{connection.vendor}, {size} products and reviews')
+        test_settings = connection.settings_dict.setdefault('TEST', {})
+        if connection.vendor == 'sqlite':
+            # A file like in development, an in-memory database would flatter the numbers
+            test_settings['NAME'] = str(Path(tempfile.gettempdir()) / f'bench-{size}.sqlite3')
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            start = time.perf_counter()
+            rows = self.build_catalog(size)
+            build_seconds = round(time.perf_counter() - start, 1)
+            self.stdout.write(f'✓ Catalog built in {build_seconds}s')
+            
+            scenarios = []
+            for name, requests in self.get_scenarios():
+                scenario = self.run_scenario(name, requests)
+                scenarios.append(scenario)
+                self.stdout.write(
+                    f"✓ {name:<24} p50 {scenario['p50_ms']:>7.1f} ms  p95 {scenario['p95_ms']:>7.1f} ms  "
+                    f"p99 {scenario['p99_ms']:>7.1f} ms  {scenario['mean_queries']:>5.1f} queries"
+                )
+            worker = self.run_webhook_worker()
+            self.stdout.write(f"✓ {'webhook worker':<24} {worker['jobs']} events in {worker['seconds']}s, {worker['per_second']}/s")
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+        return {
+            'size': size, 'rows': rows, 'build_seconds': build_seconds,
+            'scenarios': scenarios, 'webhook_worker': worker,
+        }
+    
+    def build_catalog(self, size):
+        """Seed create_test_data, then clone its products and add reviews in bulk"""
+        call_command('create_test_data', count=10, stdout=StringIO())
+        User = get_user_model()
+        User.objects.create_superuser('bench', 'bench@example.com', 'bench')
+        
+        for model, share in PRODUCT_SHARES:
+            self.clone_products(model, int(size * share))
+        self.create_reviews(size)
+        
+        call_command('rebuild_ratings', stdout=StringIO())
+        call_command('rebuild_search_index', stdout=StringIO())
+        cache.clear()
+        return {
+            model._meta.label: model.objects.count() for model, share in PRODUCT_SHARES
+        } | {'reviews.Review': Review.objects.count()}
+    
+    def clone_products(self, model, total, batch_size=1000):
+        """Copy the seeded rows of model until there are total of them"""
+        templates = list(model.objects.all())
+        batch = []
+        for i in range(max(0, total - len(templates))):
+            obj = copy.copy(random.choice(templates))
+            obj.pk = None
+            obj.slug = f'{obj.slug[:230]}-{i}'
+            obj.is_active = random.random() < 0.9
+            batch.append(obj)
+            if len(batch) >= batch_size:
+                model.objects.bulk_create(batch)
+                batch = []
+        model.objects.bulk_create(batch)
+    
+    def create_reviews(self, total, batch_size=1000):
+        """total reviews spread over all products, 80% of them approved"""
+        targets = [
+            (ContentType.objects.get_for_model(model).pk, pk)
+            for model, share in PRODUCT_SHARES
+            for pk in model.objects.values_list('pk', flat=True)
+        ]
+        batch = []
+        for i in range(max(0, total - Review.objects.count())):
+            content_type_id, object_id = random.choice(targets)
+            batch.append(Review(
+                content_type_id=content_type_id,
+                object_id=object_id,
+                name=f'Gast {i}',
+                email=f'gast{i}@example.com',
+                rating=random.choices([1, 2, 3, 4, 5], weights=[1, 1, 3, 6, 9])[0],
+                title='Toller Ausflug',
+                comment='Sehr gut organisiert, gerne wieder.',
+                is_approved=random.random() < 0.8,
+            ))
+            if len(batch) >= batch_size:
+                Review.objects.bulk_create(batch)
+                batch = []
+        Review.objects.bulk_create(batch)
+    
+    def get_scenarios(self):
+        """(name, callables) pairs, every callable makes one request and returns its response"""
+        anonymous = Client()
+        admin = Client()
+        admin.force_login(get_user_model().objects.get(username='bench'))
+        n = self.requests
+        
+        def get(client, name, kwargs=None, query=''):
+            url = reverse(name, kwargs=kwargs) + query
+            return lambda: client.get(url)
+        
+        def slugs(model):
+            return list(model.objects.filter(is_active=True).values_list('slug', flat=True)[:1000])
+        
+        locations = list(Location.objects.values_list('slug', flat=True))
+        categories = list(TourCategory.objects.values_list('slug', flat=True))
+        tour_pages = max(1, Tour.objects.filter(is_active=True).count() // 12)
+        tour_slugs, excursion_slugs, activity_slugs = slugs(Tour), slugs(Excursion), slugs(Activity)
+        tour_ids = list(Tour.objects.filter(is_active=True).values_list('pk', flat=True)[:1000])
+        
+        def inquiry():
+            return anonymous.post(reverse('bookings:inquiry'), {
+                'tour_id': random.choice(tour_ids),
+                'date': (date.today() + timedelta(days=random.randint(1, 90))).isoformat(),
+                'adults': random.randint(1, 4),
+                'children': 0,
+                'babies': 0,
+                'name': 'Bench Gast',
+                'email': 'bench@example.com',
+                'phone': '+49 30 123456',
+            })
+        
+        # Pending payments for the webhooks, paid by the events
+        bookings = Booking.objects.bulk_create([
+            Booking(
+                tour_id=random.choice(tour_ids), customer_name='Bench Gast', customer_email='bench@example.com',
+                customer_phone='+49 30 123456', booking_date=date.today() + timedelta(days=30),
+                total_price=100, confirmation_code=f'AE-BENCH-{i}',
+            )
+            for i in range(n)
+        ])
+        Payment.objects.bulk_create([
+            Payment(booking=booking, stripe_payment_intent_id=f'pi_bench_{booking.pk}', amount=100)
+            for booking in bookings
+        ])
+        delivered = []
+        
+        def webhook():
+            if delivered and len(delivered) % 4 == 3:
+                event = random.choice(delivered)
+            else:
+                event = make_event('payment_intent.succeeded', payment_intent(f'pi_bench_{random.choice(bookings).pk}'))
+            delivered.append(event)
+            payload, signature = sign_event(event, settings.STRIPE_WEBHOOK_SECRET)
+            return anonymous.post(
+                reverse('bookings:stripe_webhook'), payload,
+                content_type='application/json', HTTP_STRIPE_SIGNATURE=signature,
+            )
+        
+        return [
+            ('tours:list', [get(anonymous, 'tours:list')] * n),
+            ('tours:list filtered', [
+                get(anonymous, 'tours:list', query=f'?location={random.choice(locations)}'
+                    f'&category={random.choice(categories)}&sort=price&rating=4')
+                for _ in range(n)
+            ]),
+            ('tours:list deep page', [
+                get(anonymous, 'tours:list', query=f'?page={random.randint(1, tour_pages)}') for _ in range(n)
+            ]),
+            ('excursions:list', [get(anonymous, 'excursions:list', query='?sort=rating')] * n),
+            ('activities:list', [get(anonymous, 'activities:list')] * n),
+            ('tours:detail', [get(anonymous, 'tours:detail', {'slug': random.choice(tour_slugs)}) for _ in range(n)]),
+            ('excursions:detail', [
+                get(anonymous, 'excursions:detail', {'slug': random.choice(excursion_slugs)}) for _ in range(n)
+            ]),
+            ('activities:detail', [
+                get(anonymous, 'activities:detail', {'slug': random.choice(activity_slugs)}) for _ in range(n)
+            ]),
+            ('search:results', [
+                get(anonymous, 'search:results', query=f'?q={random.choice(SEARCH_TERMS)}') for _ in range(n)
+            ]),
+            ('search:autocomplete', [
+                get(anonymous, 'search:autocomplete', query=f'?q={random.choice(SEARCH_TERMS)[:3]}') for _ in range(n)
+            ]),
+            ('bookings:inquiry POST', [inquiry] * n),
+            ('bookings:stripe_webhook', [webhook] * n),
+            ('admin tours', [get(admin, 'admin:tours_tour_changelist')] * n),
+            ('admin tours search', [get(admin, 'admin:tours_tour_changelist', query='?q=Kairo')] * n),
+            ('admin reviews', [get(admin, 'admin:reviews_review_changelist', query='?is_approved__exact=0')] * n),
+            ('admin bookings', [get(admin, 'admin:bookings_booking_changelist')] * n),
+        ]
+    
+    def run_scenario(self, name, requests):
+        """Time every request of a scenario after one warm-up request"""
+        with translation.override(settings.LANGUAGE_CODE):
+            requests[0]()
+            timings, queries, errors = [], [], 0
+            for request in requests:
+                if self.cold:
+                    cache.clear()
+                with CaptureQueriesContext(connection) as captured:
+                    start = time.perf_counter()
+                    response = request()
+                    timings.append((time.perf_counter() - start) * 1000)
+                queries.append(len(captured))
+                if response.status_code >= 400:
+                    errors += 1
+        return {
+            'name': name,
+            'requests': len(requests),
+            'errors': errors,
+            'p50_ms': round(percentile(timings, 50), 2),
+            'p95_ms': round(percentile(timings, 95), 2),
+            'p99_ms': round(percentile(timings, 99), 2),
+            'mean_queries': round(sum(queries) / len(queries), 1),
+            'max_queries': max(queries),
+            'peak_rss_mb': peak_rss_mb(),
+        }
+    
+    def run_webhook_worker(self):
+        """Apply the queued webhook events like run_jobs does, returns the throughput"""
+        jobs = list(Job.objects.filter(task='bookings.apply_stripe_event', status=Job.STATUS_PENDING))
+        start = time.perf_counter()
+        for job in jobs:
+            run_job(job)
+        seconds = time.perf_counter() - start
+        return {
+            'jobs': len(jobs),
+            'seconds': round(seconds, 3),
+            'per_second': round(len(jobs) / seconds) if seconds else 0,
+        }
+    
+    def print_comparison(self, before, after):
+        """p95 of every scenario against an earlier run"""
+        self.stdout.write(f"\nComparison with {before['started_at']} ({before['database']})")
+        earlier = {
+            (catalog['size'], scenario['name']): scenario
+            for catalog in before['catalogs'] for scenario in catalog['scenarios']
+        }
+        for catalog in after['catalogs']:
+            for scenario in catalog['scenarios']:
+                old = earlier.get((catalog['size'], scenario['name']))
+                if old is None:
+                    continue
+                change = (scenario['p95_ms'] - old['p95_ms']) / old['p95_ms'] * 100 if old['p95_ms'] else 0
+                self.stdout.write(
+                    f"{catalog['size']:>7} {scenario['name']:<24} "
+                    f"{old['p95_ms']:>8.1f} → {scenario['p95_ms']:>8.1f} ms ({change:+.0f}%)"
+                )
@@ -0,0 +1,107 @@
+"""
+Management command benchmarking the pricing core over many quotes.
+Usage: python manage.py bench_pricing [--quotes=100000] [--products=1000] [--seed=N]
+
+Quotes random parties for unsaved tours, excursions, activities and
+transfers, so no database is needed: once through the plain pure function,
+once memoized (cold, then warm) and once through quote(), which also reads
+the price rules from the product.
+"""
+
+import random
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+
+from apps.activities.models import Activity
+from apps.core.pricing import compute_quote, price_rules, quote
+from apps.excursions.models import Excursion
+from apps.tours.models import Tour
+from apps.transfers.models import Transfer
+
+
+def random_price():
+    return Decimal(random.randrange(1500, 50000)) / 100
+
+
+def random_product():
+    """Unsaved product with a random price, discount and basis"""
+    kind = random.choice(['tour', 'excursion', 'activity', 'transfer'])
+    price = random_price()
+    discount = (price * Decimal('0.8')).quantize(Decimal('0.01')) if random.random() < 0.3 else None
+    if kind == 'tour':
+        return Tour(price=price, original_price=price * 2 if discount else None)
+    if kind == 'excursion':
+        return Excursion(price=price, original_price=price * 2 if discount else None)
+    if kind == 'activity':
+        return Activity(price=price, discount_price=discount, price_per_person=random.random() < 0.8)
+    return Transfer(
+        base_price=price, discount_price=discount,
+        price_per_person=random.random() < 0.3, price_per_km=random.random() < 0.1,
+    )
+
+
+def random_party():
+    """Mostly the one-adult "from" price of the list pages, else a booking"""
+    if random.random() < 0.8:
+        return 1, 0, 0
+    return random.randint(1, 6), random.choice([0, 0, 0, 1, 2, 3]), random.choice([0, 0, 0, 0, 1])
+
+
+class Command(BaseCommand):
+    help = 'Times the pricing core (apps.core.pricing) over many quotes'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--quotes',
+            type=int,
+            default=100000,
+            help='Quotes per run (default: 100000)',
+        )
+        parser.add_argument(
+            '--products',
+            type=int,
+            default=1000,
+            help='Distinct products the quotes are spread over (default: 1000)',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Random seed (default: 0)',
+        )
+    
+    def handle(self, *args, **options):
+        random.seed(options['seed'])
+        products = [random_product() for _ in range(options['products'])]
+        requests = [(random.choice(products), *random_party()) for _ in range(options['quotes'])]
+        rules = [(price_rules(product), adults, children, babies) for product, adults, children, babies in requests]
+        
+        pure = compute_quote.__wrapped__
+        compute_quote.cache_clear()
+        runs = [
+            ('pure core', lambda: [pure(*args) for args in rules]),
+            ('memoized, cold', lambda: [compute_quote(*args) for args in rules]),
+            ('memoized, warm', lambda: [compute_quote(*args) for args in rules]),
+            ('quote() on products', lambda: [quote(*args) for args in requests]),
+        ]
+        
+        self.stdout.write(f"{len(requests)} quotes over {len(products)} products\n")
+        results = {}
+        for name, run in runs:
+            start = time.perf_counter()
+            quotes = run()
+            seconds = time.perf_counter() - start
+            results[name] = quotes
+            self.stdout.write(
+                f'✓ {name:<22} {seconds:>7.3f}s  {len(quotes) / seconds:>10,.0f} quotes/s  '
+                f'{seconds / len(quotes) * 1e6:>6.2f} µs/quote'
+            )
+        
+        if results['pure core'] != results['memoized, warm']:
+            self.stderr.write(self.style.ERROR('✗ Memoized quotes differ from the pure core'))
+        info = compute_quote.cache_info()
+        self.stdout.write(self.style.SUCCESS(
+            f'\n✅ Memo: {info.hits} hits, {info.misses} misses, {info.currsize}/{info.maxsize} entries'
+        ))
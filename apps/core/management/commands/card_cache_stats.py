@@ -0,0 +1,29 @@
+"""
+Management command showing the hit ratio of the product card cache.
+Usage: python manage.py card_cache_stats [--reset]
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.core.cache import card_cache_stats, reset_card_stats
+
+
+class Command(BaseCommand):
+    help = 'Shows (and optionally resets) the product card cache hit/miss counters'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Set the counters back to zero after printing them',
+        )
+    
+    def handle(self, *args, **options):
+        stats = card_cache_stats()
+        self.stdout.write(f'✓ Hits:      {stats["hits"]}')
+        self.stdout.write(f'✓ Misses:    {stats["misses"]}')
+        self.stdout.write(f'✓ Hit ratio: {stats["ratio"]:.1%}')
+        
+        if options['reset']:
+            reset_card_stats()
+            self.stdout.write(self.style.SUCCESS('\n✅ Card cache counters reset!'))
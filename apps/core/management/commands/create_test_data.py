@@ -1,9 +1,12 @@
 """
 Management command to create test data for all models in the project.
-Usage: python manage.py create_test_data [--clear] [--count=N]
+Usage: python manage.py create_test_data [--clear] [--count=N] [--scale=N [--workers=N]]
 """
 
+from django.core.management import call_command
 from django.core.management.base import BaseCommand
+from django.core.files.storage import default_storage
+from django.db import connection, connections
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from django.utils.text import slugify
@@ -11,11 +14,14 @@ from django.contrib.contenttypes.models import ContentType
 from django.core.files.base import ContentFile
 from decimal import Decimal
 from datetime import timedelta
+import os
 import random
 import uuid
-from io import BytesIO
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO, StringIO
 from PIL import Image
 
+import django
 from faker import Faker
 
 # Import all models
@@ -31,6 +37,9 @@ from apps.transfers.models import TransferType, VehicleType, Transfer, TransferI
 from apps.gallery.models import GalleryCategory, GalleryImage
 from apps.reviews.models import Review
 from apps.bookings.models import Booking, Payment
+from apps.core.admin_stats import invalidate_notifications, refresh_stats
+from apps.core.cache import invalidate_all_cards, site_data
+from apps.core.page_cache import purge_pages
 
 User = get_user_model()
 fake = Faker(['de_DE', 'en_US'])
@@ -45,6 +54,384 @@ def create_placeholder_image(width=800, height=600, color=(52, 152, 219)):
     return ContentFile(buffer.getvalue(), name=f'placeholder_{uuid.uuid4().hex[:8]}.jpg')
 
 
+# Rows per --scale unit in bulk mode, --scale=200 gives a million reviews and bookings
+BULK_COUNTS = {
+    'tours': 50,
+    'excursions': 25,
+    'activities': 25,
+    'transfers': 10,
+    'gallery_images': 50,
+    'blog_posts': 10,
+    'reviews': 5000,
+    'bookings': 5000,
+    'contact_messages': 100,
+    'newsletter_subscribers': 250,
+}
+
+# Rows generated per worker task and written per INSERT
+BULK_CHUNK_SIZE = 50000
+BULK_BATCH_SIZE = 2000
+
+TOUR_INCLUDED = [
+    ('Abholung vom Hotel', 'Hotel Pickup'),
+    ('Professioneller Guide', 'Professional Guide'),
+    ('Eintrittskarten', 'Entrance Tickets'),
+    ('Mittagessen', 'Lunch'),
+    ('Getränke', 'Drinks'),
+]
+TOUR_EXCLUDED = [
+    ('Persönliche Ausgaben', 'Personal Expenses'),
+    ('Trinkgeld', 'Tips'),
+]
+TRANSFER_INCLUSIONS = [
+    ('Klimatisiertes Fahrzeug', 'Air-conditioned Vehicle'),
+    ('Professioneller Fahrer', 'Professional Driver'),
+    ('Versicherung', 'Insurance'),
+]
+
+PLACEHOLDER_COLORS = [
+    (52, 152, 219), (230, 126, 34), (46, 204, 113), (155, 89, 182),
+    (241, 196, 15), (231, 76, 60), (26, 188, 156), (52, 73, 94),
+]
+
+
+def create_placeholder_pool():
+    """Store one placeholder image per color, bulk rows share their file names"""
+    return [
+        default_storage.save('placeholders/' + image.name, image)
+        for image in (create_placeholder_image(color=color) for color in PLACEHOLDER_COLORS)
+    ]
+
+
+class FakePool:
+    """Pre-generated Faker values, Faker is far too slow to call per bulk row"""
+
+    def __init__(self, size=200):
+        self.names = [fake.name() for _ in range(size)]
+        self.emails = [fake.email() for _ in range(size)]
+        self.phones = [fake.phone_number() for _ in range(size)]
+        self.phrases = [fake.catch_phrase() for _ in range(size)]
+        self.titles = [fake.sentence(nb_words=4) for _ in range(size)]
+        self.sentences = [fake.sentence() for _ in range(size)]
+        self.short_texts = [fake.text(max_nb_chars=300) for _ in range(size)]
+        self.texts = [fake.text(max_nb_chars=1000) for _ in range(size)]
+
+    def __getattr__(self, name):
+        # pool.name -> random entry of pool.names
+        return random.choice(self.__dict__[name + 's'])
+
+
+def bulk_insert(model, rows):
+    """bulk_create an iterable of unsaved objects in batches, returns the saved objects"""
+    created = []
+    batch = []
+    for obj in rows:
+        batch.append(obj)
+        if len(batch) >= BULK_BATCH_SIZE:
+            created += model.objects.bulk_create(batch)
+            batch = []
+    created += model.objects.bulk_create(batch)
+    return created
+
+
+def bulk_tours(start, stop, refs):
+    """Tours start..stop with their itineraries and inclusions"""
+    pool = FakePool()
+    locations = list(Location.objects.filter(pk__in=refs['locations']))
+    tours = []
+    for i in range(start, stop):
+        location = random.choice(locations)
+        price = Decimal(random.randint(30, 500))
+        title = f"{pool.phrase} in {location.name}"
+        tours.append(Tour(
+            title=title,
+            title_en=f"{pool.phrase} in {location.name_en}",
+            slug=f"{slugify(title)[:200]}-{refs['token']}-{i}",
+            description=pool.text,
+            description_en=pool.text,
+            short_description=pool.sentence,
+            short_description_en=pool.sentence,
+            location=location,
+            category_id=random.choice(refs['tour_categories']),
+            featured_image=random.choice(refs['images']),
+            price=price,
+            original_price=price * Decimal('1.2') if random.choice([True, False]) else None,
+            duration=random.choice(['4 Stunden', '8 Stunden', 'Tagesausflug', '2 Tage', '3 Tage']),
+            group_type=random.choice(['private', 'small_group', 'group']),
+            max_participants=random.randint(10, 50),
+            min_age=random.choice([0, 6, 12, 18]),
+            languages='Deutsch, English',
+            available_days='Täglich',
+            pickup_included=random.choice([True, False]),
+            is_featured=random.random() < 0.1,
+            is_active=random.random() < 0.95,
+        ))
+    tours = bulk_insert(Tour, tours)
+    
+    bulk_insert(Itinerary, (
+        Itinerary(
+            tour=tour,
+            time=f"{8 + j * 2}:00",
+            title=pool.title,
+            title_en=pool.title,
+            description=pool.short_text,
+            description_en=pool.short_text,
+            order=j,
+        )
+        for tour in tours for j in range(random.randint(3, 6))
+    ))
+    bulk_insert(TourInclusion, (
+        TourInclusion(tour=tour, item=item_de, item_en=item_en, is_included=is_included, order=k)
+        for tour in tours
+        for is_included, items in ((True, TOUR_INCLUDED[:random.randint(3, 5)]), (False, TOUR_EXCLUDED))
+        for k, (item_de, item_en) in enumerate(items)
+    ))
+    return len(tours)
+
+
+def bulk_excursions(start, stop, refs):
+    pool = FakePool()
+    locations = list(Location.objects.filter(pk__in=refs['locations']))
+    excursions = []
+    for i in range(start, stop):
+        location = random.choice(locations)
+        price = Decimal(random.randint(25, 400))
+        title = f"{pool.phrase} - {location.name}"
+        excursions.append(Excursion(
+            title=title,
+            title_en=f"{pool.phrase} - {location.name_en}",
+            slug=f"{slugify(title)[:200]}-{refs['token']}-{i}",
+            description=pool.text,
+            description_en=pool.text,
+            short_description=pool.sentence,
+            short_description_en=pool.sentence,
+            location=location,
+            category_id=random.choice(refs['tour_categories']),
+            featured_image=random.choice(refs['images']),
+            price=price,
+            original_price=price * Decimal('1.15') if random.choice([True, False]) else None,
+            duration=random.choice(['4 Stunden', '8 Stunden', 'Tagesausflug']),
+            group_type=random.choice(['private', 'small_group', 'group']),
+            max_participants=random.randint(10, 40),
+            min_age=random.choice([0, 6, 12]),
+            languages='Deutsch, English',
+            available_days='Täglich',
+            pickup_included=True,
+            is_featured=random.random() < 0.1,
+            is_popular=random.random() < 0.2,
+            is_bestseller=random.random() < 0.1,
+            is_active=random.random() < 0.95,
+        ))
+    return len(bulk_insert(Excursion, excursions))
+
+
+def bulk_activities(start, stop, refs):
+    pool = FakePool()
+    activities = []
+    for i in range(start, stop):
+        price = Decimal(random.randint(20, 300))
+        title = pool.phrase
+        activities.append(Activity(
+            title=title,
+            title_en=pool.phrase,
+            slug=f"{slugify(title)[:200]}-{refs['token']}-{i}",
+            short_description=pool.sentence,
+            short_description_en=pool.sentence,
+            description=pool.text,
+            description_en=pool.text,
+            category_id=random.choice(refs['activity_categories']),
+            location_id=random.choice(refs['locations']),
+            featured_image=random.choice(refs['images']),
+            price=price,
+            discount_price=price * Decimal('0.85') if random.choice([True, False]) else None,
+            duration_hours=random.randint(2, 8),
+            group_size=random.choice(['Privat', 'Klein', 'Mittel', 'Groß']),
+            languages='DE, EN',
+            pickup_included=random.choice([True, False]),
+            is_featured=random.random() < 0.1,
+            is_popular=random.random() < 0.2,
+            is_active=random.random() < 0.95,
+        ))
+    return len(bulk_insert(Activity, activities))
+
+
+def bulk_transfers(start, stop, refs):
+    """Transfers start..stop with their inclusions"""
+    pool = FakePool()
+    locations = list(Location.objects.filter(pk__in=refs['locations']))
+    transfers = []
+    for i in range(start, stop):
+        from_location, to_location = random.choice(locations), random.choice(locations)
+        base_price = Decimal(random.randint(20, 200))
+        title = f"Transfer {from_location.name} → {to_location.name} #{i + 1}"
+        transfers.append(Transfer(
+            title=title,
+            title_en=f"Transfer {from_location.name_en} → {to_location.name_en} #{i + 1}",
+            slug=f"{slugify(title)[:200]}-{refs['token']}",
+            short_description=pool.sentence,
+            short_description_en=pool.sentence,
+            description=pool.short_text,
+            description_en=pool.short_text,
+            transfer_type_id=random.choice(refs['transfer_types']),
+            vehicle_type_id=random.choice(refs['vehicle_types']),
+            from_location=from_location,
+            to_location=to_location,
+            base_price=base_price,
+            discount_price=base_price * Decimal('0.9') if random.choice([True, False]) else None,
+            price_per_person=random.choice([True, False]),
+            duration_minutes=random.randint(15, 120),
+            availability='24/7',
+            languages='DE, EN',
+            free_cancellation=random.choice([True, False]),
+            flight_monitoring=random.choice([True, False]),
+            meet_greet=random.choice([True, False]),
+            is_featured=random.random() < 0.1,
+            is_popular=random.random() < 0.2,
+            is_active=True,
+        ))
+    transfers = bulk_insert(Transfer, transfers)
+    bulk_insert(TransferInclusion, (
+        TransferInclusion(transfer=transfer, title=title_de, title_en=title_en, order=j)
+        for transfer in transfers for j, (title_de, title_en) in enumerate(TRANSFER_INCLUSIONS)
+    ))
+    return len(transfers)
+
+
+def bulk_gallery_images(start, stop, refs):
+    pool = FakePool()
+    locations = list(Location.objects.filter(pk__in=refs['locations']))
+    images = []
+    for i in range(start, stop):
+        location = random.choice(locations)
+        title = f"{pool.phrase} - {location.name}"
+        images.append(GalleryImage(
+            title=title,
+            title_en=f"{pool.phrase} - {location.name_en}",
+            description=pool.short_text,
+            description_en=pool.short_text,
+            image=random.choice(refs['images']),
+            category_id=random.choice(refs['gallery_categories']),
+            location=location,
+            photographer=pool.name,
+            taken_at=timezone.now().date() - timedelta(days=random.randint(0, 730)),
+            alt_text=title,
+            is_featured=random.random() < 0.1,
+            is_active=True,
+            order=i,
+        ))
+    return len(bulk_insert(GalleryImage, images))
+
+
+def bulk_blog_posts(start, stop, refs):
+    pool = FakePool()
+    posts = []
+    for i in range(start, stop):
+        title = pool.sentence
+        published_at = timezone.now() - timedelta(minutes=random.randint(0, 525600)) if random.random() < 0.8 else None
+        posts.append(BlogPost(
+            title=title,
+            title_en=pool.sentence,
+            slug=f"{slugify(title)[:200]}-{refs['token']}-{i}",
+            content=pool.text,
+            content_en=pool.text,
+            excerpt=pool.sentence,
+            excerpt_en=pool.sentence,
+            featured_image=random.choice(refs['images']),
+            category_id=random.choice(refs['blog_categories']),
+            author_id=refs['user'],
+            published_at=published_at,
+            is_published=published_at is not None,
+            reading_time=random.randint(3, 15),
+        ))
+    return len(bulk_insert(BlogPost, posts))
+
+
+def bulk_reviews(start, stop, refs):
+    """Reviews spread over refs['products'], (content type, object id) pairs"""
+    pool = FakePool()
+    reviews = []
+    for i in range(start, stop):
+        content_type_id, object_id = random.choice(refs['products'])
+        reviews.append(Review(
+            content_type_id=content_type_id,
+            object_id=object_id,
+            name=pool.name,
+            email=pool.email,
+            rating=random.choices([1, 2, 3, 4, 5], weights=[1, 1, 3, 6, 9])[0],
+            title=pool.title,
+            comment=pool.short_text,
+            is_approved=random.random() < 0.75,
+        ))
+    return len(bulk_insert(Review, reviews))
+
+
+def bulk_bookings(start, stop, refs):
+    """Tour bookings, with a payment for the confirmed and completed ones"""
+    pool = FakePool()
+    bookings = []
+    for i in range(start, stop):
+        tour_id, price = random.choice(refs['tours'])
+        adults, children = random.randint(1, 6), random.randint(0, 2)
+        bookings.append(Booking(
+            tour_id=tour_id,
+            customer_name=pool.name,
+            customer_email=pool.email,
+            customer_phone=pool.phone,
+            booking_date=timezone.now().date() + timedelta(days=random.randint(-365, 90)),
+            adults=adults,
+            children=children,
+            number_of_participants=adults + children,
+            total_price=price * (adults + children),
+            status=random.choice(['pending', 'confirmed', 'completed', 'cancelled']),
+            special_requests=pool.short_text if random.random() < 0.3 else '',
+            # Booking.save() is skipped, 8 hex digits would collide at this volume
+            confirmation_code=f"AE-{uuid.uuid4().hex[:12].upper()}",
+        ))
+    bookings = bulk_insert(Booking, bookings)
+    bulk_insert(Payment, (
+        Payment(
+            booking=booking,
+            stripe_payment_intent_id=f'pi_{uuid.uuid4().hex}',
+            amount=booking.total_price,
+            status='succeeded',
+            paid_at=timezone.now() - timedelta(days=random.randint(1, 30)),
+        )
+        for booking in bookings if booking.status in ('confirmed', 'completed')
+    ))
+    return len(bookings)
+
+
+def bulk_contact_messages(start, stop, refs):
+    pool = FakePool()
+    return len(bulk_insert(ContactMessage, (
+        ContactMessage(
+            name=pool.name,
+            email=pool.email,
+            phone=pool.phone if random.choice([True, False]) else '',
+            subject=random.choice(['tour_booking', 'general_inquiry', 'complaint', 'other']),
+            message=pool.short_text,
+            status=random.choice(['new', 'read', 'replied', 'archived']),
+            is_read=random.choice([True, False]),
+        )
+        for i in range(start, stop)
+    )))
+
+
+def bulk_newsletter_subscribers(start, stop, refs):
+    # Numbered addresses, the email column is unique
+    return len(bulk_insert(NewsletterSubscriber, (
+        NewsletterSubscriber(email=f"leser{i}.{refs['token']}@example.com", is_active=random.random() < 0.66)
+        for i in range(start, stop)
+    )))
+
+
+def run_bulk_task(function, start, stop, refs):
+    """Entry point of the worker processes"""
+    # A different random sequence in every chunk
+    random.seed(f"{refs['token']}-{function.__name__}-{start}")
+    return function(start, stop, refs)
+
+
 class Command(BaseCommand):
     help = 'Creates test data for all models in the project'
 
@@ -60,6 +447,17 @@ class Command(BaseCommand):
             default=10,
             help='Number of items to create for each model (default: 10)',
         )
+        parser.add_argument(
+            '--scale',
+            type=float,
+            help='Bulk mode: create BULK_COUNTS x SCALE rows with bulk inserts (e.g. 200 for a million bookings)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=min(os.cpu_count() or 1, 8),
+            help='Worker processes in bulk mode, always 1 on SQLite (default: CPU count, at most 8)',
+        )
 
     def handle(self, *args, **options):
         clear = options['clear']
@@ -86,6 +484,10 @@ class Command(BaseCommand):
             self.stdout.write(self.style.WARNING('Clearing existing data...'))
             self.clear_data()
         
+        if options['scale']:
+            self.create_bulk_data(options['scale'], options['workers'])
+            return
+        
         # Create data in order of dependencies
         self.create_site_settings()
         self.create_locations(count)
@@ -135,6 +537,94 @@ class Command(BaseCommand):
         self.stdout.write(self.style.SUCCESS(f'\n✅ Successfully created test data!'))
         self.stdout.write(self.style.SUCCESS(f'Created {count} items for each main model.'))
 
+    def create_bulk_data(self, scale, workers):
+        """Reference data as usual, then every other model with bulk inserts in worker processes"""
+        if connection.vendor == 'sqlite':
+            # SQLite locks the whole database for every writer
+            workers = 1
+        
+        self.create_site_settings()
+        self.create_locations(8)
+        self.create_tour_categories(8)
+        self.create_activity_categories(5)
+        self.create_transfer_types(4)
+        self.create_vehicle_types()
+        self.create_gallery_categories(5)
+        self.create_blog_categories(5)
+        self.create_hero_slides()
+        self.create_page_heroes()
+        
+        refs = {
+            'token': uuid.uuid4().hex[:6],
+            'images': create_placeholder_pool(),
+            'user': self.get_or_create_user().pk,
+            'locations': list(Location.objects.values_list('pk', flat=True)),
+            'tour_categories': list(TourCategory.objects.values_list('pk', flat=True)),
+            'activity_categories': list(ActivityCategory.objects.values_list('pk', flat=True)),
+            'transfer_types': list(TransferType.objects.values_list('pk', flat=True)),
+            'vehicle_types': list(VehicleType.objects.values_list('pk', flat=True)),
+            'gallery_categories': list(GalleryCategory.objects.values_list('pk', flat=True)),
+            'blog_categories': list(BlogCategory.objects.values_list('pk', flat=True)),
+        }
+        counts = {name: max(1, int(count * scale)) for name, count in BULK_COUNTS.items()}
+        self.stdout.write(f'Bulk mode: scale {scale:g}, {workers} worker processes')
+        
+        # Products of independent apps first, reviews and bookings need their ids
+        self.run_bulk_tasks([
+            (bulk_tours, counts['tours']),
+            (bulk_excursions, counts['excursions']),
+            (bulk_activities, counts['activities']),
+            (bulk_transfers, counts['transfers']),
+            (bulk_gallery_images, counts['gallery_images']),
+            (bulk_blog_posts, counts['blog_posts']),
+            (bulk_contact_messages, counts['contact_messages']),
+            (bulk_newsletter_subscribers, counts['newsletter_subscribers']),
+        ], refs, workers)
+        
+        refs['products'] = [
+            (ContentType.objects.get_for_model(model).pk, pk)
+            for model in (Tour, Excursion, Activity)
+            for pk in model.objects.values_list('pk', flat=True)
+        ]
+        refs['tours'] = list(Tour.objects.values_list('pk', 'price'))
+        self.run_bulk_tasks([
+            (bulk_reviews, counts['reviews']),
+            (bulk_bookings, counts['bookings']),
+        ], refs, workers)
+        
+        # bulk_create sends no signals, rebuild what the signals keep up to date
+        call_command('rebuild_ratings', stdout=StringIO())
+        call_command('rebuild_search_index', stdout=StringIO())
+        purge_pages('all')
+        invalidate_all_cards()
+        site_data.invalidate()
+        invalidate_notifications()
+        refresh_stats()
+        self.stdout.write('✓ Rebuilt ratings, search index and caches')
+        
+        self.stdout.write(self.style.SUCCESS(f'\n✅ Successfully created bulk test data!'))
+
+    def run_bulk_tasks(self, tasks, refs, workers):
+        """Split (function, count) tasks into chunks and run them, in parallel if workers > 1"""
+        chunks = [
+            (function, start, min(start + BULK_CHUNK_SIZE, count), refs)
+            for function, count in tasks
+            for start in range(0, count, BULK_CHUNK_SIZE)
+        ]
+        if workers <= 1:
+            results = [run_bulk_task(*chunk) for chunk in chunks]
+        else:
+            # Forked workers must not share the parent's database connections
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as executor:
+                results = list(executor.map(run_bulk_task, *zip(*chunks)))
+        
+        created = {}
+        for (function, start, stop, chunk_refs), count in zip(chunks, results):
+            created[function.__name__] = created.get(function.__name__, 0) + count
+        for name, count in created.items():
+            self.stdout.write(f"✓ Created {count} {name.replace('bulk_', '').replace('_', ' ')}")
+
     def clear_data(self):
         """Clear all test data"""
         try:
@@ -0,0 +1,48 @@
+"""
+Management command to refresh the cached admin dashboard statistics.
+Usage: python manage.py refresh_admin_stats [--interval=SECONDS]
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apps.core.admin_stats import STATS_TTL, refresh_stats
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the admin dashboard stats snapshot, once or in a loop'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=0,
+            help='Keep running and refresh every N seconds (default: refresh once)',
+        )
+    
+    def handle(self, *args, **options):
+        interval = options['interval']
+        if not interval:
+            self.refresh(STATS_TTL)
+            self.stdout.write(self.style.SUCCESS('\n✅ Admin stats refreshed!'))
+            return
+        
+        self.stdout.write(f'Refreshing admin stats every {interval}s (Ctrl+C to stop)')
+        try:
+            while True:
+                # Outlive the interval so admins never hit an expired snapshot
+                self.refresh(interval + STATS_TTL)
+                close_old_connections()
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            self.stdout.write('\nStopped')
+    
+    def refresh(self, timeout):
+        """Recompute and cache one snapshot"""
+        snapshot = refresh_stats(timeout=timeout)
+        self.stdout.write(
+            f'✓ {snapshot["generated_at"]:%H:%M:%S} '
+            f'{snapshot["total_notifications"]} notifications'
+        )
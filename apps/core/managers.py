@@ -0,0 +1,57 @@
+"""
+Shared querysets for the catalog models (tours, excursions, activities, transfers)
+"""
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import models
+from django.db.models import Avg, Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+class CatalogQuerySet(models.QuerySet):
+    """QuerySet used by every bookable product model"""
+    
+    def active(self):
+        """Only products visible on the website"""
+        return self.filter(is_active=True)
+    
+    def min_rating(self, value):
+        """Products whose stored average rating is at least value"""
+        return self.filter(rating_avg__gte=value)
+    
+    def order_by_rating(self):
+        """
+        Best rated first, using the indexed stored aggregates.
+        The pk tiebreaker keeps the whole ORDER BY covered by the
+        (-rating_avg, -rating_count, id) index of the active products, so the
+        database can stop after one page instead of sorting every product.
+        """
+        return self.order_by('-rating_avg', '-rating_count', 'pk')
+    
+    def with_ratings(self):
+        """
+        Annotate approved_rating_avg/approved_rating_count (approved reviews
+        with rating > 3) computed in SQL by correlated subqueries on
+        reviews_review, instead of loading the reviews into memory.
+        The average_rating/review_count properties prefer these annotations.
+        """
+        from apps.reviews.models import Review, VISIBLE_RATING_MIN
+        
+        content_type = ContentType.objects.get_for_model(self.model)
+        reviews = Review.objects.filter(
+            content_type=content_type,
+            object_id=OuterRef('pk'),
+            is_approved=True,
+            rating__gte=VISIBLE_RATING_MIN,
+        ).order_by().values('object_id')
+        
+        return self.annotate(
+            approved_rating_avg=Subquery(
+                reviews.annotate(value=Avg('rating')).values('value')[:1]
+            ),
+            approved_rating_count=Coalesce(
+                Subquery(reviews.annotate(value=Count('id')).values('value')[:1]),
+                0,
+                output_field=IntegerField(),
+            ),
+        )
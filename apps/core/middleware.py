@@ -0,0 +1,100 @@
+"""
+Middleware for AusflugAgypten
+"""
+
+import logging
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+from .cache import record_card_stats
+from .page_cache import (
+    get_cached_page, is_cacheable_request, is_cacheable_response,
+    page_cache_key, request_tags, store_page,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+class ContextProcessorQueriesMiddleware:
+    """
+    Report the queries caused by each context processor in DEBUG mode.
+    
+    Counts are collected by apps.core.instrumentation and exposed as the
+    X-Context-Processor-Queries response header, e.g. "site_settings=0".
+    """
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+    
+    def __call__(self, request):
+        request.context_processor_queries = {}
+        response = self.get_response(request)
+        
+        if settings.DEBUG and request.context_processor_queries:
+            summary = ', '.join(
+                f'{name}={count}' for name, count in request.context_processor_queries.items()
+            )
+            response['X-Context-Processor-Queries'] = summary
+            logger.debug('%s context processor queries: %s', request.path, summary)
+        return response
+
+
+class CardCacheStatsMiddleware:
+    """
+    Count cached product card hits and misses.
+    
+    The cardcache tag counts on request.card_cache; the totals are added to
+    the shared counters (manage.py card_cache_stats) and, in DEBUG mode,
+    exposed as the X-Card-Cache response header, e.g. "hits=11, misses=1".
+    """
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+    
+    def __call__(self, request):
+        request.card_cache = {'hits': 0, 'misses': 0}
+        response = self.get_response(request)
+        
+        stats = request.card_cache
+        if stats['hits'] or stats['misses']:
+            record_card_stats(stats['hits'], stats['misses'])
+            if settings.DEBUG:
+                response['X-Card-Cache'] = f'hits={stats["hits"]}, misses={stats["misses"]}'
+        return response
+
+
+class AnonymousPageCacheMiddleware:
+    """
+    Serve public pages to anonymous visitors from the cache.
+    
+    Placed after LocaleMiddleware so the key can use the active language.
+    Requests with a session or messages cookie always reach the view, and
+    responses that render a CSRF token, set cookies or queue messages are
+    not stored. See apps.core.page_cache for keys and purging.
+    """
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+    
+    def __call__(self, request):
+        tags = None
+        if settings.PAGE_CACHE_ENABLED and is_cacheable_request(request):
+            tags = request_tags(request)
+        if tags is None:
+            return self.get_response(request)
+        
+        key = page_cache_key(request, tags)
+        response = get_cached_page(key)
+        if response is not None:
+            # Visitors with a session or messages cookie get another page
+            patch_vary_headers(response, ['Cookie'])
+            response['X-Page-Cache'] = 'hit'
+            return response
+        
+        response = self.get_response(request)
+        if is_cacheable_response(request, response):
+            store_page(key, response)
+            response['X-Page-Cache'] = 'miss'
+        return response
@@ -2,10 +2,16 @@
 Core models for AusflugAgypten
 """
 
-from django.db import models
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.utils.text import slugify
 from django.urls import reverse, NoReverseMatch
 
+from .admin_stats import invalidate_notifications
+from .cache import invalidate_all_cards, invalidate_card, site_data
+from .page_cache import PAGE_CACHE_DEPENDENCIES, page_tags_for, purge_pages
+
 
 class SiteSettings(models.Model):
     """Global site settings - singleton model"""
@@ -65,6 +71,78 @@ class SiteSettings(models.Model):
         return obj
 
 
+@receiver([post_save, post_delete], sender=SiteSettings)
+@receiver([post_save, post_delete], sender='activities.ActivityCategory')
+@receiver([post_save, post_delete], sender='tours.Location')
+def invalidate_site_data(sender, **kwargs):
+    """Make every worker reload the site settings and navigation lists"""
+    # Wait for the commit so no worker caches the old rows under the new version
+    transaction.on_commit(site_data.invalidate)
+
+
+@receiver([post_save, post_delete], sender='bookings.Booking')
+@receiver([post_save, post_delete], sender='core.ContactMessage')
+@receiver([post_save, post_delete], sender='reviews.Review')
+def invalidate_admin_notifications(sender, **kwargs):
+    """Refresh the admin notification counters on the next poll"""
+    transaction.on_commit(invalidate_notifications)
+
+
+# Image models shown with a product, and their product foreign key
+CARD_IMAGE_PARENTS = {
+    'tours.TourImage': 'tour',
+    'excursions.ExcursionImage': 'excursion',
+    'activities.ActivityImage': 'activity',
+    'transfers.TransferImage': 'transfer',
+    # The cheapest route is the "from" price of a transfer card
+    'transfers.TransferRoute': 'transfer',
+}
+
+
+@receiver([post_save, post_delete], sender='tours.Tour')
+@receiver([post_save, post_delete], sender='excursions.Excursion')
+@receiver([post_save, post_delete], sender='activities.Activity')
+@receiver([post_save, post_delete], sender='transfers.Transfer')
+def invalidate_product_card(sender, instance, **kwargs):
+    """Drop the cached cards of a saved or deleted product"""
+    transaction.on_commit(lambda: invalidate_card(sender, instance.pk))
+
+
+@receiver([post_save, post_delete], sender='tours.TourImage')
+@receiver([post_save, post_delete], sender='excursions.ExcursionImage')
+@receiver([post_save, post_delete], sender='activities.ActivityImage')
+@receiver([post_save, post_delete], sender='transfers.TransferImage')
+@receiver([post_save, post_delete], sender='transfers.TransferRoute')
+def invalidate_product_image_card(sender, instance, **kwargs):
+    """Drop the cached cards of the product an image belongs to"""
+    field = sender._meta.get_field(CARD_IMAGE_PARENTS[sender._meta.label])
+    product_id = getattr(instance, field.attname)
+    transaction.on_commit(lambda: invalidate_card(field.related_model, product_id))
+
+
+@receiver([post_save, post_delete], sender='tours.TourCategory')
+@receiver([post_save, post_delete], sender='tours.Location')
+@receiver([post_save, post_delete], sender='activities.ActivityCategory')
+@receiver([post_save, post_delete], sender='transfers.TransferType')
+@receiver([post_save, post_delete], sender='transfers.VehicleType')
+def invalidate_all_product_cards(sender, **kwargs):
+    """Categories and locations are shown on the cards of many products"""
+    transaction.on_commit(invalidate_all_cards)
+
+
+def purge_dependent_pages(sender, instance, **kwargs):
+    """Drop the cached pages showing a saved or deleted object"""
+    tags = page_tags_for(instance)
+    if tags:
+        transaction.on_commit(lambda: purge_pages(*tags))
+
+
+# Too many senders for decorators, see apps.core.page_cache
+for label in [*PAGE_CACHE_DEPENDENCIES, 'core.PageHero', 'core.PageHeroBadge']:
+    post_save.connect(purge_dependent_pages, sender=label, dispatch_uid=f'purge_pages_save_{label}')
+    post_delete.connect(purge_dependent_pages, sender=label, dispatch_uid=f'purge_pages_delete_{label}')
+
+
 class HeroSlide(models.Model):
     """Hero slider slides for homepage"""
     
@@ -0,0 +1,174 @@
+"""
+Full-page cache for anonymous visitors of AusflugAgypten
+
+AnonymousPageCacheMiddleware stores whole responses of the public pages
+(status, headers and body, never cookies) and serves them again without
+running the view or rendering templates.
+Pages are keyed on language, path and the filter parameters the views
+read, plus the version tokens of their tags:
+
+    all                  every cached page (site settings, navigation)
+    tours                every page of the tours namespace
+    core:home            only the homepage
+
+purge_pages() replaces tokens, so a change to a tour drops the tour pages
+and the homepage while the blog stays cached. The model signals in
+apps.core.models call it through page_tags_for().
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist
+from django.http import HttpResponse
+from django.urls import Resolver404, resolve
+
+from .cache import get_versions, homepage_data
+
+
+PAGE_CACHE_TTL = getattr(settings, 'PAGE_CACHE_TTL', 600)
+
+# URL namespaces whose GET pages are cached
+PAGE_CACHE_NAMESPACES = {'core', 'tours', 'excursions', 'activities', 'transfers', 'blog', 'gallery'}
+
+# Query parameters read by the list views, every other parameter bypasses the cache
+PAGE_CACHE_PARAMS = {
+    'category', 'location', 'search', 'sort', 'ordering', 'rating', 'type', 'vehicle',
+    'from', 'to', 'min_price', 'max_price', 'page', 'cursor', 'format', 'count',
+}
+
+# Tracking parameters that do not change the page
+PAGE_CACHE_IGNORED_PARAMS = {'utm_source', 'utm_medium', 'utm_campaign', 'utm_term', 'utm_content', 'fbclid', 'gclid'}
+
+# Headers of a response that are not stored with it
+PAGE_CACHE_EXCLUDED_HEADERS = {'set-cookie', 'x-page-cache'}
+
+# Models and the tags of the pages showing them
+PAGE_CACHE_DEPENDENCIES = {
+    'core.SiteSettings': ['all'],
+    'core.HeroSlide': ['core:home'],
+    'tours.Tour': ['tours', 'core:home'],
+    'tours.TourImage': ['tours'],
+    'tours.TourCategory': ['all'],
+    'tours.Location': ['all'],
+    'excursions.Excursion': ['excursions'],
+    'excursions.ExcursionImage': ['excursions'],
+    'activities.Activity': ['activities', 'core:home'],
+    'activities.ActivityImage': ['activities'],
+    'activities.ActivityCategory': ['all'],
+    'transfers.Transfer': ['transfers'],
+    'transfers.TransferImage': ['transfers'],
+    'transfers.TransferRoute': ['transfers'],
+    'transfers.TransferType': ['transfers'],
+    'transfers.VehicleType': ['transfers'],
+    'blog.BlogPost': ['blog', 'core:home'],
+    'blog.BlogCategory': ['blog'],
+    'gallery.GalleryImage': ['gallery'],
+    'gallery.GalleryCategory': ['gallery'],
+    'reviews.Review': ['core:home'],
+}
+
+
+# Tags covering the homepage, whose context is cached separately as well
+HOMEPAGE_TAGS = {'all', 'core', 'core:home'}
+
+
+def version_key(tag):
+    return f'core:page-version:{tag}'
+
+
+def purge_pages(*tags):
+    """Drop the cached pages with any of the given tags, in every language"""
+    cache.delete_many([version_key(tag) for tag in tags])
+    if HOMEPAGE_TAGS.intersection(tags):
+        homepage_data.invalidate()
+
+
+def page_tags_for(instance):
+    """Tags of the cached pages that show instance"""
+    label = instance._meta.label
+    if label == 'core.PageHero':
+        # PageHero.page is the namespace of the list page it belongs to
+        return [instance.page]
+    if label == 'core.PageHeroBadge':
+        try:
+            return [instance.page_hero.page]
+        except ObjectDoesNotExist:
+            # Deleted together with its hero, which purges the page itself
+            return []
+    tags = list(PAGE_CACHE_DEPENDENCIES.get(label, []))
+    if label == 'reviews.Review':
+        target = ContentType.objects.get_for_id(instance.content_type_id).model_class()
+        if target is not None:
+            tags += PAGE_CACHE_DEPENDENCIES.get(target._meta.label, [])
+    return tags
+
+
+def request_tags(request):
+    """Tags of the page requested, None if it is not cached"""
+    try:
+        match = resolve(request.path_info)
+    except Resolver404:
+        return None
+    if match.namespace not in PAGE_CACHE_NAMESPACES:
+        return None
+    return ['all', match.namespace, f'{match.namespace}:{match.url_name}']
+
+
+def is_cacheable_request(request):
+    """Anonymous GET without session, messages or unknown parameters"""
+    if request.method != 'GET':
+        return False
+    if settings.SESSION_COOKIE_NAME in request.COOKIES or CookieStorage.cookie_name in request.COOKIES:
+        return False
+    return set(request.GET) - PAGE_CACHE_IGNORED_PARAMS <= PAGE_CACHE_PARAMS
+
+
+def is_cacheable_response(request, response):
+    """Responses that are the same for every anonymous visitor"""
+    if response.status_code != 200 or response.streaming or response.cookies:
+        return False
+    if 'private' in response.get('Cache-Control', '') or 'no-store' in response.get('Cache-Control', ''):
+        return False
+    # A CSRF token was rendered, it belongs to this visitor
+    if request.META.get('CSRF_COOKIE_NEEDS_UPDATE'):
+        return False
+    session = getattr(request, 'session', None)
+    if session is not None and session.modified:
+        return False
+    messages = getattr(request, '_messages', None)
+    return not (messages is not None and messages.added_new)
+
+
+def page_cache_key(request, tags):
+    """Cache key of the requested page at the current tag versions"""
+    params = sorted(
+        (name, value) for name, values in request.GET.lists()
+        if name in PAGE_CACHE_PARAMS for value in values
+    )
+    digest = hashlib.md5(f'{request.path}?{params}'.encode()).hexdigest()
+    versions = get_versions([version_key(tag) for tag in tags])
+    # v2: entries with all headers instead of the Content-Type only
+    return f'core:page:v2:{request.LANGUAGE_CODE}:{digest}:' + ':'.join(versions[version_key(tag)] for tag in tags)
+
+
+def get_cached_page(key):
+    """Rebuild a stored response with its headers, None on a miss"""
+    stored = cache.get(key)
+    if stored is None:
+        return None
+    status, headers, content = stored
+    response = HttpResponse(content, status=status)
+    # The headers of the middleware below (X-Frame-Options, Content-Length, ...) and of the view
+    for name, value in headers:
+        response[name] = value
+    return response
+
+
+def store_page(key, response):
+    """Store status, headers and body of a response, never its cookies"""
+    headers = [(name, value) for name, value in response.items() if name.lower() not in PAGE_CACHE_EXCLUDED_HEADERS]
+    cache.set(key, (response.status_code, headers, response.content), PAGE_CACHE_TTL)
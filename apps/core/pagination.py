@@ -0,0 +1,319 @@
+"""
+Pagination helpers for AusflugAgypten list views
+
+Page-number pagination stays the default, with the total count cached for
+a short time instead of running COUNT(*) on every request. Passing
+?cursor= switches a list to keyset pagination: the next page is fetched
+with WHERE (ordering columns) > (values of the last row), so deep pages
+cost the same as the first one and rows do not shift while scrolling.
+That only holds with an index on exactly the ordering columns plus id
+(partial on the visible rows), which every ordering offered by a list
+view has in the Meta.indexes of its model.
+?format=json returns the same pages as JSON for infinite scrolling.
+"""
+
+import base64
+import datetime
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage, Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.db.models import Q
+from django.http import Http404, JsonResponse
+from django.utils.functional import cached_property
+
+
+COUNT_TTL = getattr(settings, 'PAGINATION_COUNT_TTL', 60)
+
+
+def cached_count(queryset, timeout=None):
+    """Row count of queryset, cached per SQL statement for timeout seconds"""
+    sql, params = queryset.query.sql_with_params()
+    digest = hashlib.md5(f'{sql}{params!r}'.encode()).hexdigest()
+    key = f'core:count:{queryset.model._meta.label_lower}:{digest}'
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, COUNT_TTL if timeout is None else timeout)
+    return count
+
+
+def keyset_index(name, *fields, condition=Q(is_active=True)):
+    """
+    Index for keyset pages in the order of fields (ending with the id
+    tiebreaker), only over the rows the list views show
+    """
+    return models.Index(fields=list(fields), condition=condition, name=name)
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """Keeps microseconds, which DjangoJSONEncoder cuts to milliseconds"""
+    
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator whose total count comes from cached_count()"""
+    
+    @cached_property
+    def count(self):
+        if hasattr(self.object_list, 'query'):
+            return cached_count(self.object_list)
+        return super().count
+
+
+class InvalidCursor(InvalidPage):
+    pass
+
+
+class KeysetPage:
+    """One page of a KeysetPaginator"""
+    
+    def __init__(self, object_list, paginator, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+    
+    def __iter__(self):
+        return iter(self.object_list)
+    
+    def __len__(self):
+        return len(self.object_list)
+    
+    def has_next(self):
+        return self.next_cursor is not None
+    
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+
+class KeysetPaginator:
+    """
+    Paginate an ordered queryset by the values of its ordering columns.
+
+    The ordering must consist of plain field or annotation names; the pk
+    is appended as a tiebreaker when missing so every row has a unique
+    position. It follows the direction of the last column, so one index
+    serves an ordering and its reverse (newest/oldest). Cursors are opaque
+    URL-safe strings holding the values of the boundary row and a
+    fingerprint of the ordering, so a cursor from another sort order is
+    rejected instead of returning wrong rows.
+    """
+    
+    def __init__(self, queryset, per_page):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        
+        ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+        if not any(name.lstrip('-') in ('pk', queryset.model._meta.pk.name) for name in ordering):
+            ordering.append('-pk' if ordering and str(ordering[-1]).startswith('-') else 'pk')
+        for name in ordering:
+            if not isinstance(name, str) or '__' in name or name.startswith('?'):
+                raise ValueError(f'Keyset pagination cannot order by {name!r}')
+        self.ordering = [(name.lstrip('-'), name.startswith('-')) for name in ordering]
+        self.fingerprint = hashlib.md5(repr(self.ordering).encode()).hexdigest()[:8]
+    
+    @cached_property
+    def count(self):
+        return cached_count(self.queryset)
+    
+    def output_field(self, name):
+        """Model field or annotation field of an ordering column"""
+        annotation = self.queryset.query.annotations.get(name)
+        if annotation is not None:
+            return annotation.output_field
+        if name == 'pk':
+            return self.queryset.model._meta.pk
+        return self.queryset.model._meta.get_field(name)
+    
+    def values(self, obj):
+        """Values of the ordering columns of obj"""
+        return [getattr(obj, name) for name, descending in self.ordering]
+    
+    def encode_cursor(self, obj, reverse=False):
+        """Opaque cursor pointing after obj (or before it if reverse)"""
+        data = {
+            'o': self.fingerprint,
+            'v': self.values(obj),
+            'r': int(reverse),
+        }
+        raw = json.dumps(data, cls=CursorEncoder, separators=(',', ':'))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+    
+    def decode_cursor(self, cursor):
+        """Boundary values and direction stored in a cursor"""
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            data = json.loads(raw)
+            if data['o'] != self.fingerprint or len(data['v']) != len(self.ordering):
+                raise ValueError
+            values = [
+                self.output_field(name).to_python(value)
+                for (name, descending), value in zip(self.ordering, data['v'])
+            ]
+            return values, bool(data.get('r'))
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise InvalidCursor('Ungültiger Cursor')
+    
+    @cached_property
+    def flag_count(self):
+        """Number of leading boolean columns, e.g. -is_featured, -is_popular"""
+        count = 0
+        for name, descending in self.ordering:
+            if not isinstance(self.output_field(name), models.BooleanField):
+                break
+            count += 1
+        return count
+    
+    def conditions(self, values, reverse=False):
+        """
+        Qs matching the rows after the boundary values (before them if
+        reverse), nearest rows first.
+        
+        Each is one range scan of the index on the ordering columns, nested
+        as a >= x AND (a > x OR (a = x AND (b > y OR ...))) because SQLite
+        answers a flat OR of AND terms with one index search per term and a
+        sort of everything they match. Leading flags are compared for
+        equality instead, the rows with the next flag values follow in
+        further conditions, so no range spans the whole rest of a flag group.
+        """
+        columns = [
+            (name, 'lt' if descending != reverse else 'gt', value)
+            for (name, descending), value in zip(self.ordering, values)
+        ]
+        flags, rest = columns[:self.flag_count], columns[self.flag_count:]
+        
+        # IN rather than =, SQLite cannot seek with the bare column Django writes for booleans
+        def same_flags(depth):
+            return Q(*[Q(**{f'{name}__in': [value]}) for name, lookup, value in flags[:depth]])
+        
+        condition = None
+        for name, lookup, value in reversed(rest):
+            beyond = Q(**{f'{name}__{lookup}': value})
+            condition = beyond if condition is None else beyond | (Q(**{name: value}) & condition)
+        name, lookup, value = rest[0]
+        result = [same_flags(len(flags)) & Q(**{f'{name}__{lookup}e': value}) & condition]
+        for depth in reversed(range(len(flags))):
+            name, lookup, value = flags[depth]
+            result.append(same_flags(depth) & Q(**{f'{name}__{lookup}': value}))
+        return result
+    
+    def ordered(self, reverse=False):
+        """The queryset in pagination order, or in the opposite order if reverse"""
+        return self.queryset.order_by(*[
+            f'-{name}' if descending != reverse else name for name, descending in self.ordering
+        ])
+    
+    def rows_after(self, values, limit, reverse=False):
+        """Up to limit rows after the boundary values (before them if reverse), nearest first"""
+        rows = []
+        for condition in self.conditions(values, reverse):
+            rows += self.ordered(reverse).filter(condition)[:limit - len(rows)]
+            if len(rows) >= limit:
+                break
+        return rows
+    
+    def following(self, obj, limit, reverse=False):
+        """Up to limit rows after obj (before it if reverse), nearest first"""
+        return self.rows_after(self.values(obj), limit, reverse)
+    
+    def page(self, cursor=None):
+        """Page following cursor, or the first page without one"""
+        # One extra row tells whether there is another page in this direction
+        reverse = False
+        if cursor:
+            values, reverse = self.decode_cursor(cursor)
+            rows = self.rows_after(values, self.per_page + 1, reverse)
+        else:
+            rows = list(self.ordered()[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if reverse:
+            rows.reverse()
+        if not rows:
+            return KeysetPage(rows, self)
+        
+        has_next = has_more if not reverse else True
+        has_previous = has_more if reverse else bool(cursor)
+        return KeysetPage(
+            rows,
+            self,
+            next_cursor=self.encode_cursor(rows[-1]) if has_next else None,
+            previous_cursor=self.encode_cursor(rows[0], reverse=True) if has_previous else None,
+        )
+
+
+class KeysetPaginationMixin:
+    """
+    ListView mixin adding opt-in keyset pagination and a JSON variant.
+
+    ?cursor= (empty for the first page) renders the template with a
+    KeysetPage as page_obj, ?format=json returns the rows serialized by
+    get_json_item() together with next/previous URLs and a cached total.
+    """
+    paginator_class = CachedCountPaginator
+    cursor_param = 'cursor'
+    json_image_field = None
+    
+    def get(self, request, *args, **kwargs):
+        if request.GET.get('format') == 'json':
+            return self.render_json_page()
+        return super().get(request, *args, **kwargs)
+    
+    def use_keyset(self):
+        """Whether the request asked for keyset pagination"""
+        return self.cursor_param in self.request.GET or self.request.GET.get('format') == 'json'
+    
+    def get_keyset_page(self, queryset):
+        """KeysetPage for the cursor of the current request"""
+        paginator = KeysetPaginator(queryset, self.get_paginate_by(queryset))
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_param))
+        except InvalidCursor as e:
+            raise Http404(str(e))
+        page.next_query = self.cursor_query(page.next_cursor)
+        page.previous_query = self.cursor_query(page.previous_cursor)
+        return paginator, page
+    
+    def cursor_query(self, cursor):
+        """Current query string with the cursor replaced, or None"""
+        if cursor is None:
+            return None
+        params = self.request.GET.copy()
+        params.pop('page', None)
+        params[self.cursor_param] = cursor
+        return params.urlencode()
+    
+    def paginate_queryset(self, queryset, page_size):
+        if not self.use_keyset():
+            return super().paginate_queryset(queryset, page_size)
+        paginator, page = self.get_keyset_page(queryset)
+        return paginator, page, page.object_list, False
+    
+    def get_json_item(self, obj):
+        """JSON-ready representation of one row"""
+        item = {'id': obj.pk, 'title': str(obj), 'url': obj.get_absolute_url()}
+        if self.json_image_field:
+            image = getattr(obj, self.json_image_field)
+            item['image'] = image.url if image else None
+        return item
+    
+    def render_json_page(self):
+        """Keyset page as JSON for infinite scrolling"""
+        queryset = self.get_queryset()
+        paginator, page = self.get_keyset_page(queryset)
+        return JsonResponse({
+            'count': paginator.count,
+            'next': f'?{page.next_query}' if page.next_query else None,
+            'previous': f'?{page.previous_query}' if page.previous_query else None,
+            'results': [self.get_json_item(obj) for obj in page],
+        })
@@ -0,0 +1,175 @@
+"""
+Prices of the bookable products of AusflugAgypten
+
+Every price shown or charged comes from here:
+
+    quote(tour, adults=2, children=1)        what a booking costs
+    quote(transfer, adults=3, route=route)   a transfer on one of its routes
+    quote_many(page)                         "from" prices of a list page
+
+price_rules() reads the price fields of a tour, excursion, activity or
+transfer into PriceRules; compute_quote() turns rules and party into a
+Quote without touching the database. It is memoized on its arguments, and
+as PriceRules holds every input of a price, they are the price version:
+a changed product gets new entries instead of stale ones.
+
+Children pay CHILD_PRICE_RATE and babies BABY_PRICE_RATE of the adult
+price (settings, default full price and free). Products priced per booking
+(transfers per vehicle, group activities) cost the same for any party.
+`python manage.py bench_pricing` times the core.
+"""
+
+from decimal import ROUND_HALF_UP, Decimal
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+from django.conf import settings
+
+
+CHILD_PRICE_RATE = Decimal(str(getattr(settings, 'CHILD_PRICE_RATE', '1')))
+BABY_PRICE_RATE = Decimal(str(getattr(settings, 'BABY_PRICE_RATE', '0')))
+
+# What the unit price is charged for
+PER_PERSON = 'person'
+PER_BOOKING = 'booking'
+PER_KM = 'km'
+
+CENT = Decimal('0.01')
+
+
+class PriceRules(NamedTuple):
+    """Everything a price depends on, hashable"""
+    unit: Decimal
+    # Price before the discount, None without discount
+    regular: Optional[Decimal] = None
+    basis: str = PER_PERSON
+    child_rate: Decimal = CHILD_PRICE_RATE
+    baby_rate: Decimal = BABY_PRICE_RATE
+
+
+class Quote(NamedTuple):
+    """Price of one booking"""
+    unit_price: Decimal
+    regular_price: Optional[Decimal]
+    basis: str
+    # (kind, unit price, quantity) of every charged line: adult, child, baby or booking
+    lines: tuple
+    total: Decimal
+    regular_total: Optional[Decimal]
+    
+    @property
+    def has_discount(self):
+        return self.regular_price is not None
+
+
+def money(amount):
+    return amount.quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def discounted(regular, discount):
+    """(unit, regular) of a price and an optional lower discount price"""
+    if discount and discount < regular:
+        return discount, regular
+    return regular, None
+
+
+def price_lines(unit, basis, child_rate, baby_rate, adults, children, babies):
+    """Charged (kind, unit price, quantity) lines, free lines left out"""
+    if basis != PER_PERSON:
+        return (('booking', unit, 1),)
+    lines = (
+        ('adult', unit, adults),
+        ('child', money(unit * child_rate), children),
+        ('baby', money(unit * baby_rate), babies),
+    )
+    return tuple(line for line in lines if line[1] and line[2])
+
+
+def line_total(lines):
+    return sum((price * quantity for kind, price, quantity in lines), Decimal('0.00'))
+
+
+@lru_cache(maxsize=8192)
+def compute_quote(rules, adults=1, children=0, babies=0):
+    """Quote of a party under rules, pure"""
+    lines = price_lines(rules.unit, rules.basis, rules.child_rate, rules.baby_rate, adults, children, babies)
+    regular_total = None
+    if rules.regular is not None:
+        regular_total = line_total(
+            price_lines(rules.regular, rules.basis, rules.child_rate, rules.baby_rate, adults, children, babies)
+        )
+    return Quote(rules.unit, rules.regular, rules.basis, lines, line_total(lines), regular_total)
+
+
+def price_rules(product, route=None):
+    """PriceRules of a tour, excursion, activity or transfer (on route)"""
+    label = product._meta.label
+    if label == 'transfers.Transfer':
+        basis = PER_PERSON if product.price_per_person else PER_BOOKING
+        if route is not None:
+            # Route prices are fixed, without discount
+            return PriceRules(route.price, None, basis)
+        unit, regular = discounted(product.base_price, product.discount_price)
+        return PriceRules(unit, regular, PER_KM if product.price_per_km and basis == PER_BOOKING else basis)
+    if label == 'activities.Activity':
+        unit, regular = discounted(product.price, product.discount_price)
+        return PriceRules(unit, regular, PER_PERSON if product.price_per_person else PER_BOOKING)
+    # Tours and excursions store the sale price, original_price is the struck-through one
+    if product.original_price and product.original_price > product.price:
+        return PriceRules(product.price, product.original_price)
+    return PriceRules(product.price)
+
+
+def quote(product, adults=1, children=0, babies=0, route=None):
+    """What booking product for the party costs"""
+    return compute_quote(price_rules(product, route), adults, children, babies)
+
+
+def quote_many(products, adults=1, children=0, babies=0):
+    """
+    Quotes of a list of products with one query at most.
+
+    Transfers are quoted on their cheapest active route when that is
+    cheaper, or when they are priced per km and a route gives a real price.
+    """
+    from apps.transfers.models import TransferRoute
+    
+    products = list(products)
+    transfer_ids = [product.pk for product in products if product._meta.label == 'transfers.Transfer']
+    routes = {}
+    if transfer_ids:
+        for route in TransferRoute.objects.filter(transfer_id__in=transfer_ids, is_active=True).only('transfer_id', 'price'):
+            if route.transfer_id not in routes or route.price < routes[route.transfer_id].price:
+                routes[route.transfer_id] = route
+    
+    quotes = []
+    for product in products:
+        result = quote(product, adults, children, babies)
+        route = routes.get(product.pk) if product._meta.label == 'transfers.Transfer' else None
+        if route is not None:
+            on_route = quote(product, adults, children, babies, route=route)
+            if result.basis == PER_KM or on_route.total < result.total:
+                result = on_route
+        quotes.append(result)
+    return quotes
+
+
+def attach_quotes(products):
+    """Set product.quote, the quote for one adult, on every product without one"""
+    pending = [product for product in products if not hasattr(product, 'quote')]
+    for product, result in zip(pending, quote_many(pending)):
+        product.quote = result
+
+
+class QuoteListMixin:
+    """List view mixin quoting the products of the page in one go (product.quote)"""
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        attach_quotes(context['object_list'])
+        return context
+    
+    def get_keyset_page(self, queryset):
+        paginator, page = super().get_keyset_page(queryset)
+        attach_quotes(page.object_list)
+        return paginator, page
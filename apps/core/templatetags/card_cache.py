@@ -0,0 +1,58 @@
+"""
+Template tags for cached product cards
+
+    {% load card_cache %}
+    {% for tour in tours %}
+      {% cardcache 'list' tour %}
+        ...card markup...
+      {% endcardcache %}
+    {% endfor %}
+
+The rendered markup is stored per object, language and version (see
+apps.core.cache.card_cache_key), so only the context of the card may be
+used inside the block. Hits and misses are counted on request.card_cache.
+"""
+
+from django import template
+from django.core.cache import cache
+from django.utils.translation import get_language
+
+from apps.core.cache import CARD_CACHE_TTL, card_cache_key
+
+register = template.Library()
+
+
+class CardCacheNode(template.Node):
+    
+    def __init__(self, nodelist, name, obj):
+        self.nodelist = nodelist
+        self.name = name
+        self.obj = obj
+    
+    def render(self, context):
+        obj = self.obj.resolve(context)
+        if obj is None or obj.pk is None:
+            return self.nodelist.render(context)
+        
+        key = card_cache_key(self.name.resolve(context), obj, get_language())
+        html = cache.get(key)
+        hit = html is not None
+        if not hit:
+            html = self.nodelist.render(context)
+            cache.set(key, html, CARD_CACHE_TTL)
+        
+        stats = getattr(context.get('request'), 'card_cache', None)
+        if stats is not None:
+            stats['hits' if hit else 'misses'] += 1
+        return html
+
+
+@register.tag
+def cardcache(parser, token):
+    """{% cardcache 'name' obj %}...{% endcardcache %}"""
+    bits = token.split_contents()
+    if len(bits) != 3:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' takes a card name and an object")
+    nodelist = parser.parse(('endcardcache',))
+    parser.delete_first_token()
+    return CardCacheNode(nodelist, parser.compile_filter(bits[1]), parser.compile_filter(bits[2]))
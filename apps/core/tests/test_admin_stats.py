@@ -0,0 +1,33 @@
+"""
+Admin notification counter tests for AusflugAgypten
+"""
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from .utils import test_settings
+
+
+@test_settings
+class DashboardStatsViewTests(TestCase):
+    """The counters polled by admin_notifications.js, for staff only"""
+    
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('admin_dashboard_stats')
+    
+    def test_login_required(self):
+        response = self.client.get(self.url)
+        self.assertRedirects(response, f"{reverse('admin:login')}?next={self.url}")
+        get_user_model().objects.create_user('gast', password='x')
+        self.client.login(username='gast', password='x')
+        self.assertEqual(self.client.get(self.url).status_code, 302)
+    
+    def test_counters_and_etag(self):
+        self.client.force_login(get_user_model().objects.create_user('team', is_staff=True))
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('notifications', response.json())
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
@@ -0,0 +1,78 @@
+"""
+Homepage tests for AusflugAgypten
+"""
+
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.activities.models import Activity, ActivityCategory
+from apps.blog.models import BlogPost
+from apps.core.models import HeroSlide
+from apps.reviews.models import Review
+from apps.tours.models import Location, Tour
+from .utils import test_settings
+
+
+@test_settings
+class HomeViewQueryBudgetTests(TestCase):
+    """The homepage must not issue queries per card, review or post"""
+    
+    # Queries to build the snapshot, the navigation and the rendition lookups on a cold cache
+    COLD_BUDGET = 13
+    
+    @classmethod
+    def setUpTestData(cls):
+        category = ActivityCategory.objects.create(name='Tauchen', name_en='Diving')
+        for i in range(4):
+            Location.objects.create(name=f'Ort {i}', name_en=f'Place {i}', slug=f'ort-{i}')
+        location = Location.objects.first()
+        for i in range(8):
+            tour = Tour.objects.create(
+                title=f'Tour {i}', title_en=f'Tour {i}', slug=f'tour-{i}',
+                description='x', description_en='x', location=location,
+                price=Decimal('50'), duration='4h', featured_image='tours/a.jpg', is_featured=True,
+            )
+            Review.objects.create(
+                content_object=tour, name='Anna', email='anna@example.com',
+                rating=5, title='Super', comment='Super', is_approved=True,
+            )
+            Activity.objects.create(
+                title=f'Aktivität {i}', title_en=f'Activity {i}', slug=f'activity-{i}',
+                category=category, location=location, price=Decimal('30'),
+                featured_image='activities/a.jpg', is_featured=True,
+            )
+            BlogPost.objects.create(
+                title=f'Beitrag {i}', title_en=f'Post {i}', slug=f'post-{i}',
+                featured_image='blog/a.jpg', is_published=True,
+            )
+        for i in range(3):
+            HeroSlide.objects.create(image='hero/a.jpg', title=f'Slide {i}', subtitle='x')
+    
+    def setUp(self):
+        cache.clear()
+    
+    def test_cold_homepage_stays_within_budget(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('core:home'))
+        self.assertLessEqual(len(queries), self.COLD_BUDGET)
+        self.assertEqual(len(response.context['popular_tours']), 3)
+        self.assertEqual(len(response.context['reviews']), 6)
+    
+    def test_warm_homepage_needs_no_queries(self):
+        self.client.get(reverse('core:home'))
+        with self.assertNumQueries(0):
+            self.client.get(reverse('core:home'))
+    
+    def test_snapshot_is_rebuilt_on_content_change(self):
+        self.client.get(reverse('core:home'))
+        with self.captureOnCommitCallbacks(execute=True):
+            tour = Tour.objects.get(slug='tour-7')
+            tour.title = 'Neue Tour'
+            tour.save()
+        response = self.client.get(reverse('core:home'))
+        self.assertIn('Neue Tour', [tour.title for tour in response.context['popular_tours']])
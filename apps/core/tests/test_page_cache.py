@@ -0,0 +1,64 @@
+"""
+Full-page cache tests for AusflugAgypten
+"""
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils.cache import cc_delim_re
+
+from apps.tours.models import Tour
+from .utils import TemporaryMediaMixin, seed_test_data, test_settings
+
+
+def headers(response):
+    """Headers of a response, Vary as a set as its order depends on the middleware"""
+    result = {name: value for name, value in response.items() if name != 'X-Page-Cache'}
+    result['Vary'] = set(cc_delim_re.split(result.get('Vary', '')))
+    return result
+
+
+# Outermost, so it wins over PAGE_CACHE_ENABLED=False of test_settings
+@override_settings(PAGE_CACHE_ENABLED=True)
+@test_settings
+class PageCacheTests(TemporaryMediaMixin, TestCase):
+    """Hits must look like the response the view gave on the miss"""
+    
+    PATHS = ['/', '/touren/', '/en/']
+    
+    @classmethod
+    def setUpTestData(cls):
+        seed_test_data(count=2)
+    
+    def setUp(self):
+        cache.clear()
+    
+    def test_hit_keeps_the_headers_of_the_miss(self):
+        for path in self.PATHS:
+            with self.subTest(path):
+                miss = self.client.get(path)
+                hit = self.client.get(path)
+                self.assertEqual((miss['X-Page-Cache'], hit['X-Page-Cache']), ('miss', 'hit'))
+                self.assertEqual(hit['X-Frame-Options'], 'DENY')
+                self.assertEqual(headers(miss), headers(hit))
+                self.assertEqual(miss.content, hit.content)
+    
+    def test_hit_runs_no_queries(self):
+        self.client.get('/touren/')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/touren/')['X-Page-Cache'], 'hit')
+    
+    def test_change_purges_the_page(self):
+        tour = Tour.objects.filter(is_active=True).first()
+        self.client.get('/touren/')
+        tour.title = 'Neuer Titel'
+        with self.captureOnCommitCallbacks(execute=True):
+            tour.save()
+        response = self.client.get('/touren/')
+        self.assertEqual(response['X-Page-Cache'], 'miss')
+        self.assertContains(response, 'Neuer Titel')
+    
+    def test_visitors_with_a_session_bypass_the_cache(self):
+        self.client.get(reverse('core:home'))
+        self.client.cookies['sessionid'] = 'abc'
+        self.assertNotIn('X-Page-Cache', self.client.get(reverse('core:home')))
@@ -0,0 +1,103 @@
+"""
+Keyset pagination tests for AusflugAgypten
+"""
+
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.activities.views import ActivityListView
+from apps.blog.views import BlogListView
+from apps.excursions.views import ExcursionListView
+from apps.gallery.views import GalleryListView
+from apps.tours.views import TourListView
+from apps.transfers.views import TransferListView
+from ..pagination import KeysetPaginator
+from .utils import TemporaryMediaMixin, query_plan, seed_test_data, test_settings
+
+
+# List view, sort parameter and every value it offers
+LIST_ORDERINGS = [
+    (TourListView, 'sort', ['-created_at', 'price', '-price', 'title', 'rating']),
+    (ExcursionListView, 'sort', ['featured', 'price_low', 'price_high', 'popular', 'rating']),
+    (ActivityListView, 'ordering', ['featured', 'price_low', 'price_high', 'popular', 'rating']),
+    (TransferListView, 'ordering', ['featured', 'price_low', 'price_high', 'popular', 'rating']),
+    (GalleryListView, 'ordering', ['order', 'featured', 'newest', 'oldest']),
+    (BlogListView, 'ordering', ['']),
+]
+
+
+def list_queryset(view_class, params):
+    """Queryset the list view builds for params"""
+    view = view_class()
+    view.setup(RequestFactory().get('/', params))
+    return view.get_queryset()
+
+
+def pks(pages):
+    return [obj.pk for page in pages for obj in page]
+
+
+@test_settings
+class KeysetPaginationTests(TemporaryMediaMixin, TestCase):
+    """Cursor pages of every list ordering"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        seed_test_data()
+    
+    def orderings(self):
+        """(label, queryset) of every list ordering"""
+        return [
+            (f'{view_class.__name__} {value}', list_queryset(view_class, {param: value}))
+            for view_class, param, values in LIST_ORDERINGS
+            for value in values
+        ]
+    
+    def test_pages_have_no_duplicates_or_gaps(self):
+        for label, queryset in self.orderings():
+            with self.subTest(label):
+                # Two rows per page, so ties of flags, prices and ratings fall on page boundaries
+                paginator = KeysetPaginator(queryset, 2)
+                expected = list(paginator.ordered().values_list('pk', flat=True))
+                self.assertGreater(len(expected), 4)
+                
+                pages = [paginator.page()]
+                while pages[-1].has_next():
+                    pages.append(paginator.page(pages[-1].next_cursor))
+                self.assertEqual(pks(pages), expected)
+                
+                backwards = [pages[-1]]
+                while backwards[-1].has_previous():
+                    backwards.append(paginator.page(backwards[-1].previous_cursor))
+                self.assertEqual(pks(reversed(backwards)), expected)
+    
+    @skipUnless(connection.vendor == 'sqlite', 'SQLite query plans')
+    def test_cursor_pages_are_index_range_scans(self):
+        for label, queryset in self.orderings():
+            with self.subTest(label):
+                paginator = KeysetPaginator(queryset, 2)
+                cursor = paginator.page().next_cursor
+                with CaptureQueriesContext(connection) as queries:
+                    paginator.page(cursor)
+                table = queryset.model._meta.db_table
+                for query in queries:
+                    plan = query_plan(query['sql'])
+                    # No OR of index searches and no sort of every row after the cursor
+                    self.assertTrue(any(line.startswith(f'SEARCH {table} USING INDEX') for line in plan), plan)
+                    self.assertFalse([line for line in plan if 'TEMP B-TREE' in line or 'MULTI-INDEX OR' in line], plan)
+    
+    def test_json_pages_of_a_list(self):
+        queryset = list_queryset(TourListView, {'sort': 'price'})
+        expected = list(KeysetPaginator(queryset, 1).ordered().values_list('pk', flat=True))
+        ids = []
+        url = f"{reverse('tours:list')}?sort=price&format=json"
+        while url:
+            data = self.client.get(url).json()
+            self.assertEqual(data['count'], len(expected))
+            ids += [item['id'] for item in data['results']]
+            url = f"{reverse('tours:list')}{data['next']}" if data['next'] else None
+        self.assertEqual(ids, expected)
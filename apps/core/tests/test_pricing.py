@@ -0,0 +1,84 @@
+"""
+Pricing tests for AusflugAgypten
+"""
+
+from decimal import Decimal
+
+from django.test import SimpleTestCase, TestCase
+
+from apps.activities.models import Activity
+from apps.tours.models import Location, Tour
+from apps.transfers.models import Transfer, TransferRoute
+from ..pricing import PER_BOOKING, PER_KM, PriceRules, compute_quote, quote, quote_many
+from .utils import TemporaryMediaMixin, seed_test_data, test_settings
+
+
+class QuoteTests(SimpleTestCase):
+    """The pure core, on unsaved products"""
+    
+    def test_party_lines(self):
+        rules = PriceRules(Decimal('40.00'), child_rate=Decimal('0.5'), baby_rate=Decimal('0'))
+        result = compute_quote(rules, 2, 3, 1)
+        self.assertEqual(result.lines, (('adult', Decimal('40.00'), 2), ('child', Decimal('20.00'), 3)))
+        self.assertEqual(result.total, Decimal('140.00'))
+        self.assertIsNone(result.regular_total)
+    
+    def test_discount(self):
+        activity = Activity(price=Decimal('50.00'), discount_price=Decimal('35.00'), price_per_person=True)
+        result = quote(activity, adults=2)
+        self.assertTrue(result.has_discount)
+        self.assertEqual((result.unit_price, result.regular_price), (Decimal('35.00'), Decimal('50.00')))
+        self.assertEqual((result.total, result.regular_total), (Decimal('70.00'), Decimal('100.00')))
+        # A "discount" above the price is no discount
+        activity.discount_price = Decimal('60.00')
+        self.assertFalse(quote(activity).has_discount)
+    
+    def test_tour_original_price(self):
+        tour = Tour(price=Decimal('99.00'), original_price=Decimal('129.00'))
+        self.assertEqual(quote(tour).regular_price, Decimal('129.00'))
+        tour.original_price = None
+        self.assertFalse(quote(tour).has_discount)
+    
+    def test_per_booking(self):
+        transfer = Transfer(base_price=Decimal('60.00'), price_per_person=False)
+        result = quote(transfer, adults=4, children=2)
+        self.assertEqual(result.basis, PER_BOOKING)
+        self.assertEqual(result.lines, (('booking', Decimal('60.00'), 1),))
+        transfer.price_per_km = True
+        self.assertEqual(quote(transfer).basis, PER_KM)
+    
+    def test_changed_product_is_not_served_from_the_memo(self):
+        tour = Tour(price=Decimal('80.00'))
+        self.assertEqual(quote(tour, adults=2).total, Decimal('160.00'))
+        tour.price = Decimal('90.00')
+        self.assertEqual(quote(tour, adults=2).total, Decimal('180.00'))
+
+
+@test_settings
+class QuoteManyTests(TemporaryMediaMixin, TestCase):
+    
+    @classmethod
+    def setUpTestData(cls):
+        seed_test_data(count=2)
+    
+    def test_one_query_and_cheapest_route(self):
+        transfer = Transfer.objects.filter(is_active=True).first()
+        transfer.routes.all().delete()
+        Transfer.objects.filter(pk=transfer.pk).update(
+            base_price=Decimal('100.00'), discount_price=None, price_per_person=False, price_per_km=False,
+        )
+        transfer.refresh_from_db()
+        origin, *destinations = [
+            Location.objects.create(name=name, name_en=name, slug=f'pricing-{name.lower()}')
+            for name in ['Hurghada', 'Luxor', 'Kairo', 'Assuan']
+        ]
+        for destination, price, is_active in zip(destinations, ['70.00', '45.00', '20.00'], [True, True, False]):
+            TransferRoute.objects.create(
+                transfer=transfer, from_location=origin, to_location=destination,
+                estimated_duration=60, price=Decimal(price), is_active=is_active,
+            )
+        products = [transfer, *Tour.objects.filter(is_active=True)]
+        with self.assertNumQueries(1):
+            quotes = quote_many(products)
+        self.assertEqual(quotes[0].unit_price, Decimal('45.00'))
+        self.assertEqual([result.unit_price for result in quotes[1:]], [tour.price for tour in products[1:]])
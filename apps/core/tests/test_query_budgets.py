@@ -0,0 +1,187 @@
+"""
+Query and render time budgets for every public route of AusflugAgypten
+
+Every route under i18n_patterns is requested in German and English on a
+cold cache against the create_test_data catalog. A route exceeding its
+query budget usually means a new N+1 query. New routes fail
+test_every_route_has_a_budget until they get a budget or a skip reason.
+A table of the measurements is printed after the run.
+"""
+
+import time
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, get_resolver, reverse
+from django.urls.resolvers import LocalePrefixPattern
+from django.utils import translation
+
+from apps.activities.models import Activity
+from apps.blog.models import BlogPost
+from apps.bookings.models import Booking
+from apps.excursions.models import Excursion
+from apps.gallery.models import GalleryImage
+from apps.tours.models import Tour
+from apps.transfers.models import Transfer
+from .utils import TemporaryMediaMixin, seed_test_data, test_settings
+
+
+LANGUAGES = ['de', 'en']
+
+# Seconds per request, generous enough for slow CI machines
+MAX_RENDER_TIME = 2.0
+
+# Route: maximum number of queries on a cold cache, measured plus a little headroom.
+# Pages with images load all their renditions in one query (RenditionPrefetchMixin).
+QUERY_BUDGETS = {
+    'core:home': 15,
+    'core:about': 5,
+    'core:faq': 5,
+    'core:contact': 5,
+    'core:csrf': 2,
+    'tours:list': 12,
+    'tours:detail': 13,
+    'excursions:list': 13,
+    'excursions:detail': 12,
+    'activities:list': 14,
+    'activities:detail': 12,
+    'transfers:list': 15,
+    'transfers:detail': 13,
+    'blog:list': 13,
+    'blog:detail': 10,
+    'gallery:list': 13,
+    'gallery:prefetch': 5,
+    'search:results': 8,
+    'search:autocomplete': 10,
+    'bookings:success': 5,
+    'bookings:cancel': 5,
+    'bookings:inquiry_success': 8,
+    'users:signup': 5,
+    'users:login': 5,
+    'users:dashboard': 13,
+    'users:profile': 9,
+    'users:booking_history': 9,
+    'availability:current_month': 4,
+    'availability:calendar': 4,
+}
+
+# Routes requested by a logged-in customer
+LOGIN_ROUTES = {'users:dashboard', 'users:profile', 'users:booking_history'}
+
+# Routes that cannot be measured with a plain GET
+SKIPPED_ROUTES = {
+    'core:newsletter': 'POST only',
+    'bookings:create_checkout': 'POST only',
+    'bookings:stripe_webhook': 'POST only, signed by Stripe',
+    'bookings:inquiry': 'POST only',
+    'reviews:submit': 'POST only',
+    'users:logout': 'Ends the session',
+    # Views without a template yet
+    'core:privacy': 'core/privacy.html missing',
+    'core:impressum': 'core/impressum.html missing',
+    'core:terms': 'core/terms.html missing',
+    'gallery:detail': 'gallery/detail.html missing',
+}
+
+# Query parameters of routes that need them
+ROUTE_QUERY = {
+    'search:results': '?q=Kairo',
+    'search:autocomplete': '?q=Ka',
+}
+
+
+def route_kwargs(name):
+    """URL arguments of name for the seeded catalog"""
+    visible = {
+        'tours:detail': Tour.objects.filter(is_active=True),
+        'excursions:detail': Excursion.objects.filter(is_active=True),
+        'activities:detail': Activity.objects.filter(is_active=True),
+        'transfers:detail': Transfer.objects.filter(is_active=True),
+        'blog:detail': BlogPost.objects.filter(is_published=True),
+    }
+    if name in visible:
+        return {'slug': visible[name].order_by('pk').values_list('slug', flat=True).first()}
+    if name in ('gallery:detail', 'gallery:prefetch'):
+        return {'pk': GalleryImage.objects.filter(is_active=True).order_by('pk').values_list('pk', flat=True).first()}
+    if name in ('availability:current_month', 'availability:calendar'):
+        kwargs = {'product_type': 'tour', 'pk': Tour.objects.order_by('pk').values_list('pk', flat=True).first()}
+        if name == 'availability:calendar':
+            kwargs.update(year=date.today().year, month=date.today().month)
+        return kwargs
+    if name == 'bookings:inquiry_success':
+        return {'confirmation_code': Booking.objects.order_by('pk').values_list('confirmation_code', flat=True).first()}
+    return {}
+
+
+def public_routes():
+    """'namespace:name' of every route under i18n_patterns"""
+    names = []
+    for resolver in get_resolver().url_patterns:
+        if not (isinstance(resolver, URLResolver) and isinstance(resolver.pattern, LocalePrefixPattern)):
+            continue
+        for include in resolver.url_patterns:
+            for pattern in include.url_patterns:
+                names.append(f'{include.namespace}:{pattern.name}')
+    return names
+
+
+@test_settings
+class QueryBudgetTests(TemporaryMediaMixin, TestCase):
+    """Query count and render time of every public route"""
+    
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.results = []
+    
+    @classmethod
+    def tearDownClass(cls):
+        print_results(cls.results)
+        super().tearDownClass()
+    
+    @classmethod
+    def setUpTestData(cls):
+        seed_test_data()
+        cls.user = get_user_model().objects.get(username='testuser')
+    
+    def test_every_route_has_a_budget(self):
+        unknown = set(public_routes()) - set(QUERY_BUDGETS) - set(SKIPPED_ROUTES)
+        self.assertFalse(unknown, f'Add a query budget or skip reason for {sorted(unknown)}')
+    
+    def test_routes_stay_within_budget(self):
+        for name, budget in QUERY_BUDGETS.items():
+            for language in LANGUAGES:
+                with self.subTest(route=name, language=language):
+                    self.check_route(name, budget, language)
+    
+    def check_route(self, name, budget, language):
+        with translation.override(language):
+            url = reverse(name, kwargs=route_kwargs(name)) + ROUTE_QUERY.get(name, '')
+        
+        self.client.logout()
+        if name in LOGIN_ROUTES:
+            self.client.force_login(self.user)
+        cache.clear()
+        
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            response = self.client.get(url)
+            elapsed = time.perf_counter() - start
+        
+        self.results.append((name, language, response.status_code, len(queries), budget, elapsed, len(response.content)))
+        self.assertIn(response.status_code, (200, 302), url)
+        self.assertLessEqual(len(queries), budget, f'{url} ran {len(queries)} queries')
+        self.assertLessEqual(elapsed, MAX_RENDER_TIME, f'{url} took {elapsed:.2f}s')
+
+
+def print_results(results):
+    """Table of the measured routes, slowest first"""
+    if not results:
+        return
+    print(f'\n{"Route":<28} {"Lang":<5} {"Status":>6} {"Queries":>8} {"Budget":>7} {"ms":>8} {"KB":>8}')
+    for name, language, status, queries, budget, elapsed, size in sorted(results, key=lambda row: -row[5]):
+        print(f'{name:<28} {language:<5} {status:>6} {queries:>8} {budget:>7} {elapsed * 1000:>8.1f} {size / 1024:>8.1f}')
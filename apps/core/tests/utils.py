@@ -0,0 +1,65 @@
+"""
+Test helpers for AusflugAgypten
+"""
+
+import random
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from faker import Faker
+
+
+# Private cache, no page cache and no collectstatic manifest needed
+test_settings = override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    PAGE_CACHE_ENABLED=False,
+    STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage',
+)
+
+
+class TemporaryMediaMixin:
+    """Write uploaded and generated images to a temporary MEDIA_ROOT"""
+    
+    @classmethod
+    def setUpClass(cls):
+        cls._media_root = tempfile.mkdtemp()
+        cls._media_settings = override_settings(MEDIA_ROOT=cls._media_root)
+        cls._media_settings.enable()
+        super().setUpClass()
+    
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls._media_settings.disable()
+        shutil.rmtree(cls._media_root, ignore_errors=True)
+
+
+def run_queued_jobs():
+    """
+    Run the due background jobs like run_jobs --once.
+    
+    The worker closes old connections between jobs, which would end the
+    transaction of a TestCase on PostgreSQL.
+    """
+    from apps.jobs.queue import claim_next, run_job
+    
+    while (job := claim_next()) is not None:
+        run_job(job)
+
+
+def query_plan(sql):
+    """EXPLAIN QUERY PLAN lines of an SQLite statement"""
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return [row[3] for row in cursor.fetchall()]
+
+
+def seed_test_data(count=13, seed=0):
+    """Fill the database with create_test_data, the same rows on every run"""
+    random.seed(seed)
+    Faker.seed(seed)
+    call_command('create_test_data', count=count, stdout=StringIO())
@@ -13,6 +13,7 @@ urlpatterns = [
     path('faq/', views.FAQView.as_view(), name='faq'),
     path('contact/', views.ContactView.as_view(), name='contact'),
     path('newsletter/', views.NewsletterView.as_view(), name='newsletter'),
+    path('csrf/', views.CsrfTokenView.as_view(), name='csrf'),
     path('privacy/', views.PrivacyView.as_view(), name='privacy'),
     path('impressum/', views.ImpressumView.as_view(), name='impressum'),
     path('terms/', views.TermsView.as_view(), name='terms'),
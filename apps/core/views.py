@@ -2,74 +2,29 @@
 Core views for AusflugAgypten
 """
 
+from django.views import View
 from django.views.generic import TemplateView, FormView
+from django.middleware.csrf import get_token
+from django.utils.cache import add_never_cache_headers
 from django.contrib import messages
 from django.urls import reverse_lazy
 from django.shortcuts import redirect, render
-from django.http import HttpResponseBadRequest, HttpResponseForbidden, HttpResponseNotFound, HttpResponseServerError
-from django.contrib.contenttypes.models import ContentType
-from apps.tours.models import Tour, Location
+from django.http import JsonResponse, HttpResponseBadRequest, HttpResponseForbidden, HttpResponseNotFound, HttpResponseServerError
 from apps.excursions.models import Excursion
-from apps.activities.models import Activity, ActivityCategory
-from apps.reviews.models import Review
-from apps.blog.models import BlogPost
-from .models import ContactMessage, HeroSlide
+from apps.images.renditions import RenditionPrefetchMixin
+from .cache import homepage_data
+from .models import ContactMessage
 from .forms import ContactForm, NewsletterForm
 
 
-class HomeView(TemplateView):
+class HomeView(RenditionPrefetchMixin, TemplateView):
     """Homepage view"""
     template_name = 'core/index.html'
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        
-        # Hero slides
-        context['hero_slides'] = HeroSlide.objects.filter(
-            is_active=True
-        ).order_by('order', 'created_at')
-        
-        # Popular tours (for "Beliebte Ausflüge" section)
-        context['popular_tours'] = Tour.objects.filter(
-            is_active=True,
-            is_featured=True
-        ).select_related('location', 'category').prefetch_related('images', 'reviews')[:3]
-        
-        # Featured tours (if needed separately)
-        context['featured_tours'] = Tour.objects.filter(
-            is_active=True,
-            is_featured=True
-        ).select_related('location', 'category')[:6]
-        
-        # Locations for categories section
-        context['locations'] = Location.objects.filter(
-            is_active=True
-        ).order_by('order', 'name')[:4]
-        
-        # Activity categories for activities section
-        context['activity_categories'] = ActivityCategory.objects.filter(
-            is_active=True
-        ).order_by('order', 'name')[:4]
-        
-        # Featured activities (if needed)
-        context['featured_activities'] = Activity.objects.filter(
-            is_active=True,
-            is_featured=True
-        ).select_related('category', 'location').prefetch_related('images')[:4]
-        
-        # Reviews/Testimonials - get approved reviews with rating > 3 for tours
-        tour_content_type = ContentType.objects.get_for_model(Tour)
-        context['reviews'] = Review.objects.filter(
-            is_approved=True,
-            content_type=tour_content_type,
-            rating__gt=3
-        ).select_related('content_type')[:6]
-        
-        # Latest blog posts
-        context['latest_posts'] = BlogPost.objects.filter(
-            is_published=True
-        ).select_related('category', 'author')[:3]
-        
+        # All sections come from one cached snapshot, rebuilt when their content changes
+        context.update(homepage_data.get('context'))
         return context
 
 
@@ -152,6 +107,16 @@ class NewsletterView(FormView):
         return redirect(referer)
 
 
+class CsrfTokenView(View):
+    """CSRF token of the visitor for forms on cached pages (staticfiles/js/csrf.js)"""
+    
+    def get(self, request):
+        # get_token() also sets the csrftoken cookie
+        response = JsonResponse({'token': get_token(request)})
+        add_never_cache_headers(response)
+        return response
+
+
 # Error Handler Views
 def bad_request_view(request, exception):
     """400 Bad Request error handler"""
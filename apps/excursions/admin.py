@@ -4,6 +4,7 @@ Admin configuration for Excursions app
 
 from django.contrib import admin
 from django.utils.translation import gettext_lazy as _
+from apps.availability.admin import ScheduleInline
 from .models import Excursion, ExcursionImage, ExcursionItinerary, ExcursionInclusion
 
 
@@ -45,7 +46,7 @@ class ExcursionAdmin(admin.ModelAdmin):
     prepopulated_fields = {'slug': ('title',)}
     date_hierarchy = 'created_at'
     
-    inlines = [ExcursionImageInline, ExcursionItineraryInline, ExcursionInclusionInline]
+    inlines = [ExcursionImageInline, ExcursionItineraryInline, ExcursionInclusionInline, ScheduleInline]
     
     fieldsets = (
         ('📝 Basic Information', {
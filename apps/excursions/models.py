@@ -8,9 +8,12 @@ from django.urls import reverse
 from django.contrib.contenttypes.fields import GenericRelation
 from apps.tours.models import Location, TourCategory
 from tinymce.models import HTMLField
+from apps.reviews.models import RatingAggregateMixin
+from apps.core.managers import CatalogQuerySet
+from apps.core.pagination import keyset_index
 
 
-class Excursion(models.Model):
+class Excursion(RatingAggregateMixin, models.Model):
     """Excursion model - similar to tours but location-specific"""
     
     # Basic Information
@@ -71,6 +74,8 @@ class Excursion(models.Model):
     # Reviews (GenericRelation for reverse lookup)
     reviews = GenericRelation('reviews.Review', related_query_name='excursion')
     
+    objects = CatalogQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-is_bestseller', '-is_popular', '-is_featured', '-created_at']
         verbose_name = "Excursion"
@@ -80,6 +85,11 @@ class Excursion(models.Model):
             models.Index(fields=['is_active', 'is_featured', 'is_popular']),
             models.Index(fields=['location', 'is_active']),
             models.Index(fields=['category', 'is_active']),
+            # Keyset pagination, one per list ordering (scanned backwards for the reverse)
+            keyset_index('excursion_active_featured_idx', '-is_bestseller', '-is_popular', '-is_featured', 'title', 'id'),
+            keyset_index('excursion_active_popular_idx', '-is_popular', '-is_bestseller', '-is_featured', 'title', 'id'),
+            keyset_index('excursion_active_price_idx', 'price', 'id'),
+            keyset_index('excursion_active_rating_idx', '-rating_avg', '-rating_count', 'id'),
         ]
     
     def __str__(self):
@@ -93,18 +103,10 @@ class Excursion(models.Model):
     def get_absolute_url(self):
         return reverse('excursions:detail', kwargs={'slug': self.slug})
     
-    @property
-    def average_rating(self):
-        """Calculate average rating from reviews with rating > 3"""
-        reviews = self.reviews.filter(is_approved=True, rating__gt=3)
-        if reviews.exists():
-            return reviews.aggregate(models.Avg('rating'))['rating__avg']
-        return None
-    
     @property
     def review_count(self):
         """Count approved reviews with rating > 3"""
-        return self.reviews.filter(is_approved=True, rating__gt=3).count()
+        return self.visible_review_count
     
     @property
     def has_discount(self):
@@ -3,21 +3,26 @@ Views for Excursions app
 """
 
 from django.views.generic import ListView, DetailView
-from django.db.models import Q, Avg
+from django.db.models import Avg
 from .models import Excursion
+from apps.search.backends import filter_by_search
+from apps.core.pagination import KeysetPaginationMixin
+from apps.core.pricing import QuoteListMixin
+from apps.images.renditions import RenditionPrefetchMixin
 from apps.tours.models import Location, TourCategory
 from apps.core.models import PageHero
 
 
-class ExcursionListView(ListView):
+class ExcursionListView(RenditionPrefetchMixin, QuoteListMixin, KeysetPaginationMixin, ListView):
     """List all excursions with filtering"""
     model = Excursion
     template_name = 'excursions/index.html'
     context_object_name = 'excursions'
     paginate_by = 12
+    json_image_field = 'featured_image'
     
     def get_queryset(self):
-        queryset = Excursion.objects.filter(is_active=True).select_related('location', 'category').prefetch_related('reviews')
+        queryset = Excursion.objects.active().select_related('location', 'category').with_ratings()
         
         # Filter by category
         category_slug = self.request.GET.get('category')
@@ -37,21 +42,18 @@ class ExcursionListView(ListView):
         if max_price:
             queryset = queryset.filter(price__lte=max_price)
         
-        # Filter by rating (if reviews are implemented)
+        # Filter by minimum average rating (stored, indexed aggregate)
         min_rating = self.request.GET.get('rating')
         if min_rating:
-            # This would need to join with reviews table
-            pass
+            try:
+                queryset = queryset.min_rating(float(min_rating))
+            except ValueError:
+                pass
         
         # Search
         search = self.request.GET.get('search')
         if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) |
-                Q(title_en__icontains=search) |
-                Q(description__icontains=search) |
-                Q(description_en__icontains=search)
-            )
+            queryset = filter_by_search(queryset, search)
         
         # Sorting
         sort = self.request.GET.get('sort', 'featured')
@@ -62,13 +64,23 @@ class ExcursionListView(ListView):
         elif sort == 'popular':
             queryset = queryset.order_by('-is_popular', '-is_bestseller', '-is_featured', 'title')
         elif sort == 'rating':
-            # Would need to join with reviews
-            queryset = queryset.order_by('-is_bestseller', '-is_popular', '-is_featured', 'title')
+            queryset = queryset.order_by_rating()
         else:  # featured/default
             queryset = queryset.order_by('-is_bestseller', '-is_popular', '-is_featured', 'title')
         
         return queryset
     
+    def get_json_item(self, excursion):
+        item = super().get_json_item(excursion)
+        item.update(
+            price=excursion.quote.unit_price,
+            regular_price=excursion.quote.regular_price,
+            price_basis=excursion.quote.basis,
+            rating=excursion.average_rating,
+            review_count=excursion.visible_review_count,
+        )
+        return item
+    
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['locations'] = Location.objects.filter(is_active=True).order_by('order', 'name')
@@ -80,6 +92,7 @@ class ExcursionListView(ListView):
         context['current_min_price'] = self.request.GET.get('min_price', '0')
         context['current_max_price'] = self.request.GET.get('max_price', '500')
         context['current_sort'] = self.request.GET.get('sort', 'featured')
+        context['current_rating'] = self.request.GET.get('rating', '')
         
         # Page Hero
         try:
@@ -137,17 +150,9 @@ class ExcursionDetailView(DetailView):
         
         context['reviews'] = approved_reviews[:10]
         
-        # Calculate average rating and count (only reviews with rating > 3)
-        if approved_reviews.exists():
-            context['average_rating'] = approved_reviews.aggregate(Avg('rating'))['rating__avg']
-            context['review_count'] = approved_reviews.count()
-        else:
-            context['average_rating'] = None
-            context['review_count'] = 0
-        
-        # Add today's date for form min date
-        from datetime import date
-        context['today'] = date.today()
+        # Stored rating aggregates (only reviews with rating > 3)
+        context['average_rating'] = excursion.average_rating
+        context['review_count'] = excursion.review_count
         
         return context
 
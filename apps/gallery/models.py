@@ -6,6 +6,7 @@ from django.db import models
 from django.utils.text import slugify
 from django.urls import reverse
 from apps.tours.models import Location
+from apps.core.pagination import keyset_index
 
 
 class GalleryCategory(models.Model):
@@ -71,6 +72,10 @@ class GalleryImage(models.Model):
         verbose_name_plural = "Gallery Images"
         indexes = [
             models.Index(fields=['is_active', 'is_featured']),
+            # Keyset pagination, one per list ordering (scanned backwards for the reverse)
+            keyset_index('gallery_active_order_idx', 'order', '-is_featured', '-created_at', '-id'),
+            keyset_index('gallery_active_featured_idx', '-is_featured', 'order', '-created_at', '-id'),
+            keyset_index('gallery_active_created_idx', '-created_at', '-id'),
             models.Index(fields=['category', 'is_active']),
             models.Index(fields=['location', 'is_active']),
         ]
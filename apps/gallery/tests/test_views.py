@@ -0,0 +1,62 @@
+"""
+Gallery view tests for AusflugAgypten
+"""
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.core.pagination import KeysetPaginator
+from apps.core.tests.utils import TemporaryMediaMixin, query_plan, seed_test_data, test_settings
+from ..models import GalleryCategory, GalleryImage
+from ..views import filter_gallery_images, image_neighbours
+
+
+@test_settings
+class ImageNeighboursTests(TemporaryMediaMixin, TestCase):
+    """Previous and next images of the lightbox, in the list the visitor came from"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        seed_test_data()
+        # Ties in order and featured, so the later columns decide
+        GalleryImage.objects.filter(pk__in=GalleryImage.objects.order_by('pk').values('pk')[:6]).update(order=1)
+    
+    def gallery(self, params):
+        """Pks of the whole list for params, in list order"""
+        queryset = filter_gallery_images(params)
+        return list(KeysetPaginator(queryset, 1).ordered().values_list('pk', flat=True))
+    
+    def test_neighbours_follow_the_list(self):
+        category = GalleryCategory.objects.filter(images__is_active=True).first()
+        for params in [{}, {'ordering': 'featured'}, {'ordering': 'newest'}, {'ordering': 'oldest'}, {'category': category.slug}]:
+            pks = self.gallery(params)
+            self.assertGreater(len(pks), 2)
+            for index, pk in enumerate(pks):
+                with self.subTest(params=params, position=index):
+                    previous_images, next_images = image_neighbours(GalleryImage.objects.get(pk=pk), params, count=3)
+                    self.assertEqual([image.pk for image in previous_images], pks[max(index - 3, 0):index][::-1])
+                    self.assertEqual([image.pk for image in next_images], pks[index + 1:index + 4])
+    
+    def test_two_index_range_scans_per_lookup(self):
+        pks = self.gallery({})
+        image = GalleryImage.objects.get(pk=pks[len(pks) // 2])
+        with CaptureQueriesContext(connection) as queries:
+            image_neighbours(image, {}, count=3)
+        self.assertEqual(len(queries), 2)
+        if connection.vendor != 'sqlite':
+            return
+        for query in queries:
+            plan = query_plan(query['sql'])
+            self.assertIn('SEARCH gallery_galleryimage USING INDEX gallery_active_order_idx', plan[0])
+            self.assertFalse([line for line in plan if 'TEMP B-TREE' in line or 'MULTI-INDEX OR' in line], plan)
+    
+    def test_prefetch_endpoint(self):
+        pks = self.gallery({'ordering': 'newest'})
+        url = reverse('gallery:prefetch', kwargs={'pk': pks[1]})
+        data = self.client.get(url, {'ordering': 'newest', 'count': 2}).json()
+        self.assertEqual([item['id'] for item in data['previous']], pks[:1])
+        self.assertEqual([item['id'] for item in data['next']], pks[2:4])
+        GalleryImage.objects.filter(pk=pks[0]).update(is_active=False)
+        self.assertEqual(self.client.get(reverse('gallery:prefetch', kwargs={'pk': pks[0]})).status_code, 404)
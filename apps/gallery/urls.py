@@ -10,6 +10,7 @@ app_name = 'gallery'
 urlpatterns = [
     path('', views.GalleryListView.as_view(), name='list'),
     path('<int:pk>/', views.GalleryDetailView.as_view(), name='detail'),
+    path('<int:pk>/prefetch/', views.GalleryPrefetchView.as_view(), name='prefetch'),
 ]
 
 
@@ -2,13 +2,76 @@
 Views for Gallery app
 """
 
-from django.views.generic import ListView, DetailView
-from django.db.models import Q
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views.generic import ListView, DetailView, View
 from .models import GalleryImage, GalleryCategory
+from apps.search.backends import filter_by_search
+from apps.core.pagination import KeysetPaginationMixin, KeysetPaginator
 from apps.core.models import PageHero
+from apps.images.renditions import RenditionPrefetchMixin
 
 
-class GalleryListView(ListView):
+def filter_gallery_images(params):
+    """Active images filtered and ordered by the gallery list parameters"""
+    queryset = GalleryImage.objects.filter(is_active=True).select_related(
+        'category', 'location'
+    )
+    
+    # Filter by category
+    category_slug = params.get('category')
+    if category_slug:
+        queryset = queryset.filter(category__slug=category_slug)
+    
+    # Filter by location
+    location_slug = params.get('location')
+    if location_slug:
+        queryset = queryset.filter(location__slug=location_slug)
+    
+    # Search
+    search_query = params.get('search')
+    if search_query:
+        queryset = filter_by_search(queryset, search_query)
+    
+    # Ordering
+    ordering = params.get('ordering', 'order')
+    if ordering == 'newest':
+        queryset = queryset.order_by('-created_at')
+    elif ordering == 'oldest':
+        queryset = queryset.order_by('created_at')
+    elif ordering == 'featured':
+        queryset = queryset.order_by('-is_featured', 'order', '-created_at')
+    else:  # default: order
+        queryset = queryset.order_by('order', '-is_featured', '-created_at')
+    
+    return queryset
+
+
+def image_neighbours(image, params, count=1):
+    """
+    Images before and after image in the gallery list for params, nearest first.
+    Two keyset queries on the ordering columns, so the cost does not grow
+    with the size of the gallery.
+    """
+    paginator = KeysetPaginator(filter_gallery_images(params), count)
+    return paginator.following(image, count, reverse=True), paginator.following(image, count)
+
+
+def image_json(image):
+    """JSON-ready data of one image for the lightbox"""
+    return {
+        'id': image.pk,
+        'title': image.title,
+        'url': image.get_absolute_url(),
+        'image': image.image.url,
+        'description': image.description,
+        'alt_text': image.alt_text,
+        'location': image.location.name if image.location else None,
+        'is_featured': image.is_featured,
+    }
+
+
+class GalleryListView(RenditionPrefetchMixin, KeysetPaginationMixin, ListView):
     """List all gallery images with filtering"""
     model = GalleryImage
     template_name = 'gallery/index.html'
@@ -16,42 +79,10 @@ class GalleryListView(ListView):
     paginate_by = 24
     
     def get_queryset(self):
-        queryset = GalleryImage.objects.filter(is_active=True).select_related(
-            'category', 'location'
-        )
-        
-        # Filter by category
-        category_slug = self.request.GET.get('category')
-        if category_slug:
-            queryset = queryset.filter(category__slug=category_slug)
-        
-        # Filter by location
-        location_slug = self.request.GET.get('location')
-        if location_slug:
-            queryset = queryset.filter(location__slug=location_slug)
-        
-        # Search
-        search_query = self.request.GET.get('search')
-        if search_query:
-            queryset = queryset.filter(
-                Q(title__icontains=search_query) |
-                Q(title_en__icontains=search_query) |
-                Q(description__icontains=search_query) |
-                Q(description_en__icontains=search_query)
-            )
-        
-        # Ordering
-        ordering = self.request.GET.get('ordering', 'order')
-        if ordering == 'newest':
-            queryset = queryset.order_by('-created_at')
-        elif ordering == 'oldest':
-            queryset = queryset.order_by('created_at')
-        elif ordering == 'featured':
-            queryset = queryset.order_by('-is_featured', 'order', '-created_at')
-        else:  # default: order
-            queryset = queryset.order_by('order', '-is_featured', '-created_at')
-        
-        return queryset
+        return filter_gallery_images(self.request.GET)
+    
+    def get_json_item(self, image):
+        return image_json(image)
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -106,17 +137,26 @@ class GalleryDetailView(DetailView):
                 is_active=True
             ).exclude(id=image.id).select_related('category', 'location')[:12]
         
-        # Get all images for lightbox navigation
-        all_images = GalleryImage.objects.filter(is_active=True).order_by('order', '-is_featured', '-created_at')
-        image_list = list(all_images)
-        try:
-            current_index = image_list.index(image)
-            context['prev_image'] = image_list[current_index - 1] if current_index > 0 else None
-            context['next_image'] = image_list[current_index + 1] if current_index < len(image_list) - 1 else None
-        except ValueError:
-            context['prev_image'] = None
-            context['next_image'] = None
+        # Neighbours in the list the visitor came from (same filters and ordering)
+        previous_images, next_images = image_neighbours(image, self.request.GET)
+        context['prev_image'] = previous_images[0] if previous_images else None
+        context['next_image'] = next_images[0] if next_images else None
         
         return context
 
 
+class GalleryPrefetchView(View):
+    """Next and previous images of the lightbox as JSON, so they can be preloaded"""
+    max_count = 10
+    
+    def get(self, request, pk):
+        image = get_object_or_404(GalleryImage, pk=pk, is_active=True)
+        try:
+            count = min(max(int(request.GET.get('count', 3)), 1), self.max_count)
+        except ValueError:
+            count = 3
+        previous_images, next_images = image_neighbours(image, request.GET, count)
+        return JsonResponse({
+            'previous': [image_json(obj) for obj in previous_images],
+            'next': [image_json(obj) for obj in next_images],
+        })
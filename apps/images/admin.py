@@ -0,0 +1,19 @@
+"""
+Admin configuration for Images app
+"""
+
+from django.contrib import admin
+from .models import Rendition
+
+
+@admin.register(Rendition)
+class RenditionAdmin(admin.ModelAdmin):
+    """🖼️ Image Renditions - Resized copies served to the website"""
+    
+    list_display = ['source', 'format', 'width', 'height', 'size', 'status', 'updated_at']
+    list_filter = ['status', 'format', 'width']
+    search_fields = ['source', 'file']
+    readonly_fields = ['source', 'source_hash', 'format', 'width', 'height', 'file', 'size', 'status', 'error', 'created_at', 'updated_at']
+    
+    def has_add_permission(self, request):
+        return False
@@ -0,0 +1,81 @@
+"""
+Management command to create missing image renditions.
+Usage: python manage.py generate_renditions [--workers=N] [--force]
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from apps.core.cache import invalidate_all_cards
+from apps.images.models import Rendition
+from apps.images.renditions import RENDITION_FIELDS, process_object
+
+
+def init_worker():
+    """Forked workers must not reuse the parent's database connections"""
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    help = 'Creates the responsive renditions of all uploaded images'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Number of worker processes (default: number of CPUs)',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Recreate renditions that already exist (and strip the EXIF data of their originals)',
+        )
+    
+    def handle(self, *args, **options):
+        force = options['force']
+        existing = set()
+        if not force:
+            # Sources whose renditions are all ready
+            incomplete = Rendition.objects.exclude(status=Rendition.STATUS_READY).values_list('source', flat=True)
+            existing = set(Rendition.objects.values_list('source', flat=True).distinct()) - set(incomplete)
+        
+        jobs = []
+        for rendition_field in RENDITION_FIELDS:
+            queryset = rendition_field.get_queryset().values_list('pk', rendition_field.field)
+            for pk, name in queryset.iterator():
+                if name not in existing:
+                    jobs.append((rendition_field.model, pk, rendition_field.field))
+        
+        if not jobs:
+            self.stdout.write(self.style.SUCCESS('\n✅ All images already have renditions!'))
+            return
+        
+        self.stdout.write(f'Creating renditions for {len(jobs)} images with {options["workers"]} workers...')
+        connections.close_all()
+        files = failed = 0
+        with ProcessPoolExecutor(
+            max_workers=max(options['workers'], 1),
+            mp_context=multiprocessing.get_context('fork'),
+            initializer=init_worker,
+        ) as executor:
+            futures = {executor.submit(process_object, *job, force=force): job for job in jobs}
+            for future in as_completed(futures):
+                model_label, pk, field_name = futures[future]
+                try:
+                    files += future.result()
+                except Exception as e:
+                    failed += 1
+                    self.stderr.write(f'✗ {model_label} #{pk} {field_name}: {e}')
+        
+        # Cached product cards were rendered without the new srcsets
+        invalidate_all_cards()
+        self.stdout.write(f'✓ {len(jobs) - failed} images, {files} rendition files')
+        if failed:
+            self.stdout.write(self.style.WARNING(f'\n⚠ {failed} images failed'))
+        else:
+            self.stdout.write(self.style.SUCCESS('\n✅ Renditions created!'))
@@ -0,0 +1,107 @@
+"""
+Image rendition models for AusflugAgypten
+"""
+
+import logging
+
+from django.core.files.storage import default_storage
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from .renditions import RENDITION_FIELDS, RENDITION_FORMATS, delete_renditions, get_rendition_fields, queue_renditions
+
+
+logger = logging.getLogger(__name__)
+
+
+class Rendition(models.Model):
+    """One resized and re-encoded copy of an uploaded image"""
+    FORMAT_CHOICES = [(key, key.upper()) for key in RENDITION_FORMATS]
+    STATUS_PENDING = 'pending'
+    STATUS_PROCESSING = 'processing'
+    STATUS_READY = 'ready'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Wartend'),
+        (STATUS_PROCESSING, 'In Bearbeitung'),
+        (STATUS_READY, 'Fertig'),
+        (STATUS_FAILED, 'Fehlgeschlagen'),
+    ]
+    
+    source = models.CharField(max_length=255, db_index=True, verbose_name="Quelldatei")
+    source_hash = models.CharField(max_length=64, blank=True, verbose_name="Inhalts-Hash")
+    format = models.CharField(max_length=10, choices=FORMAT_CHOICES, verbose_name="Format")
+    width = models.PositiveIntegerField(verbose_name="Breite")
+    height = models.PositiveIntegerField(verbose_name="Höhe")
+    file = models.CharField(max_length=255, blank=True, verbose_name="Datei")
+    size = models.PositiveIntegerField(default=0, verbose_name="Größe (Bytes)")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING, verbose_name="Status")
+    error = models.TextField(blank=True, verbose_name="Fehler")
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = "Rendition"
+        verbose_name_plural = "Renditions"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['source', 'format', 'width'],
+                name='rendition_unique_source_format_width',
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.source} ({self.format}, {self.width}w)"
+    
+    @property
+    def url(self):
+        return default_storage.url(self.file)
+
+
+def create_renditions(sender, instance, raw=False, **kwargs):
+    """Queue the renditions of newly uploaded images, the save itself does no image work"""
+    if raw:
+        return
+    for rendition_field in get_rendition_fields(sender):
+        try:
+            queue_renditions(instance, rendition_field)
+        except Exception:
+            # A broken upload must not fail the save, the original file is served instead
+            logger.exception('Could not queue renditions for %s #%s', sender._meta.label, instance.pk)
+
+
+def remember_replaced_images(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Note the stored images a save replaces, their renditions go after the commit"""
+    fields = [rendition_field.field for rendition_field in get_rendition_fields(sender)]
+    if update_fields is not None:
+        fields = [field for field in fields if field in update_fields]
+    if raw or instance.pk is None or not fields:
+        return
+    stored = sender._default_manager.filter(pk=instance.pk).values(*fields).first() or {}
+    instance._replaced_images = [
+        stored[field] for field in fields
+        if stored.get(field) and stored[field] != getattr(instance, field).name
+    ]
+
+
+def delete_replaced_renditions(sender, instance, raw=False, **kwargs):
+    """Drop the renditions of the images remember_replaced_images() noted"""
+    for name in getattr(instance, '_replaced_images', []):
+        transaction.on_commit(lambda name=name: delete_renditions(name))
+    instance._replaced_images = []
+
+
+def delete_renditions_of_deleted(sender, instance, **kwargs):
+    """Drop the renditions of a deleted object's images"""
+    for rendition_field in get_rendition_fields(sender):
+        name = getattr(instance, rendition_field.field).name
+        if name:
+            transaction.on_commit(lambda name=name: delete_renditions(name))
+
+
+for rendition_field in RENDITION_FIELDS:
+    pre_save.connect(remember_replaced_images, sender=rendition_field.model)
+    post_save.connect(create_renditions, sender=rendition_field.model)
+    post_save.connect(delete_replaced_renditions, sender=rendition_field.model)
+    post_delete.connect(delete_renditions_of_deleted, sender=rendition_field.model)
@@ -0,0 +1,431 @@
+"""
+Responsive image renditions for AusflugAgypten
+
+Uploaded images are resized to fixed widths and encoded as AVIF (when
+Pillow supports it), WebP and JPEG. Files are named after a hash of the
+source content, so identical uploads share their renditions and a
+replaced image never serves stale files from browser or CDN caches.
+
+Saving a model only plans the renditions (pending Rendition rows, sized
+from the image header), the encoding runs in the run_jobs worker so
+admin uploads do not block a gunicorn worker. The worker also rewrites
+the uploaded original without its EXIF data (camera, GPS position), as
+the original is still linked from the templates.
+"""
+
+import hashlib
+from io import BytesIO
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Model, Q
+from PIL import Image, ImageOps
+
+try:
+    # Optional plugin registering AVIF with Pillow versions without built-in support
+    import pillow_avif  # noqa: F401
+except ImportError:
+    pass
+
+
+RENDITION_WIDTHS = getattr(settings, 'IMAGE_RENDITION_WIDTHS', (400, 800, 1200, 1920))
+RENDITION_CACHE_TTL = 60 * 60 * 24
+THUMBNAIL_WIDTH = 400
+
+# Format key: (Pillow format, MIME type, file extension, save options)
+RENDITION_FORMATS = {
+    'avif': ('AVIF', 'image/avif', 'avif', {'quality': 55}),
+    'webp': ('WEBP', 'image/webp', 'webp', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', 'image/jpeg', 'jpg', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+
+# Formats of uploads that are rewritten without EXIF data
+STRIPPED_FORMATS = {'JPEG', 'PNG', 'WEBP'}
+
+EXIF_ORIENTATION = 0x0112
+
+
+class RenditionField:
+    """An image field whose uploads get renditions"""
+    
+    def __init__(self, model, field, thumbnail=None):
+        self.model = model
+        self.field = field
+        # Optional ImageField filled with a small JPEG when empty
+        self.thumbnail = thumbnail
+    
+    def get_model(self):
+        """Model class of the field"""
+        return apps.get_model(self.model)
+    
+    def get_queryset(self):
+        """Objects with an image in the field"""
+        empty = Q(**{self.field: ''}) | Q(**{f'{self.field}__isnull': True})
+        return self.get_model()._default_manager.exclude(empty)
+
+
+RENDITION_FIELDS = [
+    RenditionField('tours.Tour', 'featured_image'),
+    RenditionField('excursions.Excursion', 'featured_image'),
+    RenditionField('activities.Activity', 'featured_image'),
+    RenditionField('transfers.Transfer', 'featured_image'),
+    RenditionField('core.HeroSlide', 'image'),
+    RenditionField('core.PageHero', 'background_image'),
+    RenditionField('gallery.GalleryImage', 'image', thumbnail='thumbnail'),
+]
+
+
+def get_rendition_fields(model):
+    """RenditionFields registered for a model class"""
+    return [field for field in RENDITION_FIELDS if field.model == model._meta.label]
+
+
+def available_formats():
+    """Rendition formats the installed Pillow can write, best compression first"""
+    Image.init()
+    return [key for key, (pil_format, *rest) in RENDITION_FORMATS.items() if pil_format in Image.SAVE]
+
+
+def rendition_widths(source_width):
+    """Configured widths not wider than the source, or the source width for small images"""
+    widths = [width for width in RENDITION_WIDTHS if width <= source_width]
+    return widths or [source_width]
+
+
+def rendition_name(digest, width, format_key):
+    """Content-hashed storage name of one rendition"""
+    extension = RENDITION_FORMATS[format_key][2]
+    return f'renditions/{digest[:2]}/{digest}-{width}w.{extension}'
+
+
+def encode(image, format_key):
+    """Image encoded in one rendition format"""
+    pil_format, mime_type, extension, options = RENDITION_FORMATS[format_key]
+    if pil_format == 'JPEG':
+        if image.mode in ('RGBA', 'LA', 'P'):
+            # JPEG has no transparency, flatten onto white
+            rgba = image.convert('RGBA')
+            background = Image.new('RGB', rgba.size, (255, 255, 255))
+            background.paste(rgba, mask=rgba.getchannel('A'))
+            image = background
+        elif image.mode != 'RGB':
+            image = image.convert('RGB')
+    elif image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() or image.mode == 'P' else 'RGB')
+    
+    buffer = BytesIO()
+    # EXIF (camera data, GPS position) is not copied into renditions
+    image.save(buffer, pil_format, **options)
+    return buffer.getvalue()
+
+
+def cache_key(name):
+    return f'images:renditions:{hashlib.md5(name.encode()).hexdigest()}'
+
+
+def oriented_size(image):
+    """Width and height of an opened image after applying its EXIF orientation"""
+    # Orientations 5-8 rotate by 90 degrees
+    if image.getexif().get(EXIF_ORIENTATION, 1) in (5, 6, 7, 8):
+        return image.height, image.width
+    return image.width, image.height
+
+
+def sync_planned(source, width, height):
+    """Make the Rendition rows of source match the widths and formats it needs"""
+    from .models import Rendition
+    
+    planned = {
+        (format_key, rendition_width): max(round(height * rendition_width / width), 1)
+        for rendition_width in rendition_widths(width)
+        for format_key in available_formats()
+    }
+    rows = {
+        (rendition.format, rendition.width): rendition
+        for rendition in Rendition.objects.filter(source=source)
+    }
+    obsolete = [rendition.pk for key, rendition in rows.items() if key not in planned]
+    Rendition.objects.filter(pk__in=obsolete).delete()
+    Rendition.objects.bulk_create([
+        Rendition(source=source, format=format_key, width=rendition_width, height=rendition_height)
+        for (format_key, rendition_width), rendition_height in planned.items()
+        if (format_key, rendition_width) not in rows
+    ])
+    return list(Rendition.objects.filter(source=source).order_by('-width', 'format'))
+
+
+def strip_metadata(instance, rendition_field):
+    """
+    Rewrite the stored original of an object without its EXIF data.
+    
+    The EXIF orientation is applied to the pixels first, so the image
+    still shows upright; the colour profile is kept. Unchanged JPEGs keep
+    their quantization tables. Returns True if the file was rewritten.
+    """
+    from apps.core.cache import invalidate_card
+    from apps.core.page_cache import page_tags_for, purge_pages
+    
+    from .models import Rendition
+    
+    file = getattr(instance, rendition_field.field)
+    storage = file.storage
+    try:
+        with storage.open(file.name, 'rb') as source:
+            image = Image.open(BytesIO(source.read()))
+    except Exception:
+        # generate_renditions() runs into the same error and records it on the renditions
+        return False
+    exif = image.getexif()
+    if image.format not in STRIPPED_FORMATS or not exif or getattr(image, 'is_animated', False):
+        return False
+    
+    options = {'exif': b''}
+    if image.info.get('icc_profile'):
+        options['icc_profile'] = image.info['icc_profile']
+    if exif.get(EXIF_ORIENTATION, 1) != 1:
+        stripped = ImageOps.exif_transpose(image)
+        if image.format == 'JPEG':
+            options['quality'] = 95
+    else:
+        stripped = image
+        if image.format == 'JPEG':
+            options.update(quality='keep', subsampling='keep')
+    buffer = BytesIO()
+    stripped.save(buffer, image.format, **options)
+    
+    # The rewritten file gets a name of its own, the original is only deleted
+    # once the object points to the new file
+    old_name = file.name
+    name = storage.save(old_name, ContentFile(buffer.getvalue()))
+    try:
+        with transaction.atomic():
+            type(instance)._default_manager.filter(pk=instance.pk).update(**{rendition_field.field: name})
+            Rendition.objects.filter(source=old_name).update(source=name)
+    except Exception:
+        storage.delete(name)
+        raise
+    setattr(instance, rendition_field.field, name)
+    storage.delete(old_name)
+    cache.delete(cache_key(old_name))
+    # update() sends no post_save, drop the cached pages and cards linking the old file directly
+    purge_pages(*page_tags_for(instance))
+    invalidate_card(type(instance), instance.pk)
+    return True
+
+
+def plan_renditions(file):
+    """Create pending Rendition rows for a stored image, reading only its header"""
+    with file.storage.open(file.name, 'rb') as source:
+        width, height = oriented_size(Image.open(source))
+    return sync_planned(file.name, width, height)
+
+
+def generate_renditions(file, force=False):
+    """Encode the planned (or all, if force) renditions of a stored image and return their rows"""
+    from .models import Rendition
+    
+    storage = file.storage
+    try:
+        with storage.open(file.name, 'rb') as source:
+            data = source.read()
+        image = Image.open(BytesIO(data))
+        image = ImageOps.exif_transpose(image)
+    except Exception as e:
+        Rendition.objects.filter(source=file.name).exclude(status=Rendition.STATUS_READY).update(
+            status=Rendition.STATUS_FAILED, error=str(e)
+        )
+        raise
+    digest = hashlib.sha256(data).hexdigest()[:32]
+    renditions = sync_planned(file.name, image.width, image.height)
+    
+    errors = []
+    resized = {}
+    for rendition in renditions:
+        if rendition.status == Rendition.STATUS_READY and rendition.source_hash == digest and not force:
+            continue
+        Rendition.objects.filter(pk=rendition.pk).update(status=Rendition.STATUS_PROCESSING)
+        try:
+            if rendition.width not in resized:
+                # Widths are processed widest first, each size is resized from the original once
+                resized[rendition.width] = image if rendition.width == image.width else image.resize(
+                    (rendition.width, rendition.height), Image.LANCZOS, reducing_gap=3.0
+                )
+            name = rendition_name(digest, rendition.width, rendition.format)
+            if storage.exists(name):
+                size = storage.size(name)
+            else:
+                content = encode(resized[rendition.width], rendition.format)
+                name = storage.save(name, ContentFile(content))
+                size = len(content)
+        except Exception as e:
+            rendition.status = Rendition.STATUS_FAILED
+            rendition.error = str(e)
+            errors.append(e)
+        else:
+            rendition.status = Rendition.STATUS_READY
+            rendition.source_hash = digest
+            rendition.file = name
+            rendition.size = size
+            rendition.error = ''
+        rendition.save(update_fields=['status', 'source_hash', 'file', 'size', 'error'])
+    
+    cache.delete(cache_key(file.name))
+    if errors:
+        raise RuntimeError(f'{len(errors)} renditions of {file.name} failed: {errors[0]}')
+    return renditions
+
+
+def queue_renditions(instance, rendition_field):
+    """Plan the renditions of a new upload and leave the encoding to the job worker"""
+    from apps.jobs.queue import enqueue
+    
+    from .models import Rendition
+    
+    file = getattr(instance, rendition_field.field)
+    if not file or Rendition.objects.filter(source=file.name).exists():
+        return None
+    plan_renditions(file)
+    return enqueue(
+        'images.create_renditions',
+        model_label=rendition_field.model,
+        pk=instance.pk,
+        field_name=rendition_field.field,
+    )
+
+
+def create_thumbnail(instance, rendition_field, renditions):
+    """Point an empty thumbnail field to a small JPEG copy of the image"""
+    thumbnail = getattr(instance, rendition_field.thumbnail)
+    if thumbnail:
+        return
+    jpegs = sorted(
+        (rendition for rendition in renditions if rendition.format == 'jpeg'),
+        key=lambda rendition: abs(rendition.width - THUMBNAIL_WIDTH),
+    )
+    if not jpegs:
+        return
+    
+    source = getattr(instance, rendition_field.field)
+    with source.storage.open(jpegs[0].file, 'rb') as jpeg:
+        content = ContentFile(jpeg.read())
+    field = instance._meta.get_field(rendition_field.thumbnail)
+    name = field.storage.save(field.generate_filename(instance, f'{jpegs[0].source_hash}.jpg'), content)
+    # update() keeps the save signals (and this function) from running again
+    type(instance)._default_manager.filter(pk=instance.pk).update(**{rendition_field.thumbnail: name})
+    setattr(instance, rendition_field.thumbnail, name)
+
+
+def process_instance(instance, rendition_field, force=False):
+    """Strip the original and encode missing renditions (and thumbnail) of one object, returns the number of renditions"""
+    from .models import Rendition
+    
+    if not getattr(instance, rendition_field.field):
+        return 0
+    # A rewritten original has a new content hash, its renditions follow
+    stripped = strip_metadata(instance, rendition_field)
+    file = getattr(instance, rendition_field.field)
+    pending = Rendition.objects.filter(source=file.name).exclude(status=Rendition.STATUS_READY)
+    if not force and not stripped and Rendition.objects.filter(source=file.name).exists() and not pending.exists():
+        return 0
+    renditions = generate_renditions(file, force=force)
+    if rendition_field.thumbnail:
+        create_thumbnail(instance, rendition_field, renditions)
+    return len(renditions)
+
+
+def process_object(model_label, pk, field_name, force=False):
+    """process_instance() by model label and pk, used by the backfill worker processes"""
+    rendition_field = next(
+        field for field in RENDITION_FIELDS
+        if field.model == model_label and field.field == field_name
+    )
+    instance = rendition_field.get_model()._default_manager.filter(pk=pk).first()
+    if instance is None:
+        return 0
+    return process_instance(instance, rendition_field, force=force)
+
+
+def delete_renditions(name):
+    """
+    Remove the renditions of a replaced or deleted image no object uses any more.
+    
+    Rendition files are named after the content, so a file is only deleted
+    when no rendition of another source shares it.
+    """
+    from .models import Rendition
+    
+    for rendition_field in RENDITION_FIELDS:
+        if rendition_field.get_model()._default_manager.filter(**{rendition_field.field: name}).exists():
+            return 0
+    renditions = Rendition.objects.filter(source=name)
+    files = set(renditions.exclude(file='').values_list('file', flat=True))
+    deleted, _ = renditions.delete()
+    shared = set(Rendition.objects.filter(file__in=files).values_list('file', flat=True))
+    for file in files - shared:
+        default_storage.delete(file)
+    cache.delete(cache_key(name))
+    return deleted
+
+
+def get_renditions(name):
+    """Renditions of a stored image as {format: [(width, url), ...]}, narrowest first"""
+    from .models import Rendition
+    
+    key = cache_key(name)
+    renditions = cache.get(key)
+    if renditions is None:
+        renditions = {}
+        ready = Rendition.objects.filter(source=name, status=Rendition.STATUS_READY)
+        for rendition in ready.order_by('width'):
+            renditions.setdefault(rendition.format, []).append((rendition.width, rendition.url))
+        cache.set(key, renditions, RENDITION_CACHE_TTL)
+    return renditions
+
+
+def prefetch_renditions(objects):
+    """
+    Load the renditions of the images of objects (their registered fields)
+    into the cache in one query, so a page of images does not look them up
+    one by one on a cold cache
+    """
+    from .models import Rendition
+    
+    names = set()
+    for obj in objects:
+        if not isinstance(obj, Model):
+            continue
+        for rendition_field in get_rendition_fields(type(obj)):
+            image = getattr(obj, rendition_field.field)
+            if image:
+                names.add(image.name)
+    keys = {cache_key(name): name for name in names}
+    missing = {name: {} for key, name in keys.items() if key not in cache.get_many(keys)}
+    if not missing:
+        return
+    ready = Rendition.objects.filter(source__in=missing, status=Rendition.STATUS_READY)
+    for rendition in ready.order_by('width'):
+        missing[rendition.source].setdefault(rendition.format, []).append((rendition.width, rendition.url))
+    cache.set_many({cache_key(name): renditions for name, renditions in missing.items()}, RENDITION_CACHE_TTL)
+
+
+class RenditionPrefetchMixin:
+    """
+    View mixin loading the renditions of every image of the page in one
+    query: the objects of the list and the instances and lists of instances
+    in the context (page hero, hero slides, ...)
+    """
+    
+    def render_to_response(self, context, **response_kwargs):
+        objects = list(context.get('object_list') or [])
+        for value in context.values():
+            if isinstance(value, (list, tuple)):
+                objects.extend(value)
+            else:
+                objects.append(value)
+        prefetch_renditions(objects)
+        return super().render_to_response(context, **response_kwargs)
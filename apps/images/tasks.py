@@ -0,0 +1,18 @@
+"""
+Background tasks for Images app
+"""
+
+from django.apps import apps
+
+from apps.core.cache import invalidate_card
+from apps.jobs.queue import task
+
+from .renditions import process_object
+
+
+@task('images.create_renditions')
+def create_renditions(model_label, pk, field_name):
+    """Encode the planned renditions of one uploaded image"""
+    if process_object(model_label, pk, field_name):
+        # Cached cards of the object still lack the srcset
+        invalidate_card(apps.get_model(model_label), pk)
@@ -0,0 +1,53 @@
+"""
+Template tags for responsive images
+
+    {% load renditions %}
+    <img src="{{ tour.featured_image.url }}" srcset="{% srcset tour.featured_image %}" sizes="33vw">
+    {% picture tour.featured_image alt=tour.title sizes="33vw" css_class="tour-card-image" %}
+    style="background-image: url('{{ slide.image|rendition:1920 }}')"
+"""
+
+from django import template
+
+from apps.images.renditions import RENDITION_FORMATS, get_renditions
+
+register = template.Library()
+
+
+@register.simple_tag
+def srcset(image, format='jpeg'):
+    """srcset value with the renditions of image in one format, empty without renditions"""
+    if not image:
+        return ''
+    return ', '.join(f'{url} {width}w' for width, url in get_renditions(image.name).get(format, []))
+
+
+@register.inclusion_tag('images/picture.html')
+def picture(image, alt='', sizes='100vw', css_class='', loading='lazy'):
+    """<picture> offering the AVIF/WebP renditions with the JPEG ones as fallback"""
+    renditions = get_renditions(image.name) if image else {}
+    sources = [
+        {
+            'type': RENDITION_FORMATS[format_key][1],
+            'srcset': ', '.join(f'{url} {width}w' for width, url in renditions[format_key]),
+        }
+        for format_key in ('avif', 'webp') if format_key in renditions
+    ]
+    return {
+        'src': image.url if image else '',
+        'srcset': ', '.join(f'{url} {width}w' for width, url in renditions.get('jpeg', [])),
+        'sources': sources,
+        'alt': alt,
+        'sizes': sizes,
+        'css_class': css_class,
+        'loading': loading,
+    }
+
+
+@register.filter
+def rendition(image, width):
+    """URL of the widest JPEG rendition not wider than width, for CSS backgrounds"""
+    if not image:
+        return ''
+    candidates = [url for rendition_width, url in get_renditions(image.name).get('jpeg', []) if rendition_width <= int(width)]
+    return candidates[-1] if candidates else image.url
@@ -0,0 +1,155 @@
+"""
+Image rendition tests for AusflugAgypten
+"""
+
+from io import BytesIO
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import DatabaseError
+from django.test import TestCase
+from PIL import Image
+
+from apps.core.tests.utils import TemporaryMediaMixin, run_queued_jobs, test_settings
+from apps.gallery.models import GalleryImage
+from ..models import Rendition
+from ..renditions import get_rendition_fields, get_renditions, prefetch_renditions, strip_metadata
+
+
+def upload(name, size=(600, 400), image_format='JPEG', exif=None):
+    buffer = BytesIO()
+    options = {'exif': exif} if exif is not None else {}
+    Image.new('RGB', size, (200, 100, 50)).save(buffer, image_format, **options)
+    return SimpleUploadedFile(name, buffer.getvalue())
+
+
+def camera_exif():
+    """EXIF of a phone photo: rotated by 90 degrees, with camera and GPS position"""
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    exif[0x010F] = 'Kamera'
+    exif[0x8825] = {1: 'N', 2: (27.0, 15.0, 27.0), 3: 'E', 4: (33.0, 48.0, 43.0)}
+    return exif
+
+
+@test_settings
+class StripMetadataTests(TemporaryMediaMixin, TestCase):
+    """Visitors download the original too, so it must not keep the EXIF data"""
+    
+    def test_original_is_stored_without_exif(self):
+        gallery_image = GalleryImage.objects.create(title='Strand', image=upload('strand.jpg', exif=camera_exif()))
+        old_name = gallery_image.image.name
+        run_queued_jobs()
+        gallery_image.refresh_from_db()
+        self.assertNotEqual(gallery_image.image.name, old_name)
+        self.assertFalse(default_storage.exists(old_name))
+        
+        with gallery_image.image.open('rb') as stored:
+            original = Image.open(BytesIO(stored.read()))
+        self.assertFalse(original.getexif())
+        # The orientation went into the pixels
+        self.assertEqual(original.size, (400, 600))
+        renditions = Rendition.objects.filter(source=gallery_image.image.name)
+        self.assertTrue(renditions.exists())
+        self.assertFalse(renditions.exclude(status=Rendition.STATUS_READY).exists())
+        self.assertEqual({(rendition.width, rendition.height) for rendition in renditions}, {(400, 600)})
+    
+    def test_images_without_exif_are_left_alone(self):
+        content = upload('karte.png', image_format='PNG').read()
+        gallery_image = GalleryImage.objects.create(title='Karte', image=SimpleUploadedFile('karte.png', content))
+        run_queued_jobs()
+        with gallery_image.image.open('rb') as stored:
+            self.assertEqual(stored.read(), content)
+    
+    def test_original_survives_a_failed_switch(self):
+        gallery_image = GalleryImage.objects.create(title='Strand', image=upload('strand.jpg', exif=camera_exif()))
+        name = gallery_image.image.name
+        directory = name.rsplit('/', 1)[0]
+        files = default_storage.listdir(directory)[1]
+        with patch.object(Rendition.objects, 'filter', side_effect=DatabaseError('Verbindung verloren')):
+            with self.assertRaises(DatabaseError):
+                strip_metadata(gallery_image, get_rendition_fields(GalleryImage)[0])
+        gallery_image.refresh_from_db()
+        self.assertEqual(gallery_image.image.name, name)
+        # The original is untouched and the rewritten file removed again
+        with gallery_image.image.open('rb') as stored:
+            self.assertTrue(Image.open(BytesIO(stored.read())).getexif())
+        self.assertEqual(default_storage.listdir(directory)[1], files)
+
+
+@test_settings
+class DeleteRenditionsTests(TemporaryMediaMixin, TestCase):
+    """Replaced and deleted images leave no renditions behind"""
+    
+    def create(self, title, name, size=(600, 400)):
+        gallery_image = GalleryImage.objects.create(title=title, image=upload(name, size))
+        run_queued_jobs()
+        gallery_image.refresh_from_db()
+        return gallery_image
+    
+    def files(self, name):
+        return [
+            rendition.file for rendition in Rendition.objects.filter(source=name)
+            if default_storage.exists(rendition.file)
+        ]
+    
+    def test_replaced_image(self):
+        gallery_image = self.create('Strand', 'strand.jpg')
+        old_name = gallery_image.image.name
+        old_files = self.files(old_name)
+        self.assertTrue(old_files)
+        
+        gallery_image.image = upload('tempel.jpg', (500, 300))
+        with self.captureOnCommitCallbacks(execute=True):
+            gallery_image.save()
+        self.assertFalse(Rendition.objects.filter(source=old_name).exists())
+        self.assertFalse(any(default_storage.exists(file) for file in old_files))
+        # Other saves keep the renditions
+        new_name = gallery_image.image.name
+        with self.captureOnCommitCallbacks(execute=True):
+            gallery_image.save()
+        self.assertTrue(Rendition.objects.filter(source=new_name).exists())
+    
+    def test_deleted_image_keeps_shared_files(self):
+        # Same content, so both uploads share their rendition files
+        first, second = self.create('Strand', 'strand.jpg'), self.create('Strand 2', 'strand-2.jpg')
+        shared = self.files(second.image.name)
+        self.assertEqual(sorted(self.files(first.image.name)), sorted(shared))
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertFalse(Rendition.objects.filter(source=first.image.name).exists())
+        self.assertEqual(self.files(second.image.name), shared)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(Rendition.objects.exists())
+        self.assertFalse(any(default_storage.exists(file) for file in shared))
+
+
+@test_settings
+class PrefetchRenditionsTests(TemporaryMediaMixin, TestCase):
+    """A page of images loads its renditions in one query"""
+    
+    def test_one_query_for_all_images(self):
+        images = [
+            GalleryImage.objects.create(title=f'Bild {number}', image=upload(f'bild-{number}.jpg', (600 + number, 400)))
+            for number in range(3)
+        ]
+        run_queued_jobs()
+        # Planned only, so it has no ready renditions yet
+        images.append(GalleryImage.objects.create(title='Neu', image=upload('neu.jpg', (700, 500))))
+        images = list(GalleryImage.objects.order_by('pk'))
+        expected = [get_renditions(image.image.name) for image in images]
+        self.assertTrue(all(expected[:3]))
+        self.assertEqual(expected[3], {})
+        
+        cache.clear()
+        with self.assertNumQueries(1):
+            prefetch_renditions(images + [None])
+        with self.assertNumQueries(0):
+            self.assertEqual([get_renditions(image.image.name) for image in images], expected)
+            # Everything cached already
+            prefetch_renditions(images)
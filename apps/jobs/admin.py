@@ -0,0 +1,31 @@
+"""
+Admin configuration for Jobs app
+"""
+
+from django.contrib import admin
+from django.utils import timezone
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    """⚙️ Background Jobs - Queue of the run_jobs worker"""
+    
+    list_display = ['task', 'status', 'attempts', 'run_after', 'created_at', 'finished_at']
+    list_filter = ['status', 'task']
+    search_fields = ['task', 'last_error']
+    date_hierarchy = 'created_at'
+    readonly_fields = ['task', 'payload', 'attempts', 'last_error', 'created_at', 'started_at', 'finished_at']
+    actions = ['retry_jobs']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def retry_jobs(self, request, queryset):
+        updated = queryset.exclude(status=Job.STATUS_RUNNING).update(
+            status=Job.STATUS_PENDING,
+            run_after=timezone.now(),
+            attempts=0,
+        )
+        self.message_user(request, f'{updated} job(s) queued again.')
+    retry_jobs.short_description = "🔁 Retry selected jobs"
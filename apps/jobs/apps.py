@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+
+
+class JobsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.jobs'
+    verbose_name = 'Hintergrundjobs'
+    
+    def ready(self):
+        # Tasks are registered by the tasks.py modules of the apps
+        autodiscover_modules('tasks')
@@ -0,0 +1,70 @@
+"""
+Management command running queued background jobs.
+Usage: python manage.py run_jobs [--once] [--sleep=SECONDS] [--stale-after=SECONDS]
+"""
+
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apps.jobs.queue import claim_next, requeue_stale, run_job
+
+
+class Command(BaseCommand):
+    help = 'Processes queued background jobs (image renditions, ...)'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit when no job is due instead of waiting for new ones',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=2,
+            help='Seconds to wait when the queue is empty (default: 2)',
+        )
+        parser.add_argument(
+            '--stale-after',
+            type=int,
+            default=600,
+            help='Requeue jobs running longer than this many seconds (default: 600)',
+        )
+    
+    def handle(self, *args, **options):
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        
+        done = failed = 0
+        last_stale_check = 0
+        while not self.stopping:
+            close_old_connections()
+            if time.monotonic() - last_stale_check > 60:
+                requeued = requeue_stale(options['stale_after'])
+                if requeued:
+                    self.stdout.write(f'↻ {requeued} stale jobs requeued')
+                last_stale_check = time.monotonic()
+            
+            job = claim_next()
+            if job is None:
+                if options['once']:
+                    break
+                time.sleep(options['sleep'])
+                continue
+            
+            if run_job(job):
+                done += 1
+                self.stdout.write(f'✓ {job.task} #{job.pk}')
+            else:
+                failed += 1
+                self.stdout.write(f'✗ {job.task} #{job.pk} (attempt {job.attempts}/{job.max_attempts})')
+        
+        self.stdout.write(self.style.SUCCESS(f'\n✅ Worker stopped: {done} jobs done, {failed} failed'))
+    
+    def stop(self, signum, frame):
+        """Finish the current job, then exit"""
+        self.stopping = True
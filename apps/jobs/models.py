@@ -0,0 +1,43 @@
+"""
+Background job models for AusflugAgypten
+"""
+
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """A task call waiting for (or processed by) the run_jobs worker"""
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Wartend'),
+        (STATUS_RUNNING, 'Läuft'),
+        (STATUS_DONE, 'Erledigt'),
+        (STATUS_FAILED, 'Fehlgeschlagen'),
+    ]
+    
+    task = models.CharField(max_length=100, verbose_name="Task")
+    payload = models.JSONField(default=dict, blank=True, verbose_name="Parameter")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING, verbose_name="Status")
+    attempts = models.PositiveIntegerField(default=0, verbose_name="Versuche")
+    max_attempts = models.PositiveIntegerField(default=3, verbose_name="Max. Versuche")
+    run_after = models.DateTimeField(default=timezone.now, verbose_name="Ausführen ab")
+    last_error = models.TextField(blank=True, verbose_name="Letzter Fehler")
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = "Job"
+        verbose_name_plural = "Jobs"
+        indexes = [
+            models.Index(fields=['status', 'run_after']),
+        ]
+    
+    def __str__(self):
+        return f"{self.task} #{self.pk} ({self.get_status_display()})"
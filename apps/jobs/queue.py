@@ -0,0 +1,105 @@
+"""
+Database-backed job queue for AusflugAgypten
+
+Slow work (image processing, ...) is stored as Job rows and executed by
+`python manage.py run_jobs`, so requests return without waiting for it
+and no message broker is needed. Jobs are claimed with a conditional
+UPDATE, which lets several workers share the table on any database.
+
+    from apps.jobs.queue import task, enqueue
+
+    @task('images.create_renditions')
+    def create_renditions(source):
+        ...
+
+    enqueue('images.create_renditions', source='tours/pyramids.jpg')
+"""
+
+import logging
+import traceback
+from datetime import timedelta
+
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+
+logger = logging.getLogger(__name__)
+
+RETRY_DELAY = 30  # seconds, doubled after every failed attempt
+
+_tasks = {}
+
+
+def task(name):
+    """Register a function as task name"""
+    def decorator(func):
+        _tasks[name] = func
+        return func
+    return decorator
+
+
+def get_task(name):
+    """Registered function of a task, KeyError if unknown"""
+    return _tasks[name]
+
+
+def enqueue(name, run_after=None, max_attempts=3, **payload):
+    """Store a task call for the worker, payload must be JSON serializable"""
+    if name not in _tasks:
+        raise KeyError(f'Unknown task {name!r}')
+    return Job.objects.create(
+        task=name,
+        payload=payload,
+        run_after=run_after or timezone.now(),
+        max_attempts=max_attempts,
+    )
+
+
+def claim_next():
+    """Mark the next due job as running and return it, None if there is none"""
+    now = timezone.now()
+    candidates = Job.objects.filter(
+        status=Job.STATUS_PENDING, run_after__lte=now
+    ).order_by('run_after', 'pk').values_list('pk', flat=True)[:10]
+    for pk in candidates:
+        # Only one worker's UPDATE can match while the job is still pending
+        claimed = Job.objects.filter(pk=pk, status=Job.STATUS_PENDING).update(
+            status=Job.STATUS_RUNNING,
+            started_at=now,
+            attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return Job.objects.get(pk=pk)
+    return None
+
+
+def run_job(job):
+    """Execute a claimed job and record the outcome, returns True on success"""
+    try:
+        get_task(job.task)(**job.payload)
+    except Exception:
+        job.last_error = traceback.format_exc()
+        if job.attempts < job.max_attempts:
+            job.status = Job.STATUS_PENDING
+            job.run_after = timezone.now() + timedelta(seconds=RETRY_DELAY * 2 ** (job.attempts - 1))
+        else:
+            job.status = Job.STATUS_FAILED
+            job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'run_after', 'last_error', 'finished_at'])
+        logger.exception('Job %s (%s) failed, attempt %s', job.pk, job.task, job.attempts)
+        return False
+    
+    job.status = Job.STATUS_DONE
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'finished_at'])
+    return True
+
+
+def requeue_stale(timeout):
+    """Put jobs back that have been running for longer than timeout seconds (crashed worker)"""
+    return Job.objects.filter(
+        status=Job.STATUS_RUNNING,
+        started_at__lt=timezone.now() - timedelta(seconds=timeout),
+    ).update(status=Job.STATUS_PENDING)
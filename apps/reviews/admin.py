@@ -41,12 +41,12 @@ class ReviewAdmin(admin.ModelAdmin):
     actions = ['approve_reviews', 'disapprove_reviews']
     
     def approve_reviews(self, request, queryset):
-        updated = queryset.update(is_approved=True)
+        updated = queryset.set_approved(True)
         self.message_user(request, f'{updated} review(s) approved and will now be visible on the website.')
     approve_reviews.short_description = "✅ Approve selected reviews"
     
     def disapprove_reviews(self, request, queryset):
-        updated = queryset.update(is_approved=False)
+        updated = queryset.set_approved(False)
         self.message_user(request, f'{updated} review(s) hidden from the website.')
     disapprove_reviews.short_description = "❌ Hide selected reviews"
     
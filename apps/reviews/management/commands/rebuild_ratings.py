@@ -0,0 +1,66 @@
+"""
+Management command to rebuild the stored rating aggregates of all reviewable models.
+Usage: python manage.py rebuild_ratings [--batch-size=N]
+"""
+
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Q
+
+from apps.reviews.models import Review, RatingAggregateMixin, RATING_STARS
+
+HISTOGRAM_FIELDS = [f'rating_{star}' for star in RATING_STARS]
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds rating_avg, rating_count and the star histogram from approved reviews'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of objects written per UPDATE batch (default: 1000)',
+        )
+    
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        rated_models = [
+            model for model in apps.get_models()
+            if issubclass(model, RatingAggregateMixin)
+        ]
+        for model in rated_models:
+            updated = self.rebuild_model(model, batch_size)
+            self.stdout.write(f'✓ {model._meta.verbose_name_plural}: {updated} objects with reviews')
+        
+        self.stdout.write(self.style.SUCCESS('\n✅ Rating aggregates rebuilt!'))
+    
+    def rebuild_model(self, model, batch_size):
+        """Recompute the histogram of every object with one GROUP BY query"""
+        content_type = ContentType.objects.get_for_model(model)
+        histograms = (
+            Review.objects.filter(content_type=content_type, is_approved=True)
+            .order_by()
+            .values('object_id')
+            .annotate(**{
+                f'rating_{star}': Count('id', filter=Q(rating=star)) for star in RATING_STARS
+            })
+        )
+        
+        with transaction.atomic():
+            manager = model._default_manager
+            manager.update(**{field: 0 for field in HISTOGRAM_FIELDS})
+            
+            objects = []
+            for row in histograms.iterator(chunk_size=batch_size):
+                obj = model(pk=row['object_id'])
+                for field in HISTOGRAM_FIELDS:
+                    setattr(obj, field, row[field])
+                objects.append(obj)
+            manager.bulk_update(objects, HISTOGRAM_FIELDS, batch_size=batch_size)
+            
+            manager.update(**model.rating_summary_expressions())
+        
+        return len(objects)
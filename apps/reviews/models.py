@@ -2,11 +2,157 @@
 Review models for AusflugAgypten
 """
 
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Case, Count, F, FloatField, Q, When
+from django.db.models.functions import Cast, Greatest
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 from django.core.validators import MinValueValidator, MaxValueValidator
 
+from apps.core.admin_stats import invalidate_notifications
+from apps.core.cache import invalidate_card
+from apps.core.page_cache import PAGE_CACHE_DEPENDENCIES, purge_pages
+
+
+# Only approved reviews with a rating above 3 are shown on the website
+VISIBLE_RATING_MIN = 4
+RATING_STARS = range(1, 6)
+
+
+class RatingAggregateMixin(models.Model):
+    """
+    Denormalized review statistics for reviewable models.
+
+    rating_1 .. rating_5 hold the number of approved reviews per star.
+    rating_count and rating_avg only cover the visible reviews
+    (approved, rating > 3) and are kept in sync by the Review signals below.
+    rating_avg is 0 rather than NULL without reviews so that rating sorts
+    can use a plain descending index.
+    """
+    rating_avg = models.FloatField(default=0, editable=False, verbose_name="Durchschnittsbewertung")
+    rating_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Anzahl Bewertungen")
+    rating_1 = models.PositiveIntegerField(default=0, editable=False, verbose_name="1 Stern")
+    rating_2 = models.PositiveIntegerField(default=0, editable=False, verbose_name="2 Sterne")
+    rating_3 = models.PositiveIntegerField(default=0, editable=False, verbose_name="3 Sterne")
+    rating_4 = models.PositiveIntegerField(default=0, editable=False, verbose_name="4 Sterne")
+    rating_5 = models.PositiveIntegerField(default=0, editable=False, verbose_name="5 Sterne")
+    
+    class Meta:
+        abstract = True
+    
+    @property
+    def average_rating(self):
+        """Average of approved reviews with rating > 3"""
+        # CatalogQuerySet.with_ratings() annotations take precedence
+        if hasattr(self, 'approved_rating_avg'):
+            return self.approved_rating_avg
+        return self.rating_avg if self.rating_count else None
+    
+    @property
+    def visible_review_count(self):
+        """Number of approved reviews with rating > 3"""
+        return getattr(self, 'approved_rating_count', self.rating_count)
+    
+    @property
+    def rating_histogram(self):
+        """Approved review count per star, e.g. {5: 12, 4: 3, ...}"""
+        return {star: getattr(self, f'rating_{star}') for star in reversed(RATING_STARS)}
+    
+    @staticmethod
+    def rating_summary_expressions():
+        """SQL expressions deriving rating_count/rating_avg from the histogram columns"""
+        visible = range(VISIBLE_RATING_MIN, 6)
+        count = sum((F(f'rating_{star}') for star in visible), models.Value(0))
+        total = sum((F(f'rating_{star}') * star for star in visible), models.Value(0))
+        has_reviews = Q()
+        for star in visible:
+            has_reviews |= Q(**{f'rating_{star}__gt': 0})
+        return {
+            'rating_count': count,
+            'rating_avg': Case(
+                When(has_reviews, then=Cast(total, FloatField()) / count),
+                default=models.Value(0.0),
+                output_field=FloatField(),
+            ),
+        }
+    
+    @classmethod
+    def apply_rating_delta(cls, pk, rating, delta):
+        """Add delta approved reviews with the given star rating to one object"""
+        field = f'rating_{rating}'
+        with transaction.atomic():
+            cls._default_manager.filter(pk=pk).update(**{field: Greatest(F(field) + delta, 0)})
+            if rating >= VISIBLE_RATING_MIN:
+                cls._default_manager.filter(pk=pk).update(**cls.rating_summary_expressions())
+        # Cards and pages show the rating
+        cls.invalidate_rating_caches(pk)
+    
+    @classmethod
+    def recalculate_ratings(cls, pk):
+        """Rebuild the aggregates of one object from its reviews"""
+        content_type = ContentType.objects.get_for_model(cls)
+        histogram = Review.objects.filter(
+            content_type=content_type,
+            object_id=pk,
+            is_approved=True,
+        ).aggregate(**{
+            f'rating_{star}': Count('id', filter=Q(rating=star)) for star in RATING_STARS
+        })
+        with transaction.atomic():
+            cls._default_manager.filter(pk=pk).update(**histogram)
+            cls._default_manager.filter(pk=pk).update(**cls.rating_summary_expressions())
+        cls.invalidate_rating_caches(pk)
+    
+    @classmethod
+    def invalidate_rating_caches(cls, pk):
+        """Drop the cached cards and pages showing the object's rating, after the commit"""
+        tags = PAGE_CACHE_DEPENDENCIES.get(cls._meta.label, [])
+        transaction.on_commit(lambda: invalidate_card(cls, pk))
+        transaction.on_commit(lambda: purge_pages(*tags))
+
+
+def get_rated_model(content_type_id):
+    """Return the model class for a content type if it stores rating aggregates"""
+    model = ContentType.objects.get_for_id(content_type_id).model_class()
+    if model is not None and issubclass(model, RatingAggregateMixin):
+        return model
+    return None
+
+
+def apply_review_delta(content_type_id, object_id, rating, delta):
+    """Count (delta=1) or uncount (delta=-1) approved reviews on their target"""
+    model = get_rated_model(content_type_id)
+    if model is not None:
+        model.apply_rating_delta(object_id, rating, delta)
+
+
+class ReviewQuerySet(models.QuerySet):
+    
+    def set_approved(self, is_approved):
+        """Bulk (un)approve reviews and keep the rating aggregates in sync"""
+        with transaction.atomic():
+            changes = list(
+                self.exclude(is_approved=is_approved)
+                .order_by()
+                .values('content_type_id', 'object_id', 'rating')
+                .annotate(total=Count('id'))
+            )
+            updated = self.update(is_approved=is_approved)
+            sign = 1 if is_approved else -1
+            for change in changes:
+                apply_review_delta(
+                    change['content_type_id'],
+                    change['object_id'],
+                    change['rating'],
+                    sign * change['total'],
+                )
+            # update() sends no post_save, refresh the admin counters and testimonials directly
+            transaction.on_commit(invalidate_notifications)
+            transaction.on_commit(lambda: purge_pages(*PAGE_CACHE_DEPENDENCIES['reviews.Review']))
+        return updated
+
 
 class Review(models.Model):
     """Generic review model for tours/activities"""
@@ -31,6 +177,8 @@ class Review(models.Model):
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     
+    objects = ReviewQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-created_at']
         verbose_name = "Review"
@@ -42,4 +190,49 @@ class Review(models.Model):
     
     def __str__(self):
         return f"{self.name} - {self.rating}★"
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember what this review contributed to the aggregates when loaded
+        if {'content_type_id', 'object_id', 'rating', 'is_approved'}.issubset(field_names):
+            instance._counted_as = instance.counted_as
+        return instance
+    
+    @property
+    def counted_as(self):
+        """(content_type_id, object_id, rating) if the review is counted, else None"""
+        if not self.is_approved:
+            return None
+        return (self.content_type_id, self.object_id, self.rating)
+
+
+_NOT_LOADED = object()
+
+
+@receiver(post_save, sender=Review)
+def update_rating_aggregates_on_save(sender, instance, created, raw=False, **kwargs):
+    """Move the review's contribution when it is created, (un)approved or edited"""
+    if raw:
+        return
+    old = None if created else getattr(instance, '_counted_as', _NOT_LOADED)
+    new = instance.counted_as
+    if old is _NOT_LOADED:
+        # Previous state unknown (e.g. deferred fields) - rebuild the target
+        model = get_rated_model(instance.content_type_id)
+        if model is not None:
+            model.recalculate_ratings(instance.object_id)
+    elif old != new:
+        if old:
+            apply_review_delta(*old, -1)
+        if new:
+            apply_review_delta(*new, 1)
+    instance._counted_as = new
+
 
+@receiver(post_delete, sender=Review)
+def update_rating_aggregates_on_delete(sender, instance, **kwargs):
+    """Remove a deleted review from its target's aggregates"""
+    counted = getattr(instance, '_counted_as', instance.counted_as)
+    if counted:
+        apply_review_delta(*counted, -1)
@@ -0,0 +1,14 @@
+from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+class SearchConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.search'
+    verbose_name = 'Suche'
+    
+    def ready(self):
+        from .backends import setup_search_schema
+        
+        # GIN index / FTS5 table depend on the database and are not in migrations
+        post_migrate.connect(setup_search_schema, sender=self)
@@ -0,0 +1,222 @@
+"""
+In-memory autocomplete index for AusflugAgypten
+
+Product titles (DE and EN), location names and category names are kept in
+a sorted word list for prefix lookups plus a trigram map for typos and
+partial words. The index is built once per version of the shared
+autocomplete cache (see apps.core.cache.VersionedCache) and lives in each
+worker's memory, so lookups never touch the database. It is rebuilt after
+AUTOCOMPLETE_TTL as well, so a change saved without signals (update(),
+bulk imports) does not stay missing until the next deploy.
+"""
+
+import heapq
+import unicodedata
+from bisect import bisect_left
+from collections import defaultdict
+
+from django.apps import apps
+from django.conf import settings
+from django.urls import reverse
+from django.utils import translation
+
+from apps.core.cache import VersionedCache
+
+from .indexes import SEARCH_LANGUAGES
+
+
+# Product models offered as suggestions
+PRODUCT_MODELS = [
+    ('tours.Tour', 'Tour'),
+    ('excursions.Excursion', 'Ausflug'),
+    ('activities.Activity', 'Aktivität'),
+    ('transfers.Transfer', 'Transfer'),
+]
+
+# Models whose changes rebuild the index
+AUTOCOMPLETE_MODELS = [label for label, type_label in PRODUCT_MODELS] + [
+    'tours.Location',
+    'tours.TourCategory',
+    'activities.ActivityCategory',
+]
+
+MIN_TRIGRAM_SCORE = 0.3
+
+# Seconds until the index is rebuilt even without a change signal
+AUTOCOMPLETE_TTL = getattr(settings, 'AUTOCOMPLETE_TTL', 60 * 60)
+
+
+def normalize(value):
+    """Casefold and strip accents, so Ägypten also matches agypten"""
+    value = unicodedata.normalize('NFKD', value.casefold())
+    return ''.join(char for char in value if not unicodedata.combining(char))
+
+
+def trigrams(word):
+    """Character trigrams of a word, padded to weigh its start"""
+    padded = f'  {word} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class AutocompleteIndex:
+    """
+    Immutable prefix/trigram index over suggestion entries.
+    
+    Entries are ranked once per language (shorter labels first), and every
+    word keeps its entry ids in that order, so a lookup only reads as many
+    ids as it returns.
+    """
+    
+    def __init__(self, entries):
+        # entry: (labels by language, type label, urls by language)
+        self.entries = entries
+        entry_words = defaultdict(set)
+        for entry_id, (labels, type_label, urls) in enumerate(entries):
+            for label in labels.values():
+                for word in normalize(label).split():
+                    entry_words[word].add(entry_id)
+        
+        self.words = sorted(entry_words)
+        self.positions = {}
+        self.word_entries = {}
+        for language in SEARCH_LANGUAGES:
+            ranking = sorted(
+                range(len(entries)),
+                key=lambda entry_id: (len(entries[entry_id][0][language]), entries[entry_id][0][language]),
+            )
+            position = [0] * len(entries)
+            for rank, entry_id in enumerate(ranking):
+                position[entry_id] = rank
+            self.positions[language] = position
+            self.word_entries[language] = [
+                sorted(entry_words[word], key=position.__getitem__) for word in self.words
+            ]
+        
+        # Trigrams point to words, fuzzy matching then follows the words' entries
+        grams = defaultdict(set)
+        for word_index, word in enumerate(self.words):
+            for gram in trigrams(word):
+                grams[gram].add(word_index)
+        self.trigrams = {gram: tuple(indexes) for gram, indexes in grams.items()}
+    
+    def prefix_range(self, prefix):
+        """Indexes of the words starting with prefix"""
+        return range(
+            bisect_left(self.words, prefix),
+            bisect_left(self.words, prefix + '\U0010ffff'),
+        )
+    
+    def similar_words(self, term, limit=5):
+        """Indexes of the words sharing most trigrams with term"""
+        term_grams = trigrams(term)
+        scores = defaultdict(int)
+        for gram in term_grams:
+            for word_index in self.trigrams.get(gram, ()):
+                scores[word_index] += 1
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return [
+            word_index for word_index, hits in best
+            if hits / len(term_grams) >= MIN_TRIGRAM_SCORE
+        ]
+    
+    def ranked_entries(self, word_indexes, language):
+        """Entry ids of the given words, best ranked first, without duplicates"""
+        position = self.positions[language]
+        lists = [self.word_entries[language][word_index] for word_index in word_indexes]
+        seen = set()
+        for entry_id in heapq.merge(*lists, key=position.__getitem__):
+            if entry_id not in seen:
+                seen.add(entry_id)
+                yield entry_id
+    
+    def search(self, query, language, limit=8):
+        """Suggestions for query as dicts with label, type and url"""
+        terms = normalize(query).split()
+        if not terms:
+            return []
+        
+        # The last word is still being typed, every word must start a word of the label
+        ranges = sorted((self.prefix_range(term) for term in terms), key=len)
+        other_ids = []
+        for word_range in ranges[1:]:
+            ids = set()
+            for word_index in word_range:
+                ids.update(self.word_entries[language][word_index])
+            other_ids.append(ids)
+        
+        results = []
+        for entry_id in self.ranked_entries(ranges[0], language):
+            if all(entry_id in ids for ids in other_ids):
+                results.append(entry_id)
+                if len(results) == limit:
+                    break
+        
+        # Fill up with fuzzy matches for a typo in a single word
+        if len(results) < limit and len(terms) == 1 and len(terms[0]) >= 3:
+            for entry_id in self.ranked_entries(self.similar_words(terms[0]), language):
+                if entry_id not in results:
+                    results.append(entry_id)
+                    if len(results) == limit:
+                        break
+        
+        return [self.suggestion(entry_id, language) for entry_id in results]
+    
+    def suggestion(self, entry_id, language):
+        """JSON-ready suggestion for one entry"""
+        labels, type_label, urls = self.entries[entry_id]
+        return {'label': labels[language], 'type': type_label, 'url': urls[language]}
+
+
+def localized(callback):
+    """Result of callback for each site language"""
+    values = {}
+    for language in SEARCH_LANGUAGES:
+        with translation.override(language):
+            values[language] = callback()
+    return values
+
+
+def build_autocomplete_index():
+    """Load all suggestion entries from the database"""
+    entries = []
+    
+    for label, type_label in PRODUCT_MODELS:
+        model = apps.get_model(label)
+        for obj in model.objects.filter(is_active=True).only('pk', 'slug', 'title', 'title_en'):
+            entries.append((
+                {'de': obj.title, 'en': obj.title_en or obj.title},
+                type_label,
+                localized(obj.get_absolute_url),
+            ))
+    
+    Location = apps.get_model('tours', 'Location')
+    for location in Location.objects.filter(is_active=True):
+        entries.append((
+            {'de': location.name, 'en': location.name_en or location.name},
+            'Ort',
+            localized(lambda: f"{reverse('tours:list')}?location={location.slug}"),
+        ))
+    
+    TourCategory = apps.get_model('tours', 'TourCategory')
+    for category in TourCategory.objects.filter(is_active=True):
+        entries.append((
+            {'de': category.name, 'en': category.name_en or category.name},
+            'Kategorie',
+            localized(lambda: f"{reverse('tours:list')}?category={category.slug}"),
+        ))
+    
+    ActivityCategory = apps.get_model('activities', 'ActivityCategory')
+    for category in ActivityCategory.objects.filter(is_active=True):
+        entries.append((
+            {'de': category.name, 'en': category.name_en or category.name},
+            'Kategorie',
+            # ActivityCategory.get_absolute_url points to a route that does not exist
+            localized(lambda: f"{reverse('activities:list')}?category={category.slug}"),
+        ))
+    
+    return AutocompleteIndex(entries)
+
+
+autocomplete_data = VersionedCache('search:autocomplete', {
+    'index': build_autocomplete_index,
+}, timeout=AUTOCOMPLETE_TTL)
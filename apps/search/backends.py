@@ -0,0 +1,208 @@
+"""
+Search backends for AusflugAgypten
+
+PostgreSQL uses tsvector columns with a GIN index and the german/english
+dictionaries. SQLite (DEBUG) uses an FTS5 table kept in sync by triggers.
+Other databases fall back to LIKE matching on the stripped text.
+"""
+
+import logging
+import re
+from functools import lru_cache
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.db.models import Case, F, IntegerField, Q, Value, When
+from django.db.models.expressions import RawSQL
+
+from .indexes import SEARCH_CONFIGS
+
+
+logger = logging.getLogger(__name__)
+
+MAX_TERMS = 10
+
+
+def tokenize(query):
+    """Lowercased words of a user query"""
+    return re.findall(r'\w+', query.lower())[:MAX_TERMS]
+
+
+class BaseBackend:
+    """Portable fallback matching every word in title or text"""
+    
+    def setup(self):
+        """Create database specific search structures"""
+    
+    def update_vectors(self, documents):
+        """Refresh derived search data after documents were saved"""
+    
+    def filter_documents(self, documents, query, language=None):
+        """Documents matching query, ranked if a language is given"""
+        terms = tokenize(query)
+        if not terms:
+            return documents.none()
+        for term in terms:
+            documents = documents.filter(Q(title__icontains=term) | Q(body__icontains=term))
+        if language:
+            documents = documents.annotate(
+                rank=Case(
+                    When(title__icontains=terms[0], then=Value(1)),
+                    default=Value(0),
+                    output_field=IntegerField(),
+                )
+            ).order_by('-rank', 'title')
+        return documents
+    
+    def search(self, query, language, type_keys=None):
+        """Ranked documents of one language for the search page"""
+        from .models import SearchDocument
+        
+        documents = SearchDocument.objects.filter(language=language)
+        if type_keys:
+            documents = documents.filter(type_key__in=type_keys)
+        return self.filter_documents(documents, query, language)
+    
+    def object_ids(self, model, query):
+        """Subquery of matching object ids of one model, in any language"""
+        from .models import SearchDocument
+        
+        documents = SearchDocument.objects.filter(
+            content_type=ContentType.objects.get_for_model(model)
+        )
+        return self.filter_documents(documents, query).values('object_id')
+
+
+class PostgresBackend(BaseBackend):
+    """tsvector search with weighted title/body and GIN index"""
+    
+    def setup(self):
+        from .models import SearchDocument
+        
+        table = SearchDocument._meta.db_table
+        with connection.cursor() as cursor:
+            # No DDL when the index exists, PostgreSQL refuses it in a
+            # transaction with pending constraint checks
+            if f'{table}_vector_gin' in connection.introspection.get_constraints(cursor, table):
+                return
+            cursor.execute(f'CREATE INDEX {table}_vector_gin ON {table} USING gin (search_vector)')
+    
+    def update_vectors(self, documents):
+        from django.contrib.postgres.search import SearchVector
+        
+        for language, config in SEARCH_CONFIGS.items():
+            documents.filter(language=language).update(
+                search_vector=(
+                    SearchVector('title', weight='A', config=config)
+                    + SearchVector('body', weight='B', config=config)
+                )
+            )
+    
+    def filter_documents(self, documents, query, language=None):
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+        
+        if not tokenize(query):
+            return documents.none()
+        
+        if language:
+            search_query = SearchQuery(query, config=SEARCH_CONFIGS[language], search_type='websearch')
+            return documents.filter(search_vector=search_query).annotate(
+                rank=SearchRank(F('search_vector'), search_query)
+            ).order_by('-rank', 'pk')
+        
+        # Each language is matched with its own dictionary
+        condition = Q()
+        for language, config in SEARCH_CONFIGS.items():
+            search_query = SearchQuery(query, config=config, search_type='websearch')
+            condition |= Q(language=language, search_vector=search_query)
+        return documents.filter(condition)
+
+
+class SQLiteBackend(BaseBackend):
+    """FTS5 search used with the SQLite development database"""
+    
+    @property
+    def fts_table(self):
+        from .models import SearchDocument
+        
+        return f'{SearchDocument._meta.db_table}_fts'
+    
+    def setup(self):
+        from .models import SearchDocument
+        
+        table = SearchDocument._meta.db_table
+        fts = self.fts_table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+                f"title, body, content='{table}', content_rowid='id', "
+                f"tokenize='porter unicode61 remove_diacritics 2')"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON {table} BEGIN "
+                f"INSERT INTO {fts}(rowid, title, body) VALUES (new.id, new.title, new.body); END"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON {table} BEGIN "
+                f"INSERT INTO {fts}({fts}, rowid, title, body) VALUES ('delete', old.id, old.title, old.body); END"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_update AFTER UPDATE ON {table} BEGIN "
+                f"INSERT INTO {fts}({fts}, rowid, title, body) VALUES ('delete', old.id, old.title, old.body); "
+                f"INSERT INTO {fts}(rowid, title, body) VALUES (new.id, new.title, new.body); END"
+            )
+            # Index documents that existed before the FTS table
+            cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+    
+    def match_expression(self, query):
+        """Every word as a quoted prefix term, so user input is never parsed as FTS syntax"""
+        return ' '.join(f'"{term}"*' for term in tokenize(query))
+    
+    def filter_documents(self, documents, query, language=None):
+        if not tokenize(query):
+            return documents.none()
+        
+        fts = self.fts_table
+        match = self.match_expression(query)
+        documents = documents.filter(
+            pk__in=RawSQL(f'SELECT rowid FROM {fts} WHERE {fts} MATCH %s', [match])
+        )
+        if language:
+            # bm25 is lower for better matches, titles weigh ten times the text
+            documents = documents.annotate(
+                rank=RawSQL(
+                    f'SELECT bm25({fts}, 10.0, 1.0) FROM {fts} '
+                    f'WHERE {fts} MATCH %s AND rowid = {documents.model._meta.db_table}.id',
+                    [match],
+                )
+            ).order_by('rank', 'pk')
+        return documents
+
+
+@lru_cache(maxsize=None)
+def sqlite_has_fts5():
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA compile_options')
+        return any('FTS5' in row[0] for row in cursor.fetchall())
+
+
+def get_backend():
+    """Search backend for the default database"""
+    if connection.vendor == 'postgresql':
+        return PostgresBackend()
+    if connection.vendor == 'sqlite' and sqlite_has_fts5():
+        return SQLiteBackend()
+    return BaseBackend()
+
+
+def setup_search_schema(sender, using='default', **kwargs):
+    """post_migrate handler creating the GIN index or FTS5 table"""
+    if using != 'default':
+        return
+    get_backend().setup()
+    logger.debug('Search schema ready (%s)', connection.vendor)
+
+
+def filter_by_search(queryset, query):
+    """Restrict a queryset of an indexed model to the objects matching query"""
+    return queryset.filter(pk__in=get_backend().object_ids(queryset.model, query))
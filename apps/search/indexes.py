@@ -0,0 +1,163 @@
+"""
+Search index definitions for AusflugAgypten
+"""
+
+import html
+import re
+
+from django.apps import apps
+from django.utils import translation
+from django.utils.html import strip_tags
+
+
+SEARCH_LANGUAGES = ('de', 'en')
+
+# PostgreSQL text search configuration per site language
+SEARCH_CONFIGS = {
+    'de': 'german',
+    'en': 'english',
+}
+
+
+class SearchIndex:
+    """Which fields of a model are indexed, per language"""
+    
+    def __init__(self, model, type_key, type_label, title, body, image='', visible=None):
+        self.model = model
+        self.type_key = type_key
+        self.type_label = type_label
+        self.title = title
+        self.body = body
+        self.image = image
+        # Only objects matching these field values are searchable
+        self.visible = visible or {'is_active': True}
+    
+    def get_model(self):
+        """Indexed model class"""
+        return apps.get_model(self.model)
+    
+    def is_visible(self, obj):
+        """Whether obj should be findable"""
+        return all(getattr(obj, name) == value for name, value in self.visible.items())
+    
+    def get_queryset(self):
+        """All objects that belong in the index"""
+        return self.get_model()._default_manager.filter(**self.visible)
+    
+    def get_documents(self, obj):
+        """Title, plain text body, URL and image of obj for each language"""
+        image = getattr(obj, self.image, None) if self.image else None
+        documents = {}
+        for language in SEARCH_LANGUAGES:
+            # Fall back to German where the English fields are empty
+            title = getattr(obj, self.title[language]) or getattr(obj, self.title['de'])
+            body = self.get_body(obj, language) or self.get_body(obj, 'de')
+            with translation.override(language):
+                url = obj.get_absolute_url()
+            documents[language] = {
+                'title': title[:255],
+                'body': body,
+                'url': url,
+                'image': image.url if image else '',
+            }
+        return documents
+    
+    def get_body(self, obj, language):
+        """Plain text of the body fields of one language"""
+        return ' '.join(filter(None, (
+            html_to_text(getattr(obj, name) or '') for name in self.body[language]
+        )))
+
+
+SEARCH_INDEXES = [
+    SearchIndex(
+        model='tours.Tour',
+        type_key='tour',
+        type_label='Tour',
+        title={'de': 'title', 'en': 'title_en'},
+        body={
+            'de': ['short_description', 'description'],
+            'en': ['short_description_en', 'description_en'],
+        },
+        image='featured_image',
+    ),
+    SearchIndex(
+        model='excursions.Excursion',
+        type_key='excursion',
+        type_label='Ausflug',
+        title={'de': 'title', 'en': 'title_en'},
+        body={
+            'de': ['short_description', 'description'],
+            'en': ['short_description_en', 'description_en'],
+        },
+        image='featured_image',
+    ),
+    SearchIndex(
+        model='activities.Activity',
+        type_key='activity',
+        type_label='Aktivität',
+        title={'de': 'title', 'en': 'title_en'},
+        body={
+            'de': ['short_description', 'description'],
+            'en': ['short_description_en', 'description_en'],
+        },
+        image='featured_image',
+    ),
+    SearchIndex(
+        model='transfers.Transfer',
+        type_key='transfer',
+        type_label='Transfer',
+        title={'de': 'title', 'en': 'title_en'},
+        body={
+            'de': ['short_description', 'description'],
+            'en': ['short_description_en', 'description_en'],
+        },
+        image='featured_image',
+    ),
+    SearchIndex(
+        model='blog.BlogPost',
+        type_key='blog',
+        type_label='Blog',
+        title={'de': 'title', 'en': 'title_en'},
+        body={
+            'de': ['excerpt', 'content'],
+            'en': ['excerpt_en', 'content_en'],
+        },
+        image='featured_image',
+        visible={'is_published': True},
+    ),
+    SearchIndex(
+        model='gallery.GalleryImage',
+        type_key='gallery',
+        type_label='Galerie',
+        title={'de': 'title', 'en': 'title_en'},
+        body={
+            'de': ['description', 'alt_text'],
+            'en': ['description_en', 'alt_text'],
+        },
+        image='image',
+    ),
+]
+
+
+def get_index(model):
+    """SearchIndex registered for a model class, or None"""
+    label = model._meta.label
+    for index in SEARCH_INDEXES:
+        if index.model == label:
+            return index
+    return None
+
+
+def get_index_by_type(type_key):
+    """SearchIndex for a type key such as 'tour', or None"""
+    for index in SEARCH_INDEXES:
+        if index.type_key == type_key:
+            return index
+    return None
+
+
+def html_to_text(value):
+    """Strip tags and entities from rich text and collapse whitespace"""
+    text = html.unescape(strip_tags(value))
+    return re.sub(r'\s+', ' ', text).strip()
@@ -0,0 +1,58 @@
+"""
+Management command to rebuild the full-text search index.
+Usage: python manage.py rebuild_search_index [--batch-size=N]
+"""
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.search.backends import get_backend
+from apps.search.indexes import SEARCH_INDEXES
+from apps.search.models import SearchDocument
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the search documents of all indexed models'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of objects indexed per batch (default: 500)',
+        )
+    
+    def handle(self, *args, **options):
+        backend = get_backend()
+        backend.setup()
+        
+        for index in SEARCH_INDEXES:
+            count = self.rebuild_index(index, options['batch_size'])
+            self.stdout.write(f'✓ {index.get_model()._meta.verbose_name_plural}: {count} objects')
+        
+        backend.update_vectors(SearchDocument.objects.all())
+        self.stdout.write(self.style.SUCCESS('\n✅ Search index rebuilt!'))
+    
+    def rebuild_index(self, index, batch_size):
+        """Replace all documents of one model"""
+        content_type = ContentType.objects.get_for_model(index.get_model())
+        count = 0
+        with transaction.atomic():
+            SearchDocument.objects.filter(content_type=content_type).delete()
+            documents = []
+            for obj in index.get_queryset().iterator(chunk_size=batch_size):
+                for language, values in index.get_documents(obj).items():
+                    documents.append(SearchDocument(
+                        content_type=content_type,
+                        object_id=obj.pk,
+                        language=language,
+                        type_key=index.type_key,
+                        **values,
+                    ))
+                count += 1
+                if len(documents) >= batch_size:
+                    SearchDocument.objects.bulk_create(documents)
+                    documents = []
+            SearchDocument.objects.bulk_create(documents)
+        return count
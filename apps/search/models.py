@@ -0,0 +1,115 @@
+"""
+Search models for AusflugAgypten
+"""
+
+from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save
+
+from .autocomplete import AUTOCOMPLETE_MODELS, autocomplete_data
+from .indexes import SEARCH_INDEXES, get_index, get_index_by_type
+
+
+class SearchDocument(models.Model):
+    """
+    Plain text copy of one searchable object in one language.
+
+    search_vector is only filled on PostgreSQL (GIN indexed), SQLite uses an
+    FTS5 table kept in sync by triggers, see backends.py.
+    """
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    content_object = GenericForeignKey('content_type', 'object_id')
+    
+    language = models.CharField(max_length=5, verbose_name="Sprache")
+    type_key = models.CharField(max_length=20, verbose_name="Typ")
+    title = models.CharField(max_length=255, verbose_name="Titel")
+    body = models.TextField(blank=True, verbose_name="Text")
+    url = models.CharField(max_length=500, verbose_name="URL")
+    image = models.CharField(max_length=500, blank=True, verbose_name="Bild-URL")
+    
+    search_vector = SearchVectorField(null=True, editable=False)
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = "Search Document"
+        verbose_name_plural = "Search Documents"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['content_type', 'object_id', 'language'],
+                name='search_document_unique_object_language',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['language', 'type_key']),
+        ]
+    
+    def __str__(self):
+        return f"{self.title} ({self.language})"
+    
+    @property
+    def type_label(self):
+        """Display name of the object type, e.g. Ausflug"""
+        index = get_index_by_type(self.type_key)
+        return index.type_label if index else self.type_key
+
+
+def index_object(obj, index=None):
+    """Create, update or remove the search documents of one object"""
+    from .backends import get_backend
+    
+    index = index or get_index(type(obj))
+    content_type = ContentType.objects.get_for_model(obj)
+    documents = SearchDocument.objects.filter(content_type=content_type, object_id=obj.pk)
+    
+    if not index.is_visible(obj):
+        documents.delete()
+        return
+    
+    existing = {document.language: document for document in documents}
+    changed = []
+    for language, values in index.get_documents(obj).items():
+        document = existing.get(language) or SearchDocument(
+            content_type=content_type,
+            object_id=obj.pk,
+            language=language,
+        )
+        document.type_key = index.type_key
+        for name, value in values.items():
+            setattr(document, name, value)
+        document.save()
+        changed.append(document.pk)
+    
+    get_backend().update_vectors(SearchDocument.objects.filter(pk__in=changed))
+
+
+def update_search_document(sender, instance, raw=False, **kwargs):
+    """Keep the search index in sync when an indexed object is saved"""
+    if not raw:
+        index_object(instance)
+
+
+def delete_search_document(sender, instance, **kwargs):
+    """Remove a deleted object from the search index"""
+    SearchDocument.objects.filter(
+        content_type=ContentType.objects.get_for_model(instance),
+        object_id=instance.pk,
+    ).delete()
+
+
+for search_index in SEARCH_INDEXES:
+    post_save.connect(update_search_document, sender=search_index.model)
+    post_delete.connect(delete_search_document, sender=search_index.model)
+
+
+def invalidate_autocomplete(sender, **kwargs):
+    """Make every worker rebuild its autocomplete index"""
+    transaction.on_commit(autocomplete_data.invalidate)
+
+
+for label in AUTOCOMPLETE_MODELS:
+    post_save.connect(invalidate_autocomplete, sender=label)
+    post_delete.connect(invalidate_autocomplete, sender=label)
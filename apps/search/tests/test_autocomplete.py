@@ -0,0 +1,42 @@
+"""
+Autocomplete tests for AusflugAgypten
+"""
+
+import time
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from apps.core.tests.utils import test_settings
+from apps.tours.models import Tour
+from ..autocomplete import AUTOCOMPLETE_TTL, autocomplete_data
+from .test_backends import SearchTestData
+
+
+@test_settings
+class AutocompleteCacheTests(SearchTestData, TestCase):
+    """The index lives in every worker's memory and in the shared cache"""
+    
+    def suggest(self, query):
+        return [suggestion['label'] for suggestion in autocomplete_data.get('index').search(query, 'de')]
+    
+    def setUp(self):
+        autocomplete_data.invalidate()
+    
+    def test_index_is_rebuilt_after_its_ttl(self):
+        self.assertIn('Nilkreuzfahrt', self.suggest('nil'))
+        # update() sends no signal, the index keeps the old title for now
+        Tour.objects.filter(pk=self.cruise.pk).update(title='Nilfahrt')
+        self.assertIn('Nilkreuzfahrt', self.suggest('nil'))
+        
+        with patch('time.time', return_value=time.time() + AUTOCOMPLETE_TTL + 1):
+            suggestions = self.suggest('nil')
+        self.assertIn('Nilfahrt', suggestions)
+        self.assertNotIn('Nilkreuzfahrt', suggestions)
+    
+    def test_saves_rebuild_the_index(self):
+        self.assertNotIn('Wüstensafari', self.suggest('wüste'))
+        self.hidden.is_active = True
+        with self.captureOnCommitCallbacks(execute=True):
+            self.hidden.save()
+        self.assertIn('Wüstensafari', self.suggest('wüste'))
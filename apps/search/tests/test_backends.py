@@ -0,0 +1,119 @@
+"""
+Search backend tests for AusflugAgypten
+"""
+
+from decimal import Decimal
+from io import StringIO
+from unittest import skipUnless
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import translation
+from django.utils.text import slugify
+
+from apps.core.tests.utils import test_settings
+from apps.tours.models import Location, Tour
+from ..backends import PostgresBackend, filter_by_search, get_backend
+from ..models import SearchDocument
+
+
+class SearchTestData:
+    """Two active tours and a hidden one"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.location = Location.objects.create(name='Gizeh', name_en='Giza', slug='gizeh')
+        cls.pyramids = cls.create_tour(
+            'Pyramiden von Gizeh', 'Pyramids of Giza',
+            '<p>Die <b>Sphinx</b> und das Plateau</p>', '<p>The Sphinx &amp; the plateau</p>',
+        )
+        cls.cruise = cls.create_tour(
+            'Nilkreuzfahrt', 'Nile cruise',
+            '<p>Mit Blick auf die Pyramiden</p>', '<p>Passing the pyramids</p>',
+        )
+        cls.hidden = cls.create_tour('Wüstensafari', 'Desert safari', '<p>Safari</p>', '<p>Safari</p>', is_active=False)
+    
+    @classmethod
+    def create_tour(cls, title, title_en, description, description_en, **fields):
+        return Tour.objects.create(
+            title=title, title_en=title_en, slug=slugify(title),
+            description=description, description_en=description_en, location=cls.location,
+            price=Decimal('40'), duration='4h', featured_image='tours/a.jpg', **fields,
+        )
+    
+    def search(self, query, language='de'):
+        with translation.override(language):
+            response = self.client.get(reverse('search:results'), {'q': query})
+        self.assertEqual(response.status_code, 200)
+        return [document.object_id for document in response.context['results']]
+
+
+@test_settings
+class SearchTests(SearchTestData, TestCase):
+    """Behaviour every backend shares, run on the database of the suite"""
+    
+    def test_title_matches_rank_first(self):
+        self.assertEqual(self.search('pyramiden'), [self.pyramids.pk, self.cruise.pk])
+        self.assertEqual(self.search('pyramids', 'en'), [self.pyramids.pk, self.cruise.pk])
+        self.assertEqual(self.search('sphinx plateau'), [self.pyramids.pk])
+    
+    def test_hidden_objects_and_syntax(self):
+        self.assertEqual(self.search('safari'), [])
+        self.assertEqual(self.search('"AND OR(* -'), [])
+        self.assertEqual(self.search(''), [])
+    
+    def test_object_ids_in_any_language(self):
+        self.assertEqual(list(filter_by_search(Tour.objects.all(), 'cruise')), [self.cruise])
+        self.assertEqual(list(filter_by_search(Tour.objects.all(), 'nilkreuzfahrt')), [self.cruise])
+    
+    def test_index_follows_the_objects(self):
+        Tour.objects.filter(pk=self.hidden.pk).update(is_active=True)
+        SearchDocument.objects.all().delete()
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(self.search('safari'), [self.hidden.pk])
+        self.pyramids.delete()
+        self.assertEqual(self.search('sphinx'), [])
+
+
+@skipUnless(connection.vendor == 'postgresql', 'PostgreSQL backend')
+@test_settings
+class PostgresBackendTests(SearchTestData, TestCase):
+    """tsvector column, GIN index and dictionaries of the production database"""
+    
+    def test_backend_and_gin_index(self):
+        self.assertIsInstance(get_backend(), PostgresBackend)
+        table = SearchDocument._meta.db_table
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, table)
+        self.assertEqual(constraints[f'{table}_vector_gin']['type'], 'gin')
+        self.assertEqual(constraints[f'{table}_vector_gin']['columns'], ['search_vector'])
+        # Running it again, e.g. from rebuild_search_index, leaves it alone
+        get_backend().setup()
+    
+    def test_vectors_use_the_language_dictionary(self):
+        self.assertFalse(SearchDocument.objects.filter(search_vector__isnull=True).exists())
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT language, search_vector::text FROM {SearchDocument._meta.db_table} WHERE object_id = %s',
+                [self.pyramids.pk],
+            )
+            vectors = dict(cursor.fetchall())
+        # Stemmed, weighted A for the title and B for the text, stop words dropped
+        self.assertIn("'pyramid':1A", vectors['de'])
+        self.assertIn("'sphinx':5B", vectors['de'])
+        self.assertNotIn("'die'", vectors['de'])
+        self.assertIn("'pyramid':1A", vectors['en'])
+        self.assertNotIn("'the'", vectors['en'])
+    
+    def test_stemming_and_websearch_syntax(self):
+        self.assertEqual(self.search('Pyramide'), [self.pyramids.pk, self.cruise.pk])
+        self.assertEqual(self.search('pyramid -nile', 'en'), [self.pyramids.pk])
+        self.assertEqual(self.search('"nile cruise"', 'en'), [self.cruise.pk])
+    
+    def test_search_uses_the_vector_column(self):
+        documents = get_backend().search('pyramiden', 'de')
+        sql = str(documents.query)
+        self.assertIn('search_vector', sql)
+        self.assertIn("websearch_to_tsquery", sql)
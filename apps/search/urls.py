@@ -0,0 +1,13 @@
+"""
+Search URL patterns
+"""
+
+from django.urls import path
+from . import views
+
+app_name = 'search'
+
+urlpatterns = [
+    path('', views.SearchView.as_view(), name='results'),
+    path('autocomplete/', views.AutocompleteView.as_view(), name='autocomplete'),
+]
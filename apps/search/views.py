@@ -0,0 +1,63 @@
+"""
+Search views
+"""
+
+from django.http import JsonResponse
+from django.utils.translation import get_language
+from django.views import View
+from django.views.generic import ListView
+
+from .autocomplete import autocomplete_data
+from .backends import get_backend
+from .indexes import SEARCH_INDEXES, SEARCH_LANGUAGES, get_index_by_type
+from .models import SearchDocument
+
+
+def current_language():
+    """Active language if it is indexed, else German"""
+    language = get_language()
+    return language if language in SEARCH_LANGUAGES else SEARCH_LANGUAGES[0]
+
+
+class SearchView(ListView):
+    """Ranked search across tours, excursions, activities, transfers, blog and gallery"""
+    template_name = 'search/results.html'
+    context_object_name = 'results'
+    paginate_by = 12
+    
+    def get_query(self):
+        return self.request.GET.get('q', '').strip()[:200]
+    
+    def get_type(self):
+        type_key = self.request.GET.get('type', '')
+        return type_key if get_index_by_type(type_key) else ''
+    
+    def get_queryset(self):
+        query = self.get_query()
+        if not query:
+            return SearchDocument.objects.none()
+        
+        language = current_language()
+        type_key = self.get_type()
+        return get_backend().search(query, language, [type_key] if type_key else None)
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.get_query()
+        context['current_type'] = self.get_type()
+        context['search_types'] = [(index.type_key, index.type_label) for index in SEARCH_INDEXES]
+        context['result_count'] = context['paginator'].count if context['paginator'] else len(context['results'])
+        return context
+
+
+class AutocompleteView(View):
+    """Search-as-you-type suggestions served from the in-memory index"""
+    
+    def get(self, request):
+        query = request.GET.get('q', '').strip()[:100]
+        results = []
+        if len(query) >= 2:
+            results = autocomplete_data.get('index').search(query, current_language())
+        response = JsonResponse({'results': results})
+        response['Cache-Control'] = 'public, max-age=60'
+        return response
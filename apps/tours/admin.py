@@ -4,6 +4,7 @@ Admin configuration for Tours app
 
 from django.contrib import admin
 from django.utils.translation import gettext_lazy as _
+from apps.availability.admin import ScheduleInline
 from .models import Location, TourCategory, Tour, TourImage, Itinerary, TourInclusion
 
 
@@ -79,7 +80,7 @@ class TourAdmin(admin.ModelAdmin):
     prepopulated_fields = {'slug': ('title',)}
     date_hierarchy = 'created_at'
     
-    inlines = [TourImageInline, ItineraryInline, TourInclusionInline]
+    inlines = [TourImageInline, ItineraryInline, TourInclusionInline, ScheduleInline]
     
     fieldsets = (
         ('📝 Basic Information', {
@@ -8,6 +8,9 @@ from django.urls import reverse
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.contrib.contenttypes.fields import GenericRelation
 from tinymce.models import HTMLField
+from apps.reviews.models import RatingAggregateMixin
+from apps.core.managers import CatalogQuerySet
+from apps.core.pagination import keyset_index
 
 
 class Location(models.Model):
@@ -60,7 +63,7 @@ class TourCategory(models.Model):
         super().save(*args, **kwargs)
 
 
-class Tour(models.Model):
+class Tour(RatingAggregateMixin, models.Model):
     """Main Tour model"""
     
     # Basic Information
@@ -119,6 +122,8 @@ class Tour(models.Model):
     # Reviews (GenericRelation for reverse lookup)
     reviews = GenericRelation('reviews.Review', related_query_name='tour')
     
+    objects = CatalogQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-created_at']
         verbose_name = "Tour"
@@ -126,6 +131,11 @@ class Tour(models.Model):
         indexes = [
             models.Index(fields=['slug']),
             models.Index(fields=['is_active', 'is_featured']),
+            # Keyset pagination, one per list ordering (scanned backwards for the reverse)
+            keyset_index('tour_active_created_idx', '-created_at', '-id'),
+            keyset_index('tour_active_price_idx', 'price', 'id'),
+            keyset_index('tour_active_title_idx', 'title', 'id'),
+            keyset_index('tour_active_rating_idx', '-rating_avg', '-rating_count', 'id'),
         ]
     
     def __str__(self):
@@ -139,18 +149,10 @@ class Tour(models.Model):
     def get_absolute_url(self):
         return reverse('tours:detail', kwargs={'slug': self.slug})
     
-    @property
-    def average_rating(self):
-        """Calculate average rating from reviews with rating > 3"""
-        reviews = self.reviews.filter(is_approved=True, rating__gt=3)
-        if reviews.exists():
-            return reviews.aggregate(models.Avg('rating'))['rating__avg']
-        return None
-    
     @property
     def review_count(self):
         """Count approved reviews with rating > 3"""
-        return self.reviews.filter(is_approved=True, rating__gt=3).count()
+        return self.visible_review_count
 
 
 class TourImage(models.Model):
@@ -3,19 +3,25 @@ Views for Tours app
 """
 
 from django.views.generic import ListView, DetailView
-from django.db.models import Q, Avg
+from django.db.models import Avg
 from .models import Tour, Location, TourCategory
+from apps.search.backends import filter_by_search
+from apps.core.pagination import KeysetPaginationMixin
+from apps.core.pricing import QuoteListMixin
+from apps.images.renditions import RenditionPrefetchMixin
 
 
-class TourListView(ListView):
+class TourListView(RenditionPrefetchMixin, QuoteListMixin, KeysetPaginationMixin, ListView):
     """List all tours with filtering"""
     model = Tour
     template_name = 'tours/tour_list.html'
     context_object_name = 'tours'
     paginate_by = 12
+    json_image_field = 'featured_image'
+    sort_fields = ['-created_at', 'price', '-price', 'title']
     
     def get_queryset(self):
-        queryset = Tour.objects.filter(is_active=True).select_related('location', 'category').prefetch_related('reviews')
+        queryset = Tour.objects.active().select_related('location', 'category').with_ratings()
         
         # Filter by category
         category_slug = self.request.GET.get('category')
@@ -38,18 +44,38 @@ class TourListView(ListView):
         # Search
         search = self.request.GET.get('search')
         if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) |
-                Q(title_en__icontains=search) |
-                Q(description__icontains=search)
-            )
+            queryset = filter_by_search(queryset, search)
+        
+        # Filter by minimum average rating
+        min_rating = self.request.GET.get('rating')
+        if min_rating:
+            try:
+                queryset = queryset.min_rating(float(min_rating))
+            except ValueError:
+                pass
         
         # Sorting
         sort = self.request.GET.get('sort', '-created_at')
-        queryset = queryset.order_by(sort)
+        if sort == 'rating':
+            queryset = queryset.order_by_rating()
+        elif sort in self.sort_fields:
+            queryset = queryset.order_by(sort)
+        else:
+            queryset = queryset.order_by('-created_at')
         
         return queryset
     
+    def get_json_item(self, tour):
+        item = super().get_json_item(tour)
+        item.update(
+            price=tour.quote.unit_price,
+            regular_price=tour.quote.regular_price,
+            price_basis=tour.quote.basis,
+            rating=tour.average_rating,
+            review_count=tour.visible_review_count,
+        )
+        return item
+    
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['locations'] = Location.objects.filter(is_active=True)
@@ -75,8 +101,6 @@ class TourDetailView(DetailView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        from datetime import date
-        
         # Get related tours
         context['related_tours'] = Tour.objects.filter(
             is_active=True,
@@ -89,9 +113,6 @@ class TourDetailView(DetailView):
             rating__gt=3
         )[:10]
         
-        # Add today's date for form min date
-        context['today'] = date.today()
-        
         return context
 
 
@@ -4,6 +4,7 @@ Admin configuration for Transfers app
 
 from django.contrib import admin
 from django.utils.translation import gettext_lazy as _
+from apps.availability.admin import ScheduleInline
 from .models import (
     TransferType, VehicleType, Transfer, 
     TransferImage, TransferInclusion, TransferImportantInfo, TransferRoute
@@ -119,7 +120,7 @@ class TransferAdmin(admin.ModelAdmin):
         }),
     )
     
-    inlines = [TransferImageInline, TransferInclusionInline, TransferImportantInfoInline, TransferRouteInline]
+    inlines = [TransferImageInline, TransferInclusionInline, TransferImportantInfoInline, TransferRouteInline, ScheduleInline]
     
     def get_queryset(self, request):
         return super().get_queryset(request).select_related('transfer_type', 'vehicle_type', 'from_location', 'to_location')
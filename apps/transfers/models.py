@@ -9,6 +9,10 @@ from django.core.validators import MinValueValidator, MaxValueValidator
 from django.contrib.contenttypes.fields import GenericRelation
 from apps.tours.models import Location
 from tinymce.models import HTMLField
+from apps.reviews.models import RatingAggregateMixin
+from apps.core.managers import CatalogQuerySet
+from apps.core.pricing import price_rules
+from apps.core.pagination import keyset_index
 
 
 class TransferType(models.Model):
@@ -62,7 +66,7 @@ class VehicleType(models.Model):
         super().save(*args, **kwargs)
 
 
-class Transfer(models.Model):
+class Transfer(RatingAggregateMixin, models.Model):
     """Transfer service model"""
     # Basic Information
     title = models.CharField(max_length=200, verbose_name="Titel (DE)")
@@ -126,6 +130,8 @@ class Transfer(models.Model):
     # Reviews (GenericRelation for reverse lookup)
     reviews = GenericRelation('reviews.Review', related_query_name='transfer')
     
+    objects = CatalogQuerySet.as_manager()
+    
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -138,6 +144,11 @@ class Transfer(models.Model):
             models.Index(fields=['slug']),
             models.Index(fields=['is_active', 'is_featured']),
             models.Index(fields=['transfer_type', 'is_active']),
+            # Keyset pagination, one per list ordering (scanned backwards for the reverse)
+            keyset_index('transfer_active_featured_idx', '-is_featured', '-is_popular', 'title', 'id'),
+            keyset_index('transfer_active_popular_idx', '-is_popular', '-is_featured', 'title', 'id'),
+            keyset_index('transfer_active_price_idx', 'base_price', 'id'),
+            keyset_index('transfer_active_rating_idx', '-rating_avg', '-rating_count', 'id'),
         ]
     
     def __str__(self):
@@ -154,25 +165,17 @@ class Transfer(models.Model):
     @property
     def display_price(self):
         """Returns the price to display (discount if available)"""
-        return self.discount_price if self.discount_price else self.base_price
+        return price_rules(self).unit
     
     @property
     def has_discount(self):
         """Check if transfer has discount"""
-        return self.discount_price is not None and self.discount_price < self.base_price
-    
-    @property
-    def average_rating(self):
-        """Calculate average rating from reviews with rating > 3"""
-        reviews = self.reviews.filter(is_approved=True, rating__gt=3)
-        if reviews.exists():
-            return reviews.aggregate(models.Avg('rating'))['rating__avg']
-        return None
+        return price_rules(self).regular is not None
     
     @property
     def total_reviews(self):
         """Count approved reviews with rating > 3"""
-        return self.reviews.filter(is_approved=True, rating__gt=3).count()
+        return self.visible_review_count
 
 
 class TransferImage(models.Model):
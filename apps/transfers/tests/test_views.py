@@ -0,0 +1,69 @@
+"""
+Transfer view tests for AusflugAgypten
+"""
+
+from decimal import Decimal
+
+from django.test import TestCase
+
+from apps.core.tests.utils import TemporaryMediaMixin, seed_test_data, test_settings
+from apps.tours.models import Location
+from ..models import Transfer, TransferRoute
+
+
+@test_settings
+class TransferBookingFormTests(TemporaryMediaMixin, TestCase):
+    """The booking form only offers the active routes of a transfer"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        seed_test_data()
+        cls.transfer = Transfer.objects.filter(is_active=True).order_by('pk').first()
+        cls.transfer.routes.all().delete()
+        Transfer.objects.filter(pk=cls.transfer.pk).update(price_per_person=False, price_per_km=True)
+        cls.inactive = cls.add_route('Stillgelegt', '80.00', is_active=False)
+    
+    @classmethod
+    def add_route(cls, name, price, **fields):
+        destination = Location.objects.create(name=name, name_en=name, slug=f'route-{name.lower()}')
+        origin = Location.objects.create(name=f'Flughafen {name}', name_en=f'Airport {name}', slug=f'route-flughafen-{name.lower()}')
+        return TransferRoute.objects.create(
+            transfer=cls.transfer, from_location=origin, to_location=destination,
+            estimated_duration=45, price=Decimal(price), **fields,
+        )
+    
+    def get(self):
+        response = self.client.get(self.transfer.get_absolute_url())
+        self.assertEqual(response.status_code, 200)
+        return response
+    
+    def test_per_km_transfer_without_active_route_is_not_bookable(self):
+        response = self.get()
+        self.assertFalse(response.context['is_bookable'])
+        self.assertNotContains(response, 'id="transferBookingForm"')
+        self.assertEqual(response.context['routes'], [])
+        self.assertContains(response, 'keine buchbare Strecke')
+    
+    def test_per_km_transfer_requires_one_of_its_active_routes(self):
+        route = self.add_route('Makadi', '35.00')
+        response = self.get()
+        self.assertTrue(response.context['is_bookable'])
+        self.assertEqual(response.context['routes'], [route])
+        self.assertContains(response, '<select name="route" class="input-field" required>', html=False)
+        self.assertContains(response, f'<option value="{route.pk}">')
+        self.assertNotContains(response, f'<option value="{self.inactive.pk}">')
+        self.assertNotContains(response, '<option value="">')
+    
+    def test_route_locations_are_prefetched(self):
+        self.add_route('Makadi', '35.00')
+        routes = self.get().context['routes']
+        with self.assertNumQueries(0):
+            for route in routes:
+                route.from_location.name, route.to_location.name
+    
+    def test_other_transfers_need_no_route(self):
+        Transfer.objects.filter(pk=self.transfer.pk).update(price_per_km=False)
+        response = self.get()
+        self.assertTrue(response.context['is_bookable'])
+        self.assertContains(response, 'id="transferBookingForm"')
+        self.assertNotContains(response, '<select name="route"')
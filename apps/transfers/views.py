@@ -3,22 +3,26 @@ Views for Transfers app
 """
 
 from django.views.generic import ListView, DetailView
-from django.db.models import Q
 from .models import Transfer, TransferType, VehicleType
+from apps.search.backends import filter_by_search
+from apps.core.pagination import KeysetPaginationMixin
+from apps.core.pricing import PER_KM, QuoteListMixin, price_rules
+from apps.images.renditions import RenditionPrefetchMixin
 from apps.core.models import PageHero
 
 
-class TransferListView(ListView):
+class TransferListView(RenditionPrefetchMixin, QuoteListMixin, KeysetPaginationMixin, ListView):
     """List all transfers with filtering"""
     model = Transfer
     template_name = 'transfer/index.html'
     context_object_name = 'transfers'
     paginate_by = 12
+    json_image_field = 'featured_image'
     
     def get_queryset(self):
-        queryset = Transfer.objects.filter(is_active=True).select_related(
+        queryset = Transfer.objects.active().select_related(
             'transfer_type', 'vehicle_type', 'from_location', 'to_location'
-        ).prefetch_related('reviews')
+        ).with_ratings()
         
         # Filter by transfer type
         type_slug = self.request.GET.get('type')
@@ -43,12 +47,15 @@ class TransferListView(ListView):
         # Search
         search_query = self.request.GET.get('search')
         if search_query:
-            queryset = queryset.filter(
-                Q(title__icontains=search_query) |
-                Q(title_en__icontains=search_query) |
-                Q(description__icontains=search_query) |
-                Q(description_en__icontains=search_query)
-            )
+            queryset = filter_by_search(queryset, search_query)
+        
+        # Filter by minimum average rating
+        min_rating = self.request.GET.get('rating')
+        if min_rating:
+            try:
+                queryset = queryset.min_rating(float(min_rating))
+            except ValueError:
+                pass
         
         # Ordering
         ordering = self.request.GET.get('ordering', 'featured')
@@ -58,11 +65,24 @@ class TransferListView(ListView):
             queryset = queryset.order_by('-base_price')
         elif ordering == 'popular':
             queryset = queryset.order_by('-is_popular', '-is_featured', 'title')
+        elif ordering == 'rating':
+            queryset = queryset.order_by_rating()
         else:  # featured/default
             queryset = queryset.order_by('-is_featured', '-is_popular', 'title')
         
         return queryset
     
+    def get_json_item(self, transfer):
+        item = super().get_json_item(transfer)
+        item.update(
+            price=transfer.quote.unit_price,
+            regular_price=transfer.quote.regular_price,
+            price_basis=transfer.quote.basis,
+            rating=transfer.average_rating,
+            review_count=transfer.visible_review_count,
+        )
+        return item
+    
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
@@ -88,6 +108,7 @@ class TransferListView(ListView):
         context['current_to'] = self.request.GET.get('to', '')
         context['current_search'] = self.request.GET.get('search', '')
         context['current_ordering'] = self.request.GET.get('ordering', 'featured')
+        context['current_rating'] = self.request.GET.get('rating', '')
         
         # Page Hero
         try:
@@ -113,13 +134,20 @@ class TransferDetailView(DetailView):
             'images',
             'inclusions',
             'important_info',
-            'routes'
+            'routes__from_location',
+            'routes__to_location',
         )
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         transfer = self.object
         
+        # Active routes for the route list and the booking form
+        context['routes'] = [route for route in transfer.routes.all() if route.is_active]
+        # The per-km rate is no price of its own (see BookingForm), such transfers need a route
+        context['route_required'] = price_rules(transfer).basis == PER_KM
+        context['is_bookable'] = bool(context['routes']) or not context['route_required']
+        
         # Get related transfers (same type)
         context['related_transfers'] = Transfer.objects.filter(
             transfer_type=transfer.transfer_type,
@@ -136,7 +164,6 @@ class TransferDetailView(DetailView):
         # Get approved reviews with rating > 3
         from apps.reviews.models import Review
         from django.contrib.contenttypes.models import ContentType
-        from django.db.models import Avg
         content_type = ContentType.objects.get_for_model(Transfer)
         approved_reviews = Review.objects.filter(
             content_type=content_type,
@@ -147,17 +174,9 @@ class TransferDetailView(DetailView):
         
         context['reviews'] = approved_reviews[:10]
         
-        # Calculate average rating and count (only reviews with rating > 3)
-        if approved_reviews.exists():
-            context['average_rating'] = approved_reviews.aggregate(Avg('rating'))['rating__avg']
-            context['total_reviews'] = approved_reviews.count()
-        else:
-            context['average_rating'] = None
-            context['total_reviews'] = 0
-        
-        # Add today's date for form min date
-        from datetime import date
-        context['today'] = date.today()
+        # Stored rating aggregates (only reviews with rating > 3)
+        context['average_rating'] = transfer.average_rating
+        context['total_reviews'] = transfer.total_reviews
         
         return context
 
@@ -58,6 +58,10 @@ INSTALLED_APPS = [
     'apps.bookings',
     'apps.users',
     'apps.gallery',
+    'apps.search',
+    'apps.jobs',
+    'apps.images',
+    'apps.availability',
 ]
 
 SITE_ID = 1
@@ -67,11 +71,14 @@ MIDDLEWARE = [
     'whitenoise.middleware.WhiteNoiseMiddleware',  # Static files
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.locale.LocaleMiddleware',  # i18n
+    'apps.core.middleware.AnonymousPageCacheMiddleware',  # Full-page cache, needs the language
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'apps.core.middleware.ContextProcessorQueriesMiddleware',  # Query counts per context processor (DEBUG)
+    'apps.core.middleware.CardCacheStatsMiddleware',  # Product card cache hits/misses
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -118,6 +125,16 @@ if DEBUG:
         }
     }
 
+# Cache - must be shared by all gunicorn workers for cross-process invalidation
+# (file based by default, point CACHE_URL at memcached or redis in production)
+CACHES = {
+    'default': env.cache('CACHE_URL', default=f'filecache://{BASE_DIR / "cache"}'),
+}
+
+# Full-page cache for anonymous visitors (apps.core.page_cache), off while developing
+PAGE_CACHE_ENABLED = env.bool('PAGE_CACHE_ENABLED', default=not DEBUG)
+PAGE_CACHE_TTL = env.int('PAGE_CACHE_TTL', default=600)
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -224,6 +241,8 @@ JAZZMIN_SETTINGS = {
         "transfers.VehicleType": "fas fa-truck",
         "bookings.Booking": "fas fa-calendar-check",
         "bookings.Payment": "fas fa-credit-card",
+        "bookings.StripePrice": "fas fa-tag",
+        "bookings.StripeEvent": "fas fa-bell",
         "blog.BlogPost": "fas fa-blog",
         "blog.BlogCategory": "fas fa-folder-open",
         "gallery.GalleryImage": "fas fa-photo-video",
@@ -392,6 +411,9 @@ DEFAULT_FROM_EMAIL = env('DEFAULT_FROM_EMAIL', default='noreply@ausflugagypten.c
 STRIPE_PUBLIC_KEY = env('STRIPE_PUBLIC_KEY', default='')
 STRIPE_SECRET_KEY = env('STRIPE_SECRET_KEY', default='')
 STRIPE_WEBHOOK_SECRET = env('STRIPE_WEBHOOK_SECRET', default='')
+# Another base URL (e.g. stripe-mock) for local tests
+STRIPE_API_BASE = env('STRIPE_API_BASE', default='https://api.stripe.com')
+STRIPE_TIMEOUT = env.int('STRIPE_TIMEOUT', default=20)
 
 # Security Settings (Production)
 if not DEBUG:
@@ -9,7 +9,11 @@ from django.conf.urls.static import static
 from django.conf.urls.i18n import i18n_patterns
 from django.views.i18n import set_language
 
+from apps.core.admin_site import dashboard_stats_view
+
 urlpatterns = [
+    # Admin notification counters (JSON, polled by admin_notifications.js)
+    path('admin/dashboard-stats/', dashboard_stats_view, name='admin_dashboard_stats'),
     path('admin/', admin.site.urls),
     # TinyMCE URLs
     path('tinymce/', include('tinymce.urls')),
@@ -30,6 +34,8 @@ urlpatterns += i18n_patterns(
     path('buchungen/', include('apps.bookings.urls', namespace='bookings')),
     path('bewertungen/', include('apps.reviews.urls', namespace='reviews')),
     path('konto/', include('apps.users.urls', namespace='users')),
+    path('suche/', include('apps.search.urls', namespace='search')),
+    path('verfuegbarkeit/', include('apps.availability.urls', namespace='availability')),
     prefix_default_language=False,  # German (de) is default, no prefix needed
 )
 
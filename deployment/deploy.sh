@@ -73,6 +73,8 @@ python manage.py check --deploy
 # 8. Restart Gunicorn
 print_message "Restarting Gunicorn service..."
 sudo systemctl restart gunicorn-ausflug
+sudo systemctl restart ausflug-admin-stats
+sudo systemctl restart ausflug-jobs-worker
 
 # 9. Reload Nginx
 print_message "Reloading Nginx..."
@@ -79,6 +79,8 @@ ufw --force enable
 print_message "Installing systemd service files..."
 cp /var/www/ausflugagypten/deployment/gunicorn.socket /etc/systemd/system/gunicorn-ausflug.socket
 cp /var/www/ausflugagypten/deployment/gunicorn.service /etc/systemd/system/gunicorn-ausflug.service
+cp /var/www/ausflugagypten/deployment/admin-stats.service /etc/systemd/system/ausflug-admin-stats.service
+cp /var/www/ausflugagypten/deployment/jobs-worker.service /etc/systemd/system/ausflug-jobs-worker.service
 
 # Copy Nginx configuration
 print_message "Installing Nginx configuration..."
@@ -98,6 +100,10 @@ systemctl daemon-reload
 print_message "Enabling and starting services..."
 systemctl enable gunicorn-ausflug.socket
 systemctl start gunicorn-ausflug.socket
+systemctl enable ausflug-admin-stats
+systemctl start ausflug-admin-stats
+systemctl enable ausflug-jobs-worker
+systemctl start ausflug-jobs-worker
 systemctl enable nginx
 systemctl restart nginx
 
@@ -0,0 +1,90 @@
+/**
+ * Admin notifications for AusflugAgypten
+ *
+ * Shows pending bookings, unread contact messages and unapproved reviews as
+ * sidebar badges and keeps them current by polling the notification endpoint.
+ * The endpoint answers 304 Not Modified while the counters are unchanged, so
+ * open admin tabs cost almost nothing.
+ */
+(function () {
+    'use strict';
+
+    var POLL_INTERVAL = 30000;
+    var url = window.notificationsUrl || '/admin/dashboard-stats/';
+    var etag = null;
+
+    // Sidebar links that get a counter badge
+    var SIDEBAR_LINKS = {
+        bookings: '/admin/bookings/booking/',
+        contacts: '/admin/core/contactmessage/',
+        reviews: '/admin/reviews/review/'
+    };
+
+    function renderBadge(link, count) {
+        var badge = link.querySelector('.admin-notification-badge');
+        if (!count) {
+            if (badge) {
+                badge.remove();
+            }
+            return;
+        }
+        if (!badge) {
+            badge = document.createElement('span');
+            badge.className = 'badge badge-danger right admin-notification-badge';
+            link.appendChild(badge);
+        }
+        badge.textContent = count;
+    }
+
+    function render(counters) {
+        Object.keys(SIDEBAR_LINKS).forEach(function (key) {
+            var selector = '.nav-sidebar a[href="' + SIDEBAR_LINKS[key] + '"]';
+            document.querySelectorAll(selector).forEach(function (link) {
+                renderBadge(link, counters[key] || 0);
+            });
+        });
+
+        // Counters rendered by the dashboard template
+        document.querySelectorAll('[data-notification-count]').forEach(function (element) {
+            var key = element.getAttribute('data-notification-count');
+            if (key in counters) {
+                element.textContent = counters[key];
+            }
+        });
+    }
+
+    function poll() {
+        if (document.hidden) {
+            return;
+        }
+        var headers = {'X-Requested-With': 'XMLHttpRequest'};
+        if (etag) {
+            headers['If-None-Match'] = etag;
+        }
+        fetch(url, {headers: headers, credentials: 'same-origin', cache: 'no-store'})
+            .then(function (response) {
+                if (response.status === 304 || !response.ok) {
+                    return null;
+                }
+                etag = response.headers.get('ETag');
+                return response.json();
+            })
+            .then(function (data) {
+                if (data) {
+                    render(data.notifications);
+                }
+            })
+            .catch(function () {
+                // Network errors are retried on the next interval
+            });
+    }
+
+    document.addEventListener('DOMContentLoaded', function () {
+        if (window.notifications) {
+            render(window.notifications);
+        }
+        poll();
+        setInterval(poll, POLL_INTERVAL);
+        document.addEventListener('visibilitychange', poll);
+    });
+})();
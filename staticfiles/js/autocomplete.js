@@ -0,0 +1,71 @@
+/**
+ * Search-as-you-type suggestions for AusflugAgypten
+ *
+ * Attaches to every input with a data-autocomplete attribute holding the
+ * autocomplete endpoint URL and shows the returned suggestions as links.
+ */
+(function () {
+    'use strict';
+
+    var DELAY = 120;
+
+    function attach(input) {
+        var url = input.getAttribute('data-autocomplete');
+        var list = document.createElement('ul');
+        var timer = null;
+        var lastQuery = '';
+
+        list.className = 'autocomplete-list absolute z-50 bg-white shadow-lg rounded-lg mt-1 w-full hidden';
+        input.parentNode.style.position = 'relative';
+        input.parentNode.appendChild(list);
+        input.setAttribute('autocomplete', 'off');
+
+        function render(results) {
+            list.innerHTML = '';
+            results.forEach(function (result) {
+                var item = document.createElement('li');
+                var link = document.createElement('a');
+                var type = document.createElement('span');
+                link.href = result.url;
+                link.className = 'flex justify-between gap-4 px-4 py-2 hover:bg-gray-100';
+                link.textContent = result.label;
+                type.className = 'text-sm text-gray-500';
+                type.textContent = result.type;
+                link.appendChild(type);
+                item.appendChild(link);
+                list.appendChild(item);
+            });
+            list.classList.toggle('hidden', results.length === 0);
+        }
+
+        input.addEventListener('input', function () {
+            var query = input.value.trim();
+            clearTimeout(timer);
+            if (query.length < 2) {
+                render([]);
+                return;
+            }
+            timer = setTimeout(function () {
+                lastQuery = query;
+                fetch(url + '?q=' + encodeURIComponent(query))
+                    .then(function (response) { return response.json(); })
+                    .then(function (data) {
+                        // Ignore answers to outdated keystrokes
+                        if (query === lastQuery) {
+                            render(data.results);
+                        }
+                    })
+                    .catch(function () { render([]); });
+            }, DELAY);
+        });
+
+        input.addEventListener('blur', function () {
+            // Let clicks on a suggestion finish first
+            setTimeout(function () { list.classList.add('hidden'); }, 200);
+        });
+    }
+
+    document.addEventListener('DOMContentLoaded', function () {
+        document.querySelectorAll('input[data-autocomplete]').forEach(attach);
+    });
+})();
@@ -0,0 +1,69 @@
+/**
+ * Seat availability for the booking date pickers of AusflugAgypten
+ *
+ * Date inputs with data-availability-url load the month calendar of their
+ * product (remaining seats per day, revalidated with its ETag) and refuse
+ * days that do not take place or have fewer seats left than the chosen
+ * participants. Native date pickers cannot grey out single days, so the
+ * choice is marked invalid with data-unavailable-text instead. The booking
+ * view checks the seats again with the day locked.
+ */
+(function () {
+    'use strict';
+
+    var PARTICIPANT_FIELDS = ['adults', 'children', 'babies'];
+    var EVERY_DAY = {scheduled: false, days: {}};
+    var months = {};
+
+    function load(base, value) {
+        var parts = value.split('-');
+        var url = base + parts[0] + '/' + Number(parts[1]) + '/';
+        if (!months[url]) {
+            months[url] = fetch(url, {headers: {'Accept': 'application/json'}})
+                .then(function (response) { return response.ok ? response.json() : EVERY_DAY; })
+                .catch(function () { return EVERY_DAY; });
+        }
+        return months[url];
+    }
+
+    function participants(form) {
+        var total = 0;
+        PARTICIPANT_FIELDS.forEach(function (name) {
+            var field = form && form.elements[name];
+            total += field ? Number(field.value) || 0 : 0;
+        });
+        return Math.max(total, 1);
+    }
+
+    function check(input) {
+        if (!input.value) {
+            input.setCustomValidity('');
+            return;
+        }
+        var value = input.value;
+        load(input.getAttribute('data-availability-url'), value).then(function (month) {
+            if (input.value !== value) {
+                return;
+            }
+            var seats = month.days[value];
+            var full = month.scheduled && (seats === undefined || seats < participants(input.form));
+            input.setCustomValidity(full ? input.getAttribute('data-unavailable-text') : '');
+            if (full) {
+                input.reportValidity();
+            }
+        });
+    }
+
+    document.querySelectorAll('input[data-availability-url]').forEach(function (input) {
+        input.addEventListener('change', function () { check(input); });
+        if (input.form) {
+            input.form.addEventListener('change', function (event) {
+                if (PARTICIPANT_FIELDS.indexOf(event.target.name) !== -1) {
+                    check(input);
+                }
+            });
+        }
+        // Fetch the current month before the picker opens
+        load(input.getAttribute('data-availability-url'), new Date().toISOString().slice(0, 10));
+    });
+})();
@@ -0,0 +1,81 @@
+/**
+ * CSRF tokens for cached pages of AusflugAgypten
+ *
+ * Public pages come from the full-page cache and therefore cannot contain
+ * a visitor's CSRF token. Forms with a data-csrf attribute get the token
+ * from the csrftoken cookie when they are submitted; visitors without the
+ * cookie fetch it once from the endpoint in the script's data-csrf-url.
+ * For the same reason date inputs with data-min-today get today's date as
+ * their minimum here (the booking forms still validate it on the server).
+ */
+(function () {
+    'use strict';
+
+    var endpoint = document.currentScript.getAttribute('data-csrf-url');
+    var pending = null;
+
+    function cookieToken() {
+        var row = document.cookie.split('; ').find(function (row) {
+            return row.indexOf('csrftoken=') === 0;
+        });
+        return row ? row.split('=')[1] : '';
+    }
+
+    function getToken() {
+        var token = cookieToken();
+        if (token) {
+            return Promise.resolve(token);
+        }
+        if (!pending) {
+            pending = fetch(endpoint, {credentials: 'same-origin', headers: {'Accept': 'application/json'}})
+                .then(function (response) { return response.json(); })
+                .then(function (data) {
+                    window.csrftoken = data.token;
+                    return data.token;
+                });
+        }
+        return pending;
+    }
+
+    function fill(form, token) {
+        var input = form.querySelector('input[name=csrfmiddlewaretoken]');
+        if (!input) {
+            input = document.createElement('input');
+            input.type = 'hidden';
+            input.name = 'csrfmiddlewaretoken';
+            form.appendChild(input);
+        }
+        input.value = token;
+    }
+
+    var forms = document.querySelectorAll('form[data-csrf]');
+    forms.forEach(function (form) {
+        form.addEventListener('submit', function (event) {
+            var token = cookieToken();
+            if (token) {
+                fill(form, token);
+                return;
+            }
+            event.preventDefault();
+            getToken().then(function (token) {
+                fill(form, token);
+                form.submit();
+            });
+        });
+    });
+
+    document.querySelectorAll('input[data-min-today]').forEach(function (input) {
+        var now = new Date();
+        var month = String(now.getMonth() + 1).padStart(2, '0');
+        var day = String(now.getDate()).padStart(2, '0');
+        input.min = now.getFullYear() + '-' + month + '-' + day;
+    });
+
+    window.csrftoken = cookieToken();
+    window.getCsrfToken = getToken;
+
+    // Fetch the cookie early so the first submit does not wait for it
+    if (forms.length && !window.csrftoken) {
+        getToken();
+    }
+})();